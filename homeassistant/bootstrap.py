@@ -1,12 +1,14 @@
 """Provide methods to bootstrap a Home Assistant instance."""
 import asyncio
+from collections import deque
 import contextlib
 import logging
 import logging.handlers
 import os
 import sys
 from time import monotonic
-from typing import Any, Dict, Optional, Set
+from timeit import default_timer as timer
+from typing import Any, Dict, List, Optional, Set
 
 from async_timeout import timeout
 import voluptuous as vol
@@ -20,7 +22,11 @@ from homeassistant.const import (
     REQUIRED_NEXT_PYTHON_VER,
 )
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.setup import DATA_SETUP, async_setup_component
+from homeassistant.setup import (
+    DATA_SETUP,
+    async_get_setup_timings,
+    async_setup_component,
+)
 from homeassistant.util.logging import AsyncHandler
 from homeassistant.util.package import async_get_user_site, is_virtual_env
 from homeassistant.util.yaml import clear_secret_cache
@@ -44,6 +50,9 @@ STAGE_1_INTEGRATIONS = {
     "cloud",
 }
 
+# Number of slowest integrations listed in the startup report
+STARTUP_REPORT_SIZE = 10
+
 
 async def async_setup_hass(
     *,
@@ -324,6 +333,7 @@ async def _async_set_up_integrations(
     hass: core.HomeAssistant, config: Dict[str, Any]
 ) -> None:
     """Set up all the integrations."""
+    start = timer()
     domains = _get_domains(hass, config)
 
     # Start up debuggers. Start these first in case they want to wait.
@@ -374,47 +384,117 @@ async def _async_set_up_integrations(
         )
 
     # Load all integrations
-    after_dependencies: Dict[str, Set[str]] = {}
+    integrations: Dict[str, loader.Integration] = {}
 
     for int_or_exc in await asyncio.gather(
         *(loader.async_get_integration(hass, domain) for domain in stage_2_domains),
         return_exceptions=True,
     ):
         # Exceptions are handled in async_setup_component.
-        if isinstance(int_or_exc, loader.Integration) and int_or_exc.after_dependencies:
-            after_dependencies[int_or_exc.domain] = set(int_or_exc.after_dependencies)
+        if isinstance(int_or_exc, loader.Integration):
+            integrations[int_or_exc.domain] = int_or_exc
 
-    last_load = None
-    while stage_2_domains:
-        domains_to_load = set()
+    await _async_set_up_dependency_graph(hass, config, stage_2_domains, integrations)
 
-        for domain in stage_2_domains:
-            after_deps = after_dependencies.get(domain)
-            # Load if integration has no after_dependencies or they are
-            # all loaded
-            if not after_deps or not after_deps - hass.config.components:
-                domains_to_load.add(domain)
+    _async_log_startup_report(hass, timer() - start)
 
-        if not domains_to_load or domains_to_load == last_load:
-            break
+    # Wrap up startup
+    await hass.async_block_till_done()
 
-        _LOGGER.debug("Setting up %s", domains_to_load)
 
-        await asyncio.gather(
-            *(async_setup_component(hass, domain, config) for domain in domains_to_load)
-        )
+async def _async_set_up_dependency_graph(
+    hass: core.HomeAssistant,
+    config: Dict[str, Any],
+    domains: Set[str],
+    integrations: Dict[str, loader.Integration],
+) -> None:
+    """Set up each domain as soon as the domains it comes after are done.
+
+    Domains wait for their dependencies and after_dependencies that are set
+    up in the same run, independent branches are set up concurrently.
+    """
+    waits_for: Dict[str, Set[str]] = {}
+    # Domains coming after a domain that is not set up in this run
+    deferred: Set[str] = set()
+
+    for domain in domains:
+        integration = integrations.get(domain)
+        if integration is None:
+            waits_for[domain] = set()
+            continue
+        waits_for[domain] = {
+            dep
+            for dep in (*integration.dependencies, *integration.after_dependencies)
+            if dep in domains and dep != domain
+        }
+        if any(
+            dep not in domains and dep not in hass.config.components
+            for dep in integration.after_dependencies
+        ):
+            deferred.add(domain)
+
+    # Order the domains so every domain comes after the ones it waits for
+    ordered: List[str] = []
+    remaining = {domain: set(deps) for domain, deps in waits_for.items()}
+    ready = deque(
+        domain
+        for domain, deps in remaining.items()
+        if not deps and domain not in deferred
+    )
 
-        last_load = domains_to_load
-        stage_2_domains -= domains_to_load
+    while ready:
+        domain = ready.popleft()
+        ordered.append(domain)
+        del remaining[domain]
+        for other, deps in remaining.items():
+            if domain in deps:
+                deps.discard(domain)
+                if not deps and other not in deferred:
+                    ready.append(other)
 
-    # These are stage 2 domains that never have their after_dependencies
-    # satisfied.
-    if stage_2_domains:
-        _LOGGER.debug("Final set up: %s", stage_2_domains)
+    setup_tasks: Dict[str, asyncio.Future] = {}
+
+    async def async_set_up_when_ready(domain: str) -> bool:
+        """Set up domain once the domains it waits for are done."""
+        pending = [setup_tasks[dep] for dep in waits_for[domain]]
+        if pending:
+            await asyncio.wait(pending)
+        _LOGGER.debug("Setting up %s", domain)
+        return await async_setup_component(hass, domain, config)
+
+    for domain in ordered:
+        setup_tasks[domain] = hass.async_create_task(async_set_up_when_ready(domain))
+
+    await asyncio.gather(*setup_tasks.values())
+
+    # These domains wait for each other through after_dependencies, or for
+    # a domain that is not set up, and are set up once everything else is done.
+    if remaining:
+        _LOGGER.debug("Final set up: %s", set(remaining))
 
         await asyncio.gather(
-            *(async_setup_component(hass, domain, config) for domain in stage_2_domains)
+            *(async_setup_component(hass, domain, config) for domain in remaining)
         )
 
-    # Wrap up startup
-    await hass.async_block_till_done()
+
+@core.callback
+def _async_log_startup_report(hass: core.HomeAssistant, elapsed: float) -> None:
+    """Log how long setting up the integrations took and the slowest ones."""
+    timings = async_get_setup_timings(hass)
+    slowest = sorted(
+        ((sum(phases.values()), domain) for domain, phases in timings.items()),
+        reverse=True,
+    )[:STARTUP_REPORT_SIZE]
+
+    report = []
+
+    for _, domain in slowest:
+        phases = ", ".join(
+            f"{phase} {seconds:.2f}s"
+            for phase, seconds in sorted(timings[domain].items())
+        )
+        report.append(f"{domain} ({phases})")
+
+    _LOGGER.info(
+        "Integrations set up in %.2f seconds, slowest: %s", elapsed, ", ".join(report)
+    )
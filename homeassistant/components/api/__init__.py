@@ -6,12 +6,14 @@ import logging
 from aiohttp import web
 from aiohttp.web_exceptions import HTTPBadRequest
 import async_timeout
+import attr
 import voluptuous as vol
 
 from homeassistant.auth.permissions.const import POLICY_READ
 from homeassistant.bootstrap import DATA_LOGGING
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.const import (
+    CONTENT_TYPE_JSON,
     EVENT_HOMEASSISTANT_STOP,
     EVENT_TIME_CHANGED,
     HTTP_BAD_REQUEST,
@@ -33,7 +35,7 @@ from homeassistant.const import (
 import homeassistant.core as ha
 from homeassistant.exceptions import ServiceNotFound, TemplateError, Unauthorized
 from homeassistant.helpers import template
-from homeassistant.helpers.json import JSONEncoder
+from homeassistant.helpers.json import cached_json_dumps
 from homeassistant.helpers.service import async_get_all_descriptions
 from homeassistant.helpers.state import AsyncTrackStates
 
@@ -47,10 +49,25 @@ ATTR_VERSION = "version"
 DOMAIN = "api"
 STREAM_PING_PAYLOAD = "ping"
 STREAM_PING_INTERVAL = 50  # seconds
+# Events buffered for a stream before its overflow policy kicks in
+STREAM_QUEUE_SIZE = 1000
+STREAM_OVERFLOW_DROP = "drop"
+STREAM_OVERFLOW_DISCONNECT = "disconnect"
+STREAM_OVERFLOW_POLICIES = (STREAM_OVERFLOW_DROP, STREAM_OVERFLOW_DISCONNECT)
 
 
-def setup(hass, config):
+@attr.s(slots=True)
+class StreamStats:
+    """Backpressure of the event streams since startup."""
+
+    open_streams: int = attr.ib(default=0)
+    dropped_events: int = attr.ib(default=0)
+    overflow_disconnects: int = attr.ib(default=0)
+
+
+async def async_setup(hass, config):
     """Register the API with the HTTP interface."""
+    hass.data[DOMAIN] = StreamStats()
     hass.http.register_view(APIStatusView)
     hass.http.register_view(APIEventStream)
     hass.http.register_view(APIConfigView)
@@ -67,9 +84,21 @@ def setup(hass, config):
     if DATA_LOGGING in hass.data:
         hass.http.register_view(APIErrorLog)
 
+    hass.components.system_health.async_register_info(DOMAIN, system_health_info)
+
     return True
 
 
+async def system_health_info(hass):
+    """Get info for the info page."""
+    stats = hass.data[DOMAIN]
+    return {
+        "event_streams": stats.open_streams,
+        "stream_dropped_events": stats.dropped_events,
+        "stream_overflow_disconnects": stats.overflow_disconnects,
+    }
+
+
 class APIStatusView(HomeAssistantView):
     """View to handle Status requests."""
 
@@ -93,19 +122,30 @@ class APIEventStream(HomeAssistantView):
         if not request["hass_user"].is_admin:
             raise Unauthorized()
         hass = request.app["hass"]
+        stats = hass.data[DOMAIN]
         stop_obj = object()
-        to_write = asyncio.Queue()
+        to_write = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        dropped = 0
+
+        overflow = request.query.get("overflow", STREAM_OVERFLOW_DROP)
+        if overflow not in STREAM_OVERFLOW_POLICIES:
+            return self.json_message(
+                f"Invalid overflow policy: {overflow}", HTTP_BAD_REQUEST
+            )
 
         restrict = request.query.get("restrict")
         if restrict:
-            restrict = restrict.split(",") + [EVENT_HOMEASSISTANT_STOP]
+            event_types = set(restrict.split(",")) - {EVENT_TIME_CHANGED}
+            event_types.add(EVENT_HOMEASSISTANT_STOP)
+        else:
+            event_types = {MATCH_ALL}
 
-        async def forward_events(event):
+        @ha.callback
+        def forward_events(event):
             """Forward events to the open request."""
-            if event.event_type == EVENT_TIME_CHANGED:
-                return
+            nonlocal dropped
 
-            if restrict and event.event_type not in restrict:
+            if event.event_type == EVENT_TIME_CHANGED:
                 return
 
             _LOGGER.debug("STREAM %s FORWARDING %s", id(stop_obj), event)
@@ -113,21 +153,49 @@ class APIEventStream(HomeAssistantView):
             if event.event_type == EVENT_HOMEASSISTANT_STOP:
                 data = stop_obj
             else:
-                data = json.dumps(event, cls=JSONEncoder)
+                data = cached_json_dumps(event)
 
-            await to_write.put(data)
+            if not to_write.full():
+                to_write.put_nowait(data)
+                return
+
+            if data is not stop_obj and overflow == STREAM_OVERFLOW_DROP:
+                # Drop the oldest event to keep the stream current
+                to_write.get_nowait()
+                to_write.put_nowait(data)
+                if not dropped:
+                    _LOGGER.warning(
+                        "STREAM %s is not keeping up, dropping events", id(stop_obj)
+                    )
+                dropped += 1
+                stats.dropped_events += 1
+                return
+
+            # Disconnect, the pending events are lost
+            dropped += to_write.qsize()
+            stats.dropped_events += to_write.qsize()
+            if data is not stop_obj:
+                stats.overflow_disconnects += 1
+            while not to_write.empty():
+                to_write.get_nowait()
+            to_write.put_nowait(stop_obj)
 
         response = web.StreamResponse()
         response.content_type = "text/event-stream"
         await response.prepare(request)
 
-        unsub_stream = hass.bus.async_listen(MATCH_ALL, forward_events)
+        unsubs = [
+            hass.bus.async_listen(event_type, forward_events)
+            for event_type in event_types
+        ]
+
+        stats.open_streams += 1
 
         try:
             _LOGGER.debug("STREAM %s ATTACHED", id(stop_obj))
 
             # Fire off one message so browsers fire open event right away
-            await to_write.put(STREAM_PING_PAYLOAD)
+            to_write.put_nowait(STREAM_PING_PAYLOAD)
 
             while True:
                 try:
@@ -141,14 +209,22 @@ class APIEventStream(HomeAssistantView):
                     _LOGGER.debug("STREAM %s WRITING %s", id(stop_obj), msg.strip())
                     await response.write(msg.encode("UTF-8"))
                 except asyncio.TimeoutError:
-                    await to_write.put(STREAM_PING_PAYLOAD)
+                    to_write.put_nowait(STREAM_PING_PAYLOAD)
 
         except asyncio.CancelledError:
             _LOGGER.debug("STREAM %s ABORT", id(stop_obj))
 
         finally:
             _LOGGER.debug("STREAM %s RESPONSE CLOSED", id(stop_obj))
-            unsub_stream()
+            for unsub in unsubs:
+                unsub()
+            stats.open_streams -= 1
+            if dropped:
+                _LOGGER.warning(
+                    "STREAM %s dropped %d events that were not read in time",
+                    id(stop_obj),
+                    dropped,
+                )
 
         return response
 
@@ -203,7 +279,17 @@ class APIStatesView(HomeAssistantView):
             for state in request.app["hass"].states.async_all()
             if entity_perm(state.entity_id, "read")
         ]
-        return self.json(states)
+        try:
+            body = ",".join(cached_json_dumps(state) for state in states)
+        except (ValueError, TypeError):
+            # Let the default serialization report the error
+            return self.json(states)
+
+        response = web.Response(
+            body=f"[{body}]".encode("UTF-8"), content_type=CONTENT_TYPE_JSON
+        )
+        response.enable_compression()
+        return response
 
 
 class APIEntityStateView(HomeAssistantView):
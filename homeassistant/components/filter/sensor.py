@@ -1,11 +1,9 @@
 """Allows the creation of a sensor that filters state property."""
 from collections import Counter, deque
-from copy import copy
 from datetime import timedelta
 from functools import partial
 import logging
 from numbers import Number
-import statistics
 from typing import Optional
 
 import voluptuous as vol
@@ -27,6 +25,7 @@ from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.event import async_track_state_change
 from homeassistant.util.decorator import Registry
 import homeassistant.util.dt as dt_util
+from homeassistant.util.rolling import RollingWindow
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -177,26 +176,27 @@ class SensorFilter(Entity):
         """Register callbacks."""
 
         @callback
-        def filter_sensor_state_listener(entity, old_state, new_state, update_ha=True):
+        def filter_sensor_state_listener(entity, old_state, new_state):
             """Handle device state changes."""
             if new_state.state in [STATE_UNKNOWN, STATE_UNAVAILABLE]:
                 return
 
-            temp_state = new_state
+            # The state is wrapped once and passed along the filter chain
+            temp_state = FilterState(new_state)
 
             try:
                 for filt in self._filters:
-                    filtered_state = filt.filter_state(copy(temp_state))
+                    unfiltered = temp_state.state
+                    filt.process(temp_state)
                     _LOGGER.debug(
                         "%s(%s=%s) -> %s",
                         filt.name,
                         self._entity,
-                        temp_state.state,
-                        "skip" if filt.skip_processing else filtered_state.state,
+                        unfiltered,
+                        "skip" if filt.skip_processing else temp_state.state,
                     )
                     if filt.skip_processing:
                         return
-                    temp_state = filtered_state
             except ValueError:
                 _LOGGER.error("Could not convert state: %s to number", self._state)
                 return
@@ -211,8 +211,7 @@ class SensorFilter(Entity):
                     ATTR_UNIT_OF_MEASUREMENT
                 )
 
-            if update_ha:
-                self.async_schedule_update_ha_state()
+            self.async_schedule_update_ha_state()
 
         if "recorder" in self.hass.config.components:
             history_list = []
@@ -255,12 +254,11 @@ class SensorFilter(Entity):
                     )
                 )
                 if self._entity in filter_history:
+                    known = {state.last_updated for state in history_list}
                     history_list.extend(
-                        [
-                            state
-                            for state in filter_history[self._entity]
-                            if state not in history_list
-                        ]
+                        state
+                        for state in filter_history[self._entity]
+                        if state.last_updated not in known
                     )
 
             # Sort the window states
@@ -270,11 +268,24 @@ class SensorFilter(Entity):
                 [(s.state, s.last_updated) for s in history_list],
             )
 
-            # Replay history through the filter chain
-            prev_state = None
-            for state in history_list:
-                filter_sensor_state_listener(self._entity, prev_state, state, False)
-                prev_state = state
+            # Replay history through the filter chain, one filter at a time
+            sources = {
+                FilterState(state): state
+                for state in history_list
+                if state.state not in [STATE_UNKNOWN, STATE_UNAVAILABLE]
+            }
+            fstates = list(sources)
+            for filt in self._filters:
+                fstates = filt.process_all(fstates)
+
+            if fstates:
+                self._state = fstates[-1].state
+                # Icon and unit of the last state that made it through
+                last_state = sources[fstates[-1]]
+                self._icon = last_state.attributes.get(ATTR_ICON, ICON)
+                self._unit_of_measurement = last_state.attributes.get(
+                    ATTR_UNIT_OF_MEASUREMENT
+                )
 
         async_track_state_change(self.hass, self._entity, filter_sensor_state_listener)
 
@@ -353,10 +364,11 @@ class Filter:
         :param entity: used for debugging only
         """
         if isinstance(window_size, int):
-            self.states = deque(maxlen=window_size)
+            # Previous values of the filter, raw or filtered
+            self.states = RollingWindow(window_size)
             self.window_unit = WINDOW_SIZE_UNIT_NUMBER_EVENTS
         else:
-            self.states = deque(maxlen=0)
+            self.states = None
             self.window_unit = WINDOW_SIZE_UNIT_TIME
         self.precision = precision
         self._name = name
@@ -387,18 +399,36 @@ class Filter:
 
     def filter_state(self, new_state):
         """Implement a common interface for filters."""
-        fstate = FilterState(new_state)
+        new_state.state = self.process(FilterState(new_state)).state
+        return new_state
+
+    def process(self, fstate):
+        """Filter a FilterState in place and return it."""
         if self._only_numbers and not isinstance(fstate.state, Number):
             raise ValueError
 
-        filtered = self._filter_state(fstate)
-        filtered.set_precision(self.precision)
-        if self._store_raw:
-            self.states.append(copy(FilterState(new_state)))
-        else:
-            self.states.append(copy(filtered))
-        new_state.state = filtered.state
-        return new_state
+        raw = fstate.state
+        self._filter_state(fstate)
+        fstate.set_precision(self.precision)
+        if self.states is not None:
+            self.states.append(raw if self._store_raw else fstate.state)
+        return fstate
+
+    def process_all(self, fstates):
+        """Filter FilterStates in order, return those that are not skipped.
+
+        States that are not numbers where a number is needed are dropped.
+        """
+        processed = []
+        for fstate in fstates:
+            try:
+                self.process(fstate)
+            except ValueError:
+                _LOGGER.error("Could not convert state: %s to number", fstate.state)
+                continue
+            if not self._skip_processing:
+                processed.append(fstate)
+        return processed
 
 
 @FILTERS.register(FILTER_NAME_RANGE)
@@ -476,7 +506,7 @@ class OutlierFilter(Filter):
     def _filter_state(self, new_state):
         """Implement the outlier filter."""
 
-        median = statistics.median([s.state for s in self.states]) if self.states else 0
+        median = self.states.median if self.states else 0
         if (
             len(self.states) == self.states.maxlen
             and abs(new_state.state - median) > self._radius
@@ -511,9 +541,7 @@ class LowPassFilter(Filter):
 
         new_weight = 1.0 / self._time_constant
         prev_weight = 1.0 - new_weight
-        new_state.state = (
-            prev_weight * self.states[-1].state + new_weight * new_state.state
-        )
+        new_state.state = prev_weight * self.states[-1] + new_weight * new_state.state
 
         return new_state
 
@@ -534,30 +562,44 @@ class TimeSMAFilter(Filter):
         """
         super().__init__(FILTER_NAME_TIME_SMA, window_size, precision, entity)
         self._time_window = window_size
-        self.last_leak = None
-        self.queue = deque()
+        # Value of the last state that left the window
+        self._last_leak = None
+        # Timestamps and values of the states in the window
+        self._timestamps = deque()
+        self._values = deque()
+        # Time weighted sum of the values between the first and last state
+        self._queue_sum = 0.0
 
     def _leak(self, left_boundary):
         """Remove timeouted elements."""
-        while self.queue:
-            if self.queue[0].timestamp + self._time_window <= left_boundary:
-                self.last_leak = self.queue.popleft()
+        timestamps = self._timestamps
+        values = self._values
+        while timestamps and timestamps[0] + self._time_window <= left_boundary:
+            timestamp = timestamps.popleft()
+            self._last_leak = values.popleft()
+            if timestamps:
+                self._queue_sum -= (
+                    timestamps[0] - timestamp
+                ).total_seconds() * self._last_leak
             else:
-                return
+                self._queue_sum = 0.0
 
     def _filter_state(self, new_state):
         """Implement the Simple Moving Average filter."""
 
         self._leak(new_state.timestamp)
-        self.queue.append(copy(new_state))
+        if self._timestamps:
+            self._queue_sum += (
+                new_state.timestamp - self._timestamps[-1]
+            ).total_seconds() * self._values[-1]
+        self._timestamps.append(new_state.timestamp)
+        self._values.append(new_state.state)
 
-        moving_sum = 0
         start = new_state.timestamp - self._time_window
-        prev_state = self.last_leak or self.queue[0]
-        for state in self.queue:
-            moving_sum += (state.timestamp - start).total_seconds() * prev_state.state
-            start = state.timestamp
-            prev_state = state
+        value = self._values[0] if self._last_leak is None else self._last_leak
+        moving_sum = (
+            self._timestamps[0] - start
+        ).total_seconds() * value + self._queue_sum
 
         new_state.state = moving_sum / self._time_window.total_seconds()
 
@@ -574,15 +616,15 @@ class ThrottleFilter(Filter):
     def __init__(self, window_size, precision, entity):
         """Initialize Filter."""
         super().__init__(FILTER_NAME_THROTTLE, window_size, precision, entity)
+        # Only the number of samples since the last emitted one matters
+        self.states = None
+        self._count = 0
         self._only_numbers = False
 
     def _filter_state(self, new_state):
         """Implement the throttle filter."""
-        if not self.states or len(self.states) == self.states.maxlen:
-            self.states.clear()
-            self._skip_processing = False
-        else:
-            self._skip_processing = True
+        self._skip_processing = self._count % self.window_size != 0
+        self._count += 1
 
         return new_state
 
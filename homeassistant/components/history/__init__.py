@@ -1,16 +1,22 @@
 """Provide pre-made queries on top of the recorder component."""
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import timedelta
-from itertools import groupby
+from itertools import groupby, islice
+import json
 import logging
 import time
+from types import MappingProxyType
 
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, tuple_
 import voluptuous as vol
 
 from homeassistant.components import recorder
 from homeassistant.components.http import HomeAssistantView
-from homeassistant.components.recorder.models import States
+from homeassistant.components.recorder.models import (
+    StateAttributes,
+    States,
+    process_timestamp,
+)
 from homeassistant.components.recorder.util import execute, session_scope
 from homeassistant.const import (
     ATTR_HIDDEN,
@@ -20,7 +26,9 @@ from homeassistant.const import (
     CONF_INCLUDE,
     HTTP_BAD_REQUEST,
 )
+from homeassistant.core import Context, State
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.json import JSONEncoder
 import homeassistant.util.dt as dt_util
 
 # mypy: allow-untyped-defs, no-check-untyped-defs
@@ -42,6 +50,245 @@ CONFIG_SCHEMA = vol.Schema(
 SIGNIFICANT_DOMAINS = ("thermostat", "climate", "water_heater")
 IGNORE_DOMAINS = ("zone", "scene")
 
+# Number of rows fetched from the database at once when streaming
+STREAM_BATCH_SIZE = 1000
+# Size in characters of the chunks written to a streamed response
+STREAM_CHUNK_SIZE = 65536
+
+# Columns selected for a minimal response, attributes are loaded on demand
+MINIMAL_COLUMNS = (
+    States.state_id,
+    States.entity_id,
+    States.state,
+    States.last_changed,
+    States.last_updated,
+    States.attributes_id,
+    States.context_id,
+    States.context_user_id,
+)
+# Maximum number of ids in one query for attributes, SQLite allows 999
+# bound variables before 3.32
+ATTRIBUTES_BATCH_SIZE = 998
+
+
+class LazyState(State):
+    """A state built from the minimal columns of a row.
+
+    Attributes are only decoded when accessed and are shared between all
+    rows with the same attributes_id.
+    """
+
+    __slots__ = [
+        "_row",
+        "_shared_attrs",
+        "_attributes",
+        "_attributes_cache",
+        "_context",
+    ]
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, row, attributes_cache):
+        """Initialize the lazy state."""
+        self._row = row
+        # Rows written before attributes were shared keep their own
+        self._shared_attrs = attributes_cache.legacy_attrs(row)
+        self._attributes = None
+        self._attributes_cache = attributes_cache
+        self._context = None
+        self.json = None
+        self.entity_id = row.entity_id
+        self.state = row.state
+        self.last_changed = process_timestamp(row.last_changed)
+        self.last_updated = process_timestamp(row.last_updated)
+
+    @property  # type: ignore
+    def attributes(self):
+        """Return the attributes of the state."""
+        if self._attributes is None:
+            if self._shared_attrs is not None:
+                self._attributes = _decode_attributes(self._shared_attrs)
+            else:
+                self._attributes = self._attributes_cache.get(self._row)
+        return self._attributes
+
+    @attributes.setter
+    def attributes(self, value):
+        """Set the attributes of the state."""
+        self._attributes = value
+
+    @property  # type: ignore
+    def context(self):
+        """Return the context of the state."""
+        if self._context is None:
+            self._context = Context(
+                id=self._row.context_id, user_id=self._row.context_user_id
+            )
+        return self._context
+
+    @context.setter
+    def context(self, value):
+        """Set the context of the state."""
+        self._context = value
+
+
+class _AttributesCache:
+    """Load shared attributes once per attributes_id.
+
+    The attributes of a chunk of rows are loaded with one query before the
+    states are built. They are only decoded when a state needs them.
+    """
+
+    def __init__(self, session):
+        """Initialize the cache."""
+        self._session = session
+        self._shared_attrs = {}
+        self._attributes = {}
+        self._hidden = {}
+        self._legacy_attrs = {}
+
+    def prefetch(self, rows):
+        """Load the attributes of a chunk of rows that are not loaded yet."""
+        attributes_ids = {
+            row.attributes_id
+            for row in rows
+            if row.attributes_id is not None
+            and row.attributes_id not in self._shared_attrs
+        }
+        for ids in _batches(list(attributes_ids)):
+            self._shared_attrs.update(
+                self._session.query(
+                    StateAttributes.attributes_id, StateAttributes.shared_attrs
+                ).filter(StateAttributes.attributes_id.in_(ids))
+            )
+
+        # Only kept for the chunk, states take their own copy
+        self._legacy_attrs = {}
+        state_ids = [row.state_id for row in rows if row.attributes_id is None]
+        for ids in _batches(state_ids):
+            self._legacy_attrs.update(
+                self._session.query(States.state_id, States.attributes).filter(
+                    States.state_id.in_(ids)
+                )
+            )
+
+    def legacy_attrs(self, row):
+        """Return the serialized attributes of a row that does not share them."""
+        if row.attributes_id is not None:
+            return None
+        return self._legacy_attrs.get(row.state_id) or "{}"
+
+    def get(self, row):
+        """Return the attributes of a row."""
+        attributes = self._attributes.get(row.attributes_id)
+        if attributes is None:
+            attributes = _decode_attributes(
+                self._shared_attrs.get(row.attributes_id) or "{}"
+            )
+            self._attributes[row.attributes_id] = attributes
+        return attributes
+
+    def is_hidden(self, row):
+        """Return if the attributes of a row hide it from the history."""
+        if row.attributes_id is None:
+            return _is_hidden(self.legacy_attrs(row))
+
+        hidden = self._hidden.get(row.attributes_id)
+        if hidden is None:
+            hidden = _is_hidden(self._shared_attrs.get(row.attributes_id) or "{}")
+            self._hidden[row.attributes_id] = hidden
+        return hidden
+
+
+def _batches(items, size=ATTRIBUTES_BATCH_SIZE):
+    """Split a list into lists of at most size items."""
+    return (items[idx : idx + size] for idx in range(0, len(items), size))
+
+
+def _is_hidden(shared_attrs):
+    """Return if serialized attributes hide a state.
+
+    Attributes are only decoded when the key is part of them.
+    """
+    return f'"{ATTR_HIDDEN}"' in shared_attrs and bool(
+        _decode_attributes(shared_attrs).get(ATTR_HIDDEN, False)
+    )
+
+
+def _decode_attributes(shared_attrs):
+    """Decode serialized attributes."""
+    try:
+        return MappingProxyType(json.loads(shared_attrs))
+    except ValueError:
+        # When json.loads fails
+        _LOGGER.exception("Error decoding attributes: %s", shared_attrs)
+        return MappingProxyType({})
+
+
+def _lazy_states(session, rows, skip_hidden=False):
+    """Yield the rows of a minimal query as LazyState.
+
+    Rows are read in chunks so the attributes of a chunk can be loaded
+    together.
+    """
+    attributes_cache = _AttributesCache(session)
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, ATTRIBUTES_BATCH_SIZE))
+        if not chunk:
+            return
+        attributes_cache.prefetch(chunk)
+        for row in chunk:
+            if skip_hidden and attributes_cache.is_hidden(row):
+                continue
+            yield LazyState(row, attributes_cache)
+
+
+def _significant_states_query(
+    session, start_time, end_time, entity_ids, filters, minimal_response=False
+):
+    """Return the query for significant states during start_time - end_time."""
+    if minimal_response:
+        query = session.query(*MINIMAL_COLUMNS)
+    else:
+        query = session.query(States)
+
+    query = query.filter(
+        (
+            States.domain.in_(SIGNIFICANT_DOMAINS)
+            | (States.last_changed == States.last_updated)
+        )
+        & (States.last_updated > start_time)
+    )
+
+    if filters:
+        query = filters.apply(query, entity_ids)
+
+    if end_time is not None:
+        query = query.filter(States.last_updated < end_time)
+
+    return query
+
+
+def _keep_state(state):
+    """Test if a state from the database should be part of the history."""
+    return (
+        state is not None
+        and _is_significant(state)
+        and not state.attributes.get(ATTR_HIDDEN, False)
+    )
+
+
+def _rows_to_states(session, rows, minimal_response):
+    """Convert rows to states and skip those that are not part of the history."""
+    if minimal_response:
+        return (
+            state
+            for state in _lazy_states(session, rows, skip_hidden=True)
+            if _is_significant(state)
+        )
+
+    return (state for state in (row.to_native() for row in rows) if _keep_state(state))
+
 
 def get_significant_states(
     hass,
@@ -50,6 +297,7 @@ def get_significant_states(
     entity_ids=None,
     filters=None,
     include_start_time_state=True,
+    minimal_response=False,
 ):
     """
     Return states changes during UTC period start_time - end_time.
@@ -57,31 +305,21 @@ def get_significant_states(
     Significant states are all states where there is a state change,
     as well as all states from certain domains (for instance
     thermostat so that we get current temperature in our graphs).
+
+    With minimal_response only the entity_id, state and timestamps are
+    selected and the states are returned as LazyState.
     """
     timer_start = time.perf_counter()
 
     with session_scope(hass=hass) as session:
-        query = session.query(States).filter(
-            (
-                States.domain.in_(SIGNIFICANT_DOMAINS)
-                | (States.last_changed == States.last_updated)
-            )
-            & (States.last_updated > start_time)
-        )
+        query = _significant_states_query(
+            session, start_time, end_time, entity_ids, filters, minimal_response
+        ).order_by(States.last_updated)
 
-        if filters:
-            query = filters.apply(query, entity_ids)
-
-        if end_time is not None:
-            query = query.filter(States.last_updated < end_time)
-
-        query = query.order_by(States.last_updated)
-
-        states = (
-            state
-            for state in execute(query)
-            if (_is_significant(state) and not state.attributes.get(ATTR_HIDDEN, False))
-        )
+        if minimal_response:
+            states = list(_rows_to_states(session, query, True))
+        else:
+            states = (state for state in execute(query) if _keep_state(state))
 
     if _LOGGER.isEnabledFor(logging.DEBUG):
         elapsed = time.perf_counter() - timer_start
@@ -92,11 +330,182 @@ def get_significant_states(
     )
 
 
-def state_changes_during_period(hass, start_time, end_time=None, entity_id=None):
+def stream_significant_states(
+    hass,
+    start_time,
+    end_time=None,
+    entity_ids=None,
+    filters=None,
+    include_start_time_state=True,
+    first_entity_ids=None,
+    minimal_response=False,
+):
+    """Yield significant states changes during start_time - end_time as JSON.
+
+    The result is the list of state lists of get_significant_states. The
+    entities in first_entity_ids come first, then the entities in
+    entity_ids, both in the order given. Without entity_ids the other
+    entities follow ordered by entity_id. Encoded chunks are yielded as the
+    rows are read, so memory use does not grow with the period.
+
+    With minimal_response only the first state of each entity is written in
+    full, the others only contain state and last_changed.
+    """
+    timer_start = time.perf_counter()
+    ordered_entity_ids = list(first_entity_ids or [])
+    if entity_ids is not None:
+        ordered_entity_ids = [
+            ent_id for ent_id in ordered_entity_ids if ent_id in entity_ids
+        ]
+        ordered_entity_ids.extend(entity_ids)
+    ordered_entity_ids = list(dict.fromkeys(ordered_entity_ids))
+
+    start_states = {}
+    if include_start_time_state:
+        for state in get_states(hass, start_time, entity_ids, filters=filters):
+            state.last_changed = start_time
+            state.last_updated = start_time
+            start_states[state.entity_id] = state
+
+    writer = _JSONListWriter(minimal_response)
+
+    def pages(criteria):
+        """Return the pages of states matching criteria."""
+        return _significant_states_pages(
+            hass, start_time, end_time, entity_ids, filters, minimal_response, criteria
+        )
+
+    # Entities in a given order are read one after the other, each with a
+    # cursor of its own.
+    for ent_id in ordered_entity_ids:
+        start_state = start_states.pop(ent_id, None)
+        if start_state is not None:
+            writer.add(start_state)
+        for states in pages(States.entity_id == ent_id):
+            for state in states:
+                writer.add(state)
+            yield from writer.chunks()
+
+    if entity_ids is None:
+        rest = None
+        if ordered_entity_ids:
+            rest = ~States.entity_id.in_(ordered_entity_ids)
+
+        # Entities that only have a state at start_time are merged in between
+        # the streamed entities to keep the entity order.
+        pending = deque(sorted(start_states))
+        for states in pages(rest):
+            for state in states:
+                if state.entity_id != writer.entity_id:
+                    while pending and pending[0] < state.entity_id:
+                        writer.add(start_states.pop(pending.popleft()))
+                    if pending and pending[0] == state.entity_id:
+                        writer.add(start_states.pop(pending.popleft()))
+                writer.add(state)
+            yield from writer.chunks()
+
+        for ent_id in pending:
+            writer.add(start_states.pop(ent_id))
+
+    writer.close()
+    yield from writer.chunks()
+
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        elapsed = time.perf_counter() - timer_start
+        _LOGGER.debug("Streamed %d states in %fs", writer.count, elapsed)
+
+
+def _significant_states_pages(
+    hass, start_time, end_time, entity_ids, filters, minimal_response, criteria=None
+):
+    """Yield the significant states of a period in pages.
+
+    The states matching criteria are read with one query ordered by entity,
+    STREAM_BATCH_SIZE rows at a time, every page continuing after the last
+    row of the one before. Every page is read in a session of its own, so no
+    database connection is held between pages and the pages can be read
+    from different threads.
+    """
+    order = (States.entity_id, States.last_updated, States.state_id)
+    after = ()
+
+    while True:
+        with session_scope(hass=hass) as session:
+            query = _significant_states_query(
+                session, start_time, end_time, entity_ids, filters, minimal_response
+            )
+            if criteria is not None:
+                query = query.filter(criteria)
+            if after:
+                query = query.filter(tuple_(*order) > tuple_(*after))
+            rows = query.order_by(*order).limit(STREAM_BATCH_SIZE).all()
+            if rows:
+                after = tuple(getattr(rows[-1], column.key) for column in order)
+            states = list(_rows_to_states(session, rows, minimal_response))
+
+        yield states
+
+        if len(rows) < STREAM_BATCH_SIZE:
+            return
+
+
+class _JSONListWriter:
+    """Encode a JSON list of state lists in chunks."""
+
+    def __init__(self, minimal_response=False):
+        """Initialize the writer."""
+        self._minimal_response = minimal_response
+        self._buffer = ["["]
+        self._size = 1
+        self._closed = False
+        self.entity_id = None
+        self.count = 0
+
+    def add(self, state):
+        """Add a state, a new list is started when the entity changes."""
+        if state.entity_id != self.entity_id:
+            self._add("[" if self.entity_id is None else "],[")
+            self.entity_id = state.entity_id
+            data = state
+        else:
+            self._add(",")
+            if self._minimal_response:
+                data = {"last_changed": state.last_changed, "state": state.state}
+            else:
+                data = state
+        self._add(json.dumps(data, sort_keys=True, cls=JSONEncoder, allow_nan=False))
+        self.count += 1
+
+    def close(self):
+        """Finish the list."""
+        self._add("]" if self.entity_id is None else "]]")
+        self._closed = True
+
+    def chunks(self):
+        """Yield the encoded chunks that are complete."""
+        if self._buffer and (self._closed or self._size >= STREAM_CHUNK_SIZE):
+            yield "".join(self._buffer).encode("UTF-8")
+            self._buffer = []
+            self._size = 0
+
+    def _add(self, data):
+        """Buffer data."""
+        self._buffer.append(data)
+        self._size += len(data)
+
+
+def state_changes_during_period(
+    hass, start_time, end_time=None, entity_id=None, minimal_response=False
+):
     """Return states changes during UTC period start_time - end_time."""
 
     with session_scope(hass=hass) as session:
-        query = session.query(States).filter(
+        if minimal_response:
+            query = session.query(*MINIMAL_COLUMNS)
+        else:
+            query = session.query(States)
+
+        query = query.filter(
             (States.last_changed == States.last_updated)
             & (States.last_updated > start_time)
         )
@@ -105,11 +514,15 @@ def state_changes_during_period(hass, start_time, end_time=None, entity_id=None)
             query = query.filter(States.last_updated < end_time)
 
         if entity_id is not None:
-            query = query.filter_by(entity_id=entity_id.lower())
+            query = query.filter(States.entity_id == entity_id.lower())
 
         entity_ids = [entity_id] if entity_id is not None else None
 
-        states = execute(query.order_by(States.last_updated))
+        query = query.order_by(States.last_updated)
+        if minimal_response:
+            states = list(_lazy_states(session, query))
+        else:
+            states = execute(query)
 
     return states_to_json(hass, states, start_time, entity_ids)
 
@@ -327,37 +740,35 @@ class HistoryPeriodView(HomeAssistantView):
         if entity_ids:
             entity_ids = entity_ids.lower().split(",")
         include_start_time_state = "skip_initial_state" not in request.query
+        minimal_response = "minimal_response" in request.query
 
         hass = request.app["hass"]
 
-        result = await hass.async_add_job(
-            get_significant_states,
-            hass,
-            start_time,
-            end_time,
-            entity_ids,
-            self.filters,
-            include_start_time_state,
+        first_entity_ids = None
+        # Optionally reorder the result to respect the ordering given
+        # by any entities explicitly included in the configuration.
+        if self.use_include_order:
+            first_entity_ids = self.filters.included_entities
+
+        response = await self.json_stream(
+            request,
+            stream_significant_states(
+                hass,
+                start_time,
+                end_time,
+                entity_ids,
+                self.filters,
+                include_start_time_state,
+                first_entity_ids,
+                minimal_response,
+            ),
         )
-        result = list(result.values())
+
         if _LOGGER.isEnabledFor(logging.DEBUG):
             elapsed = time.perf_counter() - timer_start
-            _LOGGER.debug("Extracted %d states in %fs", sum(map(len, result)), elapsed)
+            _LOGGER.debug("Returned history in %fs", elapsed)
 
-        # Optionally reorder the result to respect the ordering given
-        # by any entities explicitly included in the configuration.
-        if self.use_include_order:
-            sorted_result = []
-            for order_entity in self.filters.included_entities:
-                for state_list in result:
-                    if state_list[0].entity_id == order_entity:
-                        sorted_result.append(state_list)
-                        result.remove(state_list)
-                        break
-            sorted_result.extend(result)
-            result = sorted_result
-
-        return await hass.async_add_job(self.json, result)
+        return response
 
 
 class Filters:
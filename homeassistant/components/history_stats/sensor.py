@@ -211,7 +211,7 @@ class HistoryStatsSensor(Entity):
 
         # Get history between start and end
         history_list = history.state_changes_during_period(
-            self.hass, start, end, str(self._entity_id)
+            self.hass, start, end, str(self._entity_id), minimal_response=True
         )
 
         if self._entity_id not in history_list.keys():
@@ -5,6 +5,7 @@ import logging
 from typing import List, Optional
 
 from aiohttp import web
+from aiohttp.hdrs import CONTENT_TYPE
 from aiohttp.web_exceptions import (
     HTTPBadRequest,
     HTTPInternalServerError,
@@ -62,6 +63,28 @@ class HomeAssistantView:
         response.enable_compression()
         return response
 
+    @staticmethod
+    async def json_stream(request, chunks):
+        """Return a streamed JSON response.
+
+        chunks is an iterator of encoded chunks that may do I/O. Every chunk
+        is produced in an executor job of its own and written from the event
+        loop, so no executor thread waits on a slow client.
+        """
+        hass = request.app[KEY_HASS]
+        response = web.StreamResponse(headers={CONTENT_TYPE: CONTENT_TYPE_JSON})
+        response.enable_compression()
+        await response.prepare(request)
+
+        while True:
+            chunk = await hass.async_add_executor_job(next, chunks, None)
+            if chunk is None:
+                break
+            await response.write(chunk)
+
+        await response.write_eof()
+        return response
+
     def json_message(self, message, status_code=200, message_code=None, headers=None):
         """Return a JSON message response."""
         data = {"message": message}
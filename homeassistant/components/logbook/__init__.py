@@ -1,10 +1,11 @@
 """Event parser and human readable log generator."""
 from datetime import timedelta
 from itertools import groupby
+import json
 import logging
 import time
 
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import and_, case, null, or_, tuple_
 import voluptuous as vol
 
 from homeassistant.components import sun
@@ -16,15 +17,17 @@ from homeassistant.components.homekit.const import (
     EVENT_HOMEKIT_CHANGED,
 )
 from homeassistant.components.http import HomeAssistantView
-from homeassistant.components.recorder.models import Events, States
-from homeassistant.components.recorder.util import (
-    QUERY_RETRY_WAIT,
-    RETRIES,
-    session_scope,
+from homeassistant.components.recorder.models import (
+    Events,
+    StateAttributes,
+    States,
+    process_timestamp,
 )
+from homeassistant.components.recorder.util import session_scope
 from homeassistant.const import (
     ATTR_DOMAIN,
     ATTR_ENTITY_ID,
+    ATTR_FRIENDLY_NAME,
     ATTR_HIDDEN,
     ATTR_NAME,
     ATTR_SERVICE,
@@ -41,9 +44,10 @@ from homeassistant.const import (
     STATE_OFF,
     STATE_ON,
 )
-from homeassistant.core import DOMAIN as HA_DOMAIN, State, callback, split_entity_id
+from homeassistant.core import DOMAIN as HA_DOMAIN, Event, callback, split_entity_id
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entityfilter import generate_filter
+from homeassistant.helpers.json import JSONEncoder
 from homeassistant.loader import bind_hass
 import homeassistant.util.dt as dt_util
 
@@ -59,6 +63,11 @@ DOMAIN = "logbook"
 
 GROUP_BY_MINUTES = 15
 
+# Number of rows fetched from the database at once
+STREAM_BATCH_SIZE = 1000
+# Size in characters of the chunks written to a streamed response
+STREAM_CHUNK_SIZE = 65536
+
 CONFIG_SCHEMA = vol.Schema(
     {
         DOMAIN: vol.Schema(
@@ -181,13 +190,85 @@ class LogbookView(HomeAssistantView):
         end_day = start_day + timedelta(days=period)
         hass = request.app["hass"]
 
-        def json_events():
-            """Fetch events and generate JSON."""
-            return self.json(
-                _get_events(hass, self.config, start_day, end_day, entity_id)
+        return await self.json_stream(
+            request, _stream_events(hass, self.config, start_day, end_day, entity_id),
+        )
+
+
+class LogbookEvent:
+    """An event with only the fields needed to build a logbook entry.
+
+    State changed events carry the entity_id, state, domain and attributes of
+    the new state instead of the full event data.
+    """
+
+    __slots__ = [
+        "event_type",
+        "time_fired",
+        "context_id",
+        "context_user_id",
+        "data",
+        "entity_id",
+        "state",
+        "domain",
+        "attributes",
+    ]
+
+    def __init__(
+        self,
+        event_type,
+        time_fired,
+        context_id,
+        context_user_id,
+        data=None,
+        entity_id=None,
+        state=None,
+        domain=None,
+        attributes=None,
+    ):
+        """Initialize the logbook event."""
+        self.event_type = event_type
+        self.time_fired = time_fired
+        self.context_id = context_id
+        self.context_user_id = context_user_id
+        self.data = data if data is not None else {}
+        self.entity_id = entity_id
+        self.state = state
+        self.domain = domain
+        self.attributes = attributes if attributes is not None else {}
+
+    @classmethod
+    def from_event(cls, event):
+        """Create a logbook event from a core event."""
+        if event.event_type != EVENT_STATE_CHANGED:
+            return cls(
+                event.event_type,
+                event.time_fired,
+                event.context.id,
+                event.context.user_id,
+                event.data,
             )
 
-        return await hass.async_add_job(json_events)
+        new_state = event.data.get("new_state")
+        entity_id = new_state["entity_id"]
+        return cls(
+            event.event_type,
+            event.time_fired,
+            event.context.id,
+            event.context.user_id,
+            event.data,
+            entity_id,
+            new_state["state"],
+            split_entity_id(entity_id)[0],
+            new_state.get("attributes"),
+        )
+
+    @property
+    def name(self):
+        """Return the name of the entity of a state changed event."""
+        return self.attributes.get(ATTR_FRIENDLY_NAME) or split_entity_id(
+            self.entity_id
+        )[1].replace("_", " ")
 
 
 def humanify(hass, events):
@@ -199,6 +280,12 @@ def humanify(hass, events):
     """
     domain_prefixes = tuple(f"{dom}." for dom in CONTINUOUS_DOMAINS)
 
+    # Events from the database already are logbook events
+    events = (
+        LogbookEvent.from_event(event) if isinstance(event, Event) else event
+        for event in events
+    )
+
     # Track last states to filter out duplicates
     last_state = {}
 
@@ -219,7 +306,7 @@ def humanify(hass, events):
         # Process events
         for event in events_batch:
             if event.event_type == EVENT_STATE_CHANGED:
-                entity_id = event.data.get("entity_id")
+                entity_id = event.entity_id
 
                 if entity_id.startswith(domain_prefixes):
                     last_sensor_event[entity_id] = event
@@ -239,38 +326,38 @@ def humanify(hass, events):
         # Yield entries
         for event in events_batch:
             if event.event_type == EVENT_STATE_CHANGED:
-                to_state = State.from_dict(event.data.get("new_state"))
+                entity_id = event.entity_id
 
                 # Filter out states that become same state again (force_update=True)
                 # or light becoming different color
-                if last_state.get(to_state.entity_id) == to_state.state:
+                if last_state.get(entity_id) == event.state:
                     continue
 
-                last_state[to_state.entity_id] = to_state.state
+                last_state[entity_id] = event.state
 
-                domain = to_state.domain
+                domain = event.domain
 
                 # Skip all but the last sensor state
                 if (
                     domain in CONTINUOUS_DOMAINS
-                    and event != last_sensor_event[to_state.entity_id]
+                    and event is not last_sensor_event[entity_id]
                 ):
                     continue
 
                 # Don't show continuous sensor value changes in the logbook
-                if domain in CONTINUOUS_DOMAINS and to_state.attributes.get(
+                if domain in CONTINUOUS_DOMAINS and event.attributes.get(
                     "unit_of_measurement"
                 ):
                     continue
 
                 yield {
                     "when": event.time_fired,
-                    "name": to_state.name,
-                    "message": _entry_message_from_state(domain, to_state),
+                    "name": event.name,
+                    "message": _entry_message_from_state(domain, event),
                     "domain": domain,
-                    "entity_id": to_state.entity_id,
-                    "context_id": event.context.id,
-                    "context_user_id": event.context.user_id,
+                    "entity_id": entity_id,
+                    "context_id": event.context_id,
+                    "context_user_id": event.context_user_id,
                 }
 
             elif event.event_type == EVENT_HOMEASSISTANT_START:
@@ -282,8 +369,8 @@ def humanify(hass, events):
                     "name": "Home Assistant",
                     "message": "started",
                     "domain": HA_DOMAIN,
-                    "context_id": event.context.id,
-                    "context_user_id": event.context.user_id,
+                    "context_id": event.context_id,
+                    "context_user_id": event.context_user_id,
                 }
 
             elif event.event_type == EVENT_HOMEASSISTANT_STOP:
@@ -297,8 +384,8 @@ def humanify(hass, events):
                     "name": "Home Assistant",
                     "message": action,
                     "domain": HA_DOMAIN,
-                    "context_id": event.context.id,
-                    "context_user_id": event.context.user_id,
+                    "context_id": event.context_id,
+                    "context_user_id": event.context_user_id,
                 }
 
             elif event.event_type == EVENT_LOGBOOK_ENTRY:
@@ -316,8 +403,8 @@ def humanify(hass, events):
                     "message": event.data.get(ATTR_MESSAGE),
                     "domain": domain,
                     "entity_id": entity_id,
-                    "context_id": event.context.id,
-                    "context_user_id": event.context.user_id,
+                    "context_id": event.context_id,
+                    "context_user_id": event.context_user_id,
                 }
 
             elif event.event_type == EVENT_ALEXA_SMART_HOME:
@@ -337,8 +424,8 @@ def humanify(hass, events):
                     "message": message,
                     "domain": "alexa",
                     "entity_id": entity_id,
-                    "context_id": event.context.id,
-                    "context_user_id": event.context.user_id,
+                    "context_id": event.context_id,
+                    "context_user_id": event.context_user_id,
                 }
 
             elif event.event_type == EVENT_HOMEKIT_CHANGED:
@@ -355,8 +442,8 @@ def humanify(hass, events):
                     "message": message,
                     "domain": DOMAIN_HOMEKIT,
                     "entity_id": entity_id,
-                    "context_id": event.context.id,
-                    "context_user_id": event.context.user_id,
+                    "context_id": event.context_id,
+                    "context_user_id": event.context_user_id,
                 }
 
             elif event.event_type == EVENT_AUTOMATION_TRIGGERED:
@@ -366,8 +453,8 @@ def humanify(hass, events):
                     "message": "has been triggered",
                     "domain": "automation",
                     "entity_id": event.data.get(ATTR_ENTITY_ID),
-                    "context_id": event.context.id,
-                    "context_user_id": event.context.user_id,
+                    "context_id": event.context_id,
+                    "context_user_id": event.context_user_id,
                 }
 
             elif event.event_type == EVENT_SCRIPT_STARTED:
@@ -377,38 +464,13 @@ def humanify(hass, events):
                     "message": "started",
                     "domain": "script",
                     "entity_id": event.data.get(ATTR_ENTITY_ID),
-                    "context_id": event.context.id,
-                    "context_user_id": event.context.user_id,
+                    "context_id": event.context_id,
+                    "context_user_id": event.context_user_id,
                 }
 
 
-def _get_related_entity_ids(session, entity_filter):
-    timer_start = time.perf_counter()
-
-    query = session.query(States).with_entities(States.entity_id).distinct()
-
-    for tryno in range(0, RETRIES):
-        try:
-            result = [row.entity_id for row in query if entity_filter(row.entity_id)]
-
-            if _LOGGER.isEnabledFor(logging.DEBUG):
-                elapsed = time.perf_counter() - timer_start
-                _LOGGER.debug(
-                    "fetching %d distinct domain/entity_id pairs took %fs",
-                    len(result),
-                    elapsed,
-                )
-
-            return result
-        except SQLAlchemyError as err:
-            _LOGGER.error("Error executing query: %s", err)
-
-            if tryno == RETRIES - 1:
-                raise
-            time.sleep(QUERY_RETRY_WAIT)
-
-
-def _generate_filter_from_config(config):
+def _get_filter_lists(config):
+    """Return the included and excluded domains and entities of a config."""
     excluded_entities = []
     excluded_domains = []
     included_entities = []
@@ -423,86 +485,243 @@ def _generate_filter_from_config(config):
         included_entities = include.get(CONF_ENTITIES, [])
         included_domains = include.get(CONF_DOMAINS, [])
 
-    return generate_filter(
-        included_domains, included_entities, excluded_domains, excluded_entities
-    )
+    return included_domains, included_entities, excluded_domains, excluded_entities
 
 
-def _get_events(hass, config, start_day, end_day, entity_id=None):
-    """Get events for a period of time."""
-    entities_filter = _generate_filter_from_config(config)
+def _generate_filter_from_config(config):
+    return generate_filter(*_get_filter_lists(config))
 
-    def yield_events(query):
-        """Yield Events that are not filtered away."""
-        for row in query.yield_per(500):
-            event = row.to_native()
-            if _keep_event(event, entities_filter):
-                yield event
 
+def _generate_sql_filter_from_config(config):
+    """Return the entity filter of a config as a clause on States.
+
+    Follows the cases of generate_filter, None when all entities pass.
+    """
+    include_d, include_e, exclude_d, exclude_e = _get_filter_lists(config)
+    have_exclude = bool(exclude_e or exclude_d)
+    have_include = bool(include_e or include_d)
+
+    if not have_include and not have_exclude:
+        return None
+
+    if have_include and not have_exclude:
+        return or_(States.entity_id.in_(include_e), States.domain.in_(include_d))
+
+    if not have_include and have_exclude:
+        return and_(States.entity_id.notin_(exclude_e), States.domain.notin_(exclude_d))
+
+    if include_d:
+        return or_(
+            and_(States.domain.in_(include_d), States.entity_id.notin_(exclude_e)),
+            and_(States.domain.notin_(include_d), States.entity_id.in_(include_e)),
+        )
+
+    if exclude_d:
+        return or_(
+            and_(States.domain.in_(exclude_d), States.entity_id.in_(include_e)),
+            and_(States.domain.notin_(exclude_d), States.entity_id.notin_(exclude_e)),
+        )
+
+    return States.entity_id.in_(include_e)
+
+
+def _get_events(hass, config, start_day, end_day, entity_id=None):
+    """Get events for a period of time."""
     with session_scope(hass=hass) as session:
-        if entity_id is not None:
-            entity_ids = [entity_id.lower()]
-        else:
-            entity_ids = _get_related_entity_ids(session, entities_filter)
-
-        query = (
-            session.query(Events)
-            .order_by(Events.time_fired)
-            .outerjoin(States, (Events.event_id == States.event_id))
-            .filter(Events.event_type.in_(ALL_EVENT_TYPES))
-            .filter((Events.time_fired > start_day) & (Events.time_fired < end_day))
-            .filter(
-                (
-                    (States.last_updated == States.last_changed)
-                    & States.entity_id.in_(entity_ids)
-                )
-                | (States.state_id.is_(None))
+        return list(
+            humanify(
+                hass, _yield_events(session, config, start_day, end_day, entity_id),
             )
         )
 
-        return list(humanify(hass, yield_events(query)))
 
+def _stream_events(hass, config, start_day, end_day, entity_id=None):
+    """Yield the entries for a period of time as a JSON list in chunks."""
+    timer_start = time.perf_counter()
+    count = 0
+    buffer = ["["]
+    size = 1
+
+    for entry in humanify(
+        hass, _event_pages(hass, config, start_day, end_day, entity_id)
+    ):
+        data = json.dumps(entry, cls=JSONEncoder, allow_nan=False)
+        if count:
+            data = f",{data}"
+        buffer.append(data)
+        size += len(data)
+        count += 1
+
+        if size >= STREAM_CHUNK_SIZE:
+            yield "".join(buffer).encode("UTF-8")
+            buffer = []
+            size = 0
+
+    buffer.append("]")
+    yield "".join(buffer).encode("UTF-8")
+
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        elapsed = time.perf_counter() - timer_start
+        _LOGGER.debug("Streamed %d logbook entries in %fs", count, elapsed)
+
+
+def _yield_events(session, config, start_day, end_day, entity_id=None):
+    """Yield the logbook events of a period of time that are not filtered away."""
+    query = _events_query(session, config, start_day, end_day, entity_id)
+    yield from _rows_to_events(
+        query.yield_per(STREAM_BATCH_SIZE), _generate_filter_from_config(config), {}
+    )
 
-def _keep_event(event, entities_filter):
-    domain, entity_id = None, None
 
-    if event.event_type == EVENT_STATE_CHANGED:
-        entity_id = event.data.get("entity_id")
+def _event_pages(hass, config, start_day, end_day, entity_id=None):
+    """Yield the logbook events of a period of time, read in pages.
 
-        if entity_id is None:
-            return False
+    Every page of STREAM_BATCH_SIZE rows is read in a session of its own, so
+    no database connection is held between pages and the events can be read
+    from different threads.
+    """
+    entities_filter = _generate_filter_from_config(config)
+    attributes_cache = {}
+    order = (Events.time_fired, Events.event_id)
+    after = ()
 
-        # Do not report on new entities
-        if event.data.get("old_state") is None:
-            return False
+    while True:
+        with session_scope(hass=hass) as session:
+            query = _events_query(session, config, start_day, end_day, entity_id)
+            if after:
+                query = query.filter(tuple_(*order) > tuple_(*after))
+            rows = query.limit(STREAM_BATCH_SIZE).all()
 
-        new_state = event.data.get("new_state")
+        yield from _rows_to_events(rows, entities_filter, attributes_cache)
+
+        if len(rows) < STREAM_BATCH_SIZE:
+            return
+        after = (rows[-1].time_fired, rows[-1].event_id)
+
+
+def _events_query(session, config, start_day, end_day, entity_id=None):
+    """Return the query for the logbook events of a period of time.
+
+    State changed events are filtered in the database, only the columns of
+    the new state the logbook uses are selected. Other events are decoded
+    and filtered by _keep_event.
+    """
+    # Only state changes with a value change that are not the addition or
+    # removal of an entity. New entities have no old state and removed
+    # entities are recorded with an empty state.
+    state_changed = and_(
+        States.last_updated == States.last_changed,
+        States.old_state_id.isnot(None),
+        States.state != "",
+    )
+    if entity_id is not None:
+        state_changed = and_(state_changed, States.entity_id == entity_id.lower())
+    else:
+        entity_filter = _generate_sql_filter_from_config(config)
+        if entity_filter is not None:
+            state_changed = and_(state_changed, entity_filter)
+
+    return (
+        session.query(
+            Events.event_id,
+            Events.event_type,
+            # The event data of state changes is not needed
+            case(
+                [(Events.event_type == EVENT_STATE_CHANGED, null())],
+                else_=Events.event_data,
+            ).label("event_data"),
+            Events.time_fired,
+            Events.context_id,
+            Events.context_user_id,
+            States.entity_id,
+            States.domain,
+            States.state,
+            States.attributes,
+            States.attributes_id,
+            StateAttributes.shared_attrs,
+        )
+        .order_by(Events.time_fired, Events.event_id)
+        .outerjoin(States, Events.event_id == States.event_id)
+        .outerjoin(
+            StateAttributes, States.attributes_id == StateAttributes.attributes_id
+        )
+        .filter(Events.event_type.in_(ALL_EVENT_TYPES))
+        .filter((Events.time_fired > start_day) & (Events.time_fired < end_day))
+        .filter(
+            or_(
+                and_(Events.event_type == EVENT_STATE_CHANGED, state_changed),
+                and_(
+                    Events.event_type != EVENT_STATE_CHANGED, States.state_id.is_(None),
+                ),
+            )
+        )
+    )
 
-        # Do not report on entity removal
-        if not new_state:
-            return False
 
-        attributes = new_state.get("attributes", {})
+def _rows_to_events(rows, entities_filter, attributes_cache):
+    """Convert rows to logbook events and skip those that are filtered away.
 
-        # If last_changed != last_updated only attributes have changed
-        # we do not report on that yet.
-        last_changed = new_state.get("last_changed")
-        last_updated = new_state.get("last_updated")
-        if last_changed != last_updated:
-            return False
+    attributes_cache holds the decoded attributes by attributes_id.
+    """
+    for row in rows:
+        if row.event_type != EVENT_STATE_CHANGED:
+            event = LogbookEvent(
+                row.event_type,
+                process_timestamp(row.time_fired),
+                row.context_id,
+                row.context_user_id,
+                _decode(row.event_data),
+            )
+            if _keep_event(event, entities_filter):
+                yield event
+            continue
 
-        domain = split_entity_id(entity_id)[0]
+        if row.attributes is not None or row.attributes_id is None:
+            attributes = _decode(row.attributes or "{}")
+        else:
+            attributes = attributes_cache.get(row.attributes_id)
+            if attributes is None:
+                attributes = _decode(row.shared_attrs or "{}")
+                attributes_cache[row.attributes_id] = attributes
 
         # Also filter auto groups.
-        if domain == "group" and attributes.get("auto", False):
-            return False
+        if row.domain == "group" and attributes.get("auto", False):
+            continue
 
         # exclude entities which are customized hidden
-        hidden = attributes.get(ATTR_HIDDEN, False)
-        if hidden:
-            return False
+        if attributes.get(ATTR_HIDDEN, False):
+            continue
+
+        yield LogbookEvent(
+            row.event_type,
+            process_timestamp(row.time_fired),
+            row.context_id,
+            row.context_user_id,
+            entity_id=row.entity_id,
+            state=row.state,
+            domain=row.domain,
+            attributes=attributes,
+        )
+
+
+def _decode(data):
+    """Decode serialized event data or attributes."""
+    try:
+        return json.loads(data)
+    except ValueError:
+        # When json.loads fails
+        _LOGGER.exception("Error decoding: %s", data)
+        return {}
+
+
+def _keep_event(event, entities_filter):
+    """Test if an event that is not a state change is part of the logbook.
+
+    State changes are filtered in the database by _events_query.
+    """
+    domain, entity_id = None, None
 
-    elif event.event_type == EVENT_LOGBOOK_ENTRY:
+    if event.event_type == EVENT_LOGBOOK_ENTRY:
         domain = event.data.get(ATTR_DOMAIN)
         entity_id = event.data.get(ATTR_ENTITY_ID)
 
@@ -1,6 +1,7 @@
 """Support for MQTT message handling."""
 import asyncio
-from functools import partial, wraps
+from collections import deque
+from functools import lru_cache, partial, wraps
 import inspect
 from itertools import groupby
 import json
@@ -10,8 +11,9 @@ import os
 import socket
 import ssl
 import sys
+import threading
 import time
-from typing import Any, Callable, List, Optional, Union
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
 
 import attr
 import requests.certs
@@ -123,6 +125,12 @@ ATTR_RETAIN = CONF_RETAIN
 
 MAX_RECONNECT_WAIT = 300  # seconds
 
+# Number of topics for which the matching subscriptions are cached
+MATCH_CACHE_SIZE = 4096
+
+# Maximum number of received messages handled in one event loop iteration
+MAX_MESSAGE_BATCH = 1000
+
 CONNECTION_SUCCESS = "connection_success"
 CONNECTION_FAILED = "connection_failed"
 CONNECTION_FAILED_RECOVERABLE = "connection_failed_recoverable"
@@ -765,12 +773,22 @@ class MQTT:
         # should be able to optionally rely on MQTT.
         # pylint: disable=import-outside-toplevel
         import paho.mqtt.client as mqtt
+        from paho.mqtt.matcher import MQTTMatcher
 
         self.hass = hass
         self.broker = broker
         self.port = port
         self.keepalive = keepalive
         self.subscriptions: List[Subscription] = []
+        # Topic filter trie holding a list of subscriptions per filter
+        self._matcher = MQTTMatcher()
+        self._matching_subscriptions = lru_cache(maxsize=MATCH_CACHE_SIZE)(
+            self._match_subscriptions
+        )
+        # Messages received by the paho thread waiting for the event loop
+        self._pending_messages: Deque = deque()
+        self._pending_lock = threading.Lock()
+        self._pending_scheduled = False
         self.birth_message = birth_message
         self.connected = False
         self._mqttc: mqtt.Client = None
@@ -866,6 +884,7 @@ class MQTT:
 
         subscription = Subscription(topic, msg_callback, qos, encoding)
         self.subscriptions.append(subscription)
+        self._async_track_subscription(subscription)
 
         await self._async_perform_subscription(topic, qos)
 
@@ -876,7 +895,7 @@ class MQTT:
                 raise HomeAssistantError("Can't remove subscription twice")
             self.subscriptions.remove(subscription)
 
-            if any(other.topic == topic for other in self.subscriptions):
+            if self._async_untrack_subscription(subscription):
                 # Other subscriptions on topic remaining - don't unsubscribe.
                 return
 
@@ -886,6 +905,36 @@ class MQTT:
 
         return async_remove
 
+    @callback
+    def _async_track_subscription(self, subscription: Subscription) -> None:
+        """Add a subscription to the topic filter trie."""
+        try:
+            self._matcher[subscription.topic].append(subscription)
+        except KeyError:
+            self._matcher[subscription.topic] = [subscription]
+        self._matching_subscriptions.cache_clear()
+
+    @callback
+    def _async_untrack_subscription(self, subscription: Subscription) -> bool:
+        """Remove a subscription from the topic filter trie.
+
+        Return if other subscriptions on the same topic remain.
+        """
+        subscriptions = self._matcher[subscription.topic]
+        subscriptions.remove(subscription)
+        if not subscriptions:
+            del self._matcher[subscription.topic]
+        self._matching_subscriptions.cache_clear()
+        return bool(subscriptions)
+
+    def _match_subscriptions(self, topic: str) -> Tuple[Subscription, ...]:
+        """Return the subscriptions matching a topic."""
+        return tuple(
+            subscription
+            for subscriptions in self._matcher.iter_match(topic)
+            for subscription in subscriptions
+        )
+
     async def _async_unsubscribe(self, topic: str) -> None:
         """Unsubscribe from a topic.
 
@@ -943,8 +992,33 @@ class MQTT:
             )
 
     def _mqtt_on_message(self, _mqttc, _userdata, msg) -> None:
-        """Message received callback."""
-        self.hass.add_job(self._mqtt_handle_message, msg)
+        """Message received callback.
+
+        Messages are buffered and handed to the event loop in batches.
+        """
+        with self._pending_lock:
+            self._pending_messages.append(msg)
+            if self._pending_scheduled:
+                return
+            self._pending_scheduled = True
+        self.hass.loop.call_soon_threadsafe(self._async_handle_pending_messages)
+
+    @callback
+    def _async_handle_pending_messages(self) -> None:
+        """Handle a batch of the messages received by the paho thread."""
+        with self._pending_lock:
+            pending = self._pending_messages
+            messages = [
+                pending.popleft() for _ in range(min(len(pending), MAX_MESSAGE_BATCH))
+            ]
+            if pending:
+                # Give other jobs a chance to run before the next batch
+                self.hass.loop.call_soon(self._async_handle_pending_messages)
+            else:
+                self._pending_scheduled = False
+
+        for msg in messages:
+            self._mqtt_handle_message(msg)
 
     @callback
     def _mqtt_handle_message(self, msg) -> None:
@@ -955,27 +1029,19 @@ class MQTT:
             msg.payload,
         )
 
-        for subscription in self.subscriptions:
-            if not _match_topic(subscription.topic, msg.topic):
-                continue
-
-            payload: SubscribePayloadType = msg.payload
-            if subscription.encoding is not None:
-                try:
-                    payload = msg.payload.decode(subscription.encoding)
-                except (AttributeError, UnicodeDecodeError):
-                    _LOGGER.warning(
-                        "Can't decode payload %s on %s with encoding %s (for %s)",
-                        msg.payload,
-                        msg.topic,
-                        subscription.encoding,
-                        subscription.callback,
-                    )
-                    continue
-
-            self.hass.async_run_job(
-                subscription.callback, Message(msg.topic, payload, msg.qos, msg.retain)
-            )
+        # Payloads are decoded once per encoding
+        messages: Dict[Optional[str], Optional[Message]] = {}
+
+        for subscription in self._matching_subscriptions(msg.topic):
+            try:
+                message = messages[subscription.encoding]
+            except KeyError:
+                message = messages[subscription.encoding] = _decode_message(
+                    msg, subscription
+                )
+
+            if message is not None:
+                self.hass.async_run_job(subscription.callback, message)
 
     def _mqtt_on_disconnect(self, _mqttc, _userdata, result_code: int) -> None:
         """Disconnected callback."""
@@ -1007,6 +1073,25 @@ class MQTT:
             tries += 1
 
 
+def _decode_message(msg, subscription: Subscription) -> Optional[Message]:
+    """Return the message with its payload decoded for a subscription."""
+    payload: SubscribePayloadType = msg.payload
+    if subscription.encoding is not None:
+        try:
+            payload = msg.payload.decode(subscription.encoding)
+        except (AttributeError, UnicodeDecodeError):
+            _LOGGER.warning(
+                "Can't decode payload %s on %s with encoding %s (for %s)",
+                msg.payload,
+                msg.topic,
+                subscription.encoding,
+                subscription.callback,
+            )
+            return None
+
+    return Message(msg.topic, payload, msg.qos, msg.retain)
+
+
 def _raise_on_error(result_code: int) -> None:
     """Raise error if error result."""
     # pylint: disable=import-outside-toplevel
@@ -1018,20 +1103,6 @@ def _raise_on_error(result_code: int) -> None:
         )
 
 
-def _match_topic(subscription: str, topic: str) -> bool:
-    """Test if topic matches subscription."""
-    # pylint: disable=import-outside-toplevel
-    from paho.mqtt.matcher import MQTTMatcher
-
-    matcher = MQTTMatcher()
-    matcher[subscription] = True
-    try:
-        next(matcher.iter_match(topic))
-        return True
-    except StopIteration:
-        return False
-
-
 class MqttAttributes(Entity):
     """Mixin used for platforms that support JSON attributes."""
 
@@ -1199,7 +1270,7 @@ class MqttDiscoveryUpdate(Entity):
     async def async_removed_from_registry(self) -> None:
         """Clear retained discovery topic in broker."""
         discovery_topic = self._discovery_data[ATTR_DISCOVERY_TOPIC]
-        publish(
+        async_publish(
             self.hass, discovery_topic, "", retain=True,
         )
 
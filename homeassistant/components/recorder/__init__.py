@@ -1,6 +1,6 @@
 """Support for recording details."""
 import asyncio
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 import concurrent.futures
 from datetime import datetime, timedelta
 import logging
@@ -8,7 +8,7 @@ import queue
 from sqlite3 import Connection
 import threading
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from sqlalchemy import create_engine, exc
 from sqlalchemy.engine import Engine
@@ -30,7 +30,7 @@ from homeassistant.const import (
     EVENT_TIME_CHANGED,
     MATCH_ALL,
 )
-from homeassistant.core import CoreState, HomeAssistant, callback
+from homeassistant.core import CoreState, Event, HomeAssistant, callback
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entityfilter import generate_filter
 from homeassistant.helpers.typing import ConfigType
@@ -38,7 +38,7 @@ import homeassistant.util.dt as dt_util
 
 from . import migration, purge
 from .const import DATA_INSTANCE
-from .models import Base, Events, RecorderRuns, States
+from .models import Base, Events, RecorderRuns, StateAttributes, States
 from .util import session_scope
 
 _LOGGER = logging.getLogger(__name__)
@@ -61,6 +61,8 @@ DEFAULT_URL = "sqlite:///{hass_config_path}"
 DEFAULT_DB_FILE = "home-assistant_v2.db"
 DEFAULT_DB_MAX_RETRIES = 10
 DEFAULT_DB_RETRY_WAIT = 3
+DEFAULT_COMMIT_INTERVAL = 1
+STATE_ATTRIBUTES_ID_CACHE_SIZE = 2048
 
 CONF_DB_URL = "db_url"
 CONF_DB_MAX_RETRIES = "db_max_retries"
@@ -68,6 +70,7 @@ CONF_DB_RETRY_WAIT = "db_retry_wait"
 CONF_PURGE_KEEP_DAYS = "purge_keep_days"
 CONF_PURGE_INTERVAL = "purge_interval"
 CONF_EVENT_TYPES = "event_types"
+CONF_COMMIT_INTERVAL = "commit_interval"
 
 FILTER_SCHEMA = vol.Schema(
     {
@@ -97,6 +100,9 @@ CONFIG_SCHEMA = vol.Schema(
                 vol.Optional(CONF_PURGE_INTERVAL, default=1): vol.All(
                     vol.Coerce(int), vol.Range(min=0)
                 ),
+                vol.Optional(
+                    CONF_COMMIT_INTERVAL, default=DEFAULT_COMMIT_INTERVAL
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
                 vol.Optional(CONF_DB_URL): cv.string,
                 vol.Optional(
                     CONF_DB_MAX_RETRIES, default=DEFAULT_DB_MAX_RETRIES
@@ -141,6 +147,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     conf = config[DOMAIN]
     keep_days = conf.get(CONF_PURGE_KEEP_DAYS)
     purge_interval = conf.get(CONF_PURGE_INTERVAL)
+    commit_interval = conf[CONF_COMMIT_INTERVAL]
     db_max_retries = conf[CONF_DB_MAX_RETRIES]
     db_retry_wait = conf[CONF_DB_RETRY_WAIT]
 
@@ -154,6 +161,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         hass=hass,
         keep_days=keep_days,
         purge_interval=purge_interval,
+        commit_interval=commit_interval,
         uri=db_url,
         db_max_retries=db_max_retries,
         db_retry_wait=db_retry_wait,
@@ -171,9 +179,24 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         DOMAIN, SERVICE_PURGE, async_handle_purge_service, schema=SERVICE_PURGE_SCHEMA
     )
 
+    hass.components.system_health.async_register_info(DOMAIN, system_health_info)
+
     return await instance.async_db_ready
 
 
+async def system_health_info(hass):
+    """Get info for the info page."""
+    progress = hass.data[DATA_INSTANCE].purge_progress
+    return {
+        "purge_running": progress.running,
+        "purge_before": progress.purge_before,
+        "purge_batches": progress.batches,
+        "purged_states": progress.states,
+        "purged_events": progress.events,
+        "purged_state_attributes": progress.state_attributes,
+    }
+
+
 PurgeTask = namedtuple("PurgeTask", ["keep_days", "repack"])
 
 
@@ -185,6 +208,7 @@ class Recorder(threading.Thread):
         hass: HomeAssistant,
         keep_days: int,
         purge_interval: int,
+        commit_interval: int,
         uri: str,
         db_max_retries: int,
         db_retry_wait: int,
@@ -197,6 +221,7 @@ class Recorder(threading.Thread):
         self.hass = hass
         self.keep_days = keep_days
         self.purge_interval = purge_interval
+        self.commit_interval = commit_interval
         self.queue: Any = queue.Queue()
         self.recording_start = dt_util.utcnow()
         self.db_url = uri
@@ -215,6 +240,12 @@ class Recorder(threading.Thread):
         self.exclude_t = exclude.get(CONF_EVENT_TYPES, [])
 
         self.get_session = None
+        self._pending_events: List[Event] = []
+        self._commit_deadline = 0.0
+        self._state_attributes_ids: OrderedDict = OrderedDict()
+        # Id of the last recorded state of each entity
+        self._old_state_ids: Dict[str, int] = {}
+        self.purge_progress = purge.PurgeProgress()
 
     @callback
     def async_initialize(self):
@@ -327,15 +358,24 @@ class Recorder(threading.Thread):
             self.hass.helpers.event.track_point_in_time(async_purge, run)
 
         while True:
-            event = self.queue.get()
+            try:
+                event = self._get_next_task()
+            except queue.Empty:
+                self._commit_pending_events()
+                continue
 
             if event is None:
+                self._commit_pending_events()
                 self._close_run()
                 self._close_connection()
                 self.queue.task_done()
                 return
             if isinstance(event, PurgeTask):
-                purge.purge_old_data(self, event.keep_days, event.repack)
+                self._commit_pending_events()
+                # Purge in batches, queue the rest behind the pending events
+                if not purge.purge_old_data(self, event.keep_days, event.repack):
+                    self.queue.put(event)
+                self._state_attributes_ids.clear()
                 self.queue.task_done()
                 continue
             if event.event_type == EVENT_TIME_CHANGED:
@@ -351,54 +391,177 @@ class Recorder(threading.Thread):
                     self.queue.task_done()
                     continue
 
-            tries = 1
-            updated = False
-            while not updated and tries <= self.db_max_retries:
-                if tries != 1:
-                    time.sleep(self.db_retry_wait)
-                try:
-                    with session_scope(session=self.get_session()) as session:
-                        try:
-                            dbevent = Events.from_event(event)
-                            session.add(dbevent)
-                            session.flush()
-                        except (TypeError, ValueError):
-                            _LOGGER.warning("Event is not JSON serializable: %s", event)
-
-                        if event.event_type == EVENT_STATE_CHANGED:
-                            try:
-                                dbstate = States.from_event(event)
-                                dbstate.event_id = dbevent.event_id
-                                session.add(dbstate)
-                            except (TypeError, ValueError):
-                                _LOGGER.warning(
-                                    "State is not JSON serializable: %s",
-                                    event.data.get("new_state"),
-                                )
-
-                    updated = True
-
-                except exc.OperationalError as err:
-                    _LOGGER.error(
-                        "Error in database connectivity: %s. "
-                        "(retrying in %s seconds)",
-                        err,
-                        self.db_retry_wait,
-                    )
-                    tries += 1
+            if not self._pending_events:
+                self._commit_deadline = time.monotonic() + self.commit_interval
+            self._pending_events.append(event)
+
+    def _get_next_task(self):
+        """Get the next task from the queue.
+
+        Raises queue.Empty when pending events are due to be committed.
+        """
+        if not self._pending_events:
+            return self.queue.get()
+
+        timeout = self._commit_deadline - time.monotonic()
+        if timeout <= 0:
+            raise queue.Empty
+        return self.queue.get(timeout=timeout)
 
-                except exc.SQLAlchemyError:
-                    updated = True
-                    _LOGGER.exception("Error saving event: %s", event)
+    def _commit_pending_events(self):
+        """Write all pending events to the database in one transaction."""
+        if not self._pending_events:
+            return
+
+        events = self._pending_events
+        self._pending_events = []
+
+        self._save_events(events)
 
-            if not updated:
+        for _ in events:
+            self.queue.task_done()
+
+    def _save_events(self, events):
+        """Save events and their states, retrying on connectivity errors."""
+        tries = 1
+        updated = False
+        while not updated and tries <= self.db_max_retries:
+            if tries != 1:
+                time.sleep(self.db_retry_wait)
+            try:
+                with session_scope(session=self.get_session()) as session:
+                    new_attributes = {}
+                    new_states = {}
+                    rows = []
+                    for event in events:
+                        rows.extend(
+                            self._event_rows(session, event, new_attributes, new_states)
+                        )
+                    session.add_all(rows)
+                    session.flush()
+
+                    for shared_attrs, db_attributes in new_attributes.items():
+                        self._cache_state_attributes_id(
+                            shared_attrs, db_attributes.attributes_id
+                        )
+                    for entity_id, dbstate in new_states.items():
+                        if dbstate is None:
+                            self._old_state_ids.pop(entity_id, None)
+                        else:
+                            self._old_state_ids[entity_id] = dbstate.state_id
+
+                updated = True
+
+            except exc.OperationalError as err:
+                self._state_attributes_ids.clear()
                 _LOGGER.error(
-                    "Error in database update. Could not save "
-                    "after %d tries. Giving up",
-                    tries,
+                    "Error in database connectivity: %s. (retrying in %s seconds)",
+                    err,
+                    self.db_retry_wait,
                 )
+                tries += 1
 
-            self.queue.task_done()
+            except exc.SQLAlchemyError:
+                self._state_attributes_ids.clear()
+                updated = True
+                if len(events) > 1:
+                    # Save events one by one so a single bad event
+                    # does not take the whole batch down with it.
+                    for event in events:
+                        self._save_events([event])
+                else:
+                    _LOGGER.exception("Error saving event: %s", events[0])
+
+        if not updated:
+            _LOGGER.error(
+                "Error in database update. Could not save after %d tries. Giving up",
+                tries,
+            )
+
+    def _event_rows(self, session, event, new_attributes, new_states):
+        """Return the database rows to insert for an event.
+
+        The last state of every entity in the batch is collected in
+        new_states, None when the entity was removed.
+        """
+        try:
+            dbevent = Events.from_event(event)
+        except (TypeError, ValueError):
+            _LOGGER.warning("Event is not JSON serializable: %s", event)
+            return []
+
+        if event.event_type != EVENT_STATE_CHANGED:
+            return [dbevent]
+
+        try:
+            dbstate = States.from_event(event)
+        except (TypeError, ValueError):
+            _LOGGER.warning(
+                "State is not JSON serializable: %s", event.data.get("new_state"),
+            )
+            return [dbevent]
+
+        dbstate.event = dbevent
+        self._set_state_attributes(session, dbstate, new_attributes)
+
+        entity_id = dbstate.entity_id
+        if event.data.get("old_state") is not None:
+            if entity_id in new_states:
+                dbstate.old_state = new_states[entity_id]
+            else:
+                dbstate.old_state_id = self._old_state_ids.get(entity_id)
+        if event.data.get("new_state") is None:
+            new_states[entity_id] = None
+        else:
+            new_states[entity_id] = dbstate
+
+        return [dbevent, dbstate]
+
+    def _set_state_attributes(self, session, dbstate, new_attributes):
+        """Point a state row at its shared attributes row.
+
+        Attributes rows that do not exist yet are collected in new_attributes
+        and inserted together with the rest of the batch.
+        """
+        shared_attrs = dbstate.attributes
+        dbstate.attributes = None
+        cache = self._state_attributes_ids
+
+        attributes_id = cache.get(shared_attrs)
+        if attributes_id is not None:
+            cache.move_to_end(shared_attrs)
+            dbstate.attributes_id = attributes_id
+            return
+
+        db_attributes = new_attributes.get(shared_attrs)
+        if db_attributes is not None:
+            dbstate.state_attributes = db_attributes
+            return
+
+        attr_hash = StateAttributes.hash_shared_attrs(shared_attrs)
+
+        # Do not flush the pending rows of the batch just to look this up
+        with session.no_autoflush:
+            for db_attributes in session.query(StateAttributes).filter(
+                StateAttributes.hash == attr_hash
+            ):
+                if db_attributes.shared_attrs == shared_attrs:
+                    self._cache_state_attributes_id(
+                        shared_attrs, db_attributes.attributes_id
+                    )
+                    dbstate.attributes_id = db_attributes.attributes_id
+                    return
+
+        db_attributes = StateAttributes(hash=attr_hash, shared_attrs=shared_attrs)
+        new_attributes[shared_attrs] = db_attributes
+        dbstate.state_attributes = db_attributes
+
+    def _cache_state_attributes_id(self, shared_attrs, attributes_id):
+        """Remember the id of a shared attributes row."""
+        cache = self._state_attributes_ids
+        cache[shared_attrs] = attributes_id
+        if len(cache) > STATE_ATTRIBUTES_ID_CACHE_SIZE:
+            cache.popitem(last=False)
 
     @callback
     def event_listener(self, event):
@@ -416,11 +579,13 @@ class Recorder(threading.Thread):
         # pylint: disable=unused-variable
         @listens_for(Engine, "connect")
         def set_sqlite_pragma(dbapi_connection, connection_record):
-            """Set sqlite's WAL mode."""
+            """Set sqlite's WAL mode and incremental vacuum for new databases."""
             if isinstance(dbapi_connection, Connection):
                 old_isolation = dbapi_connection.isolation_level
                 dbapi_connection.isolation_level = None
                 cursor = dbapi_connection.cursor()
+                # Only takes effect before the first table is created
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
                 cursor.execute("PRAGMA journal_mode=WAL")
                 cursor.close()
                 dbapi_connection.isolation_level = old_isolation
@@ -11,6 +11,8 @@ from .util import session_scope
 
 _LOGGER = logging.getLogger(__name__)
 PROGRESS_FILE = ".migration_progress"
+# Number of states linked to their old state at once
+LINK_OLD_STATES_BATCH_SIZE = 1000
 
 
 def migrate_schema(instance):
@@ -199,6 +201,54 @@ def _add_columns(engine, table_name, columns_def):
             )
 
 
+def _link_old_states(engine):
+    """Link existing states to the previous state of their entity.
+
+    States of new entities are not linked. Their events were written with
+    the default separators of the JSONEncoder, so they can be told apart by
+    their event data this once.
+    """
+    last_state_ids = {}
+    after = 0
+
+    while True:
+        rows = engine.execute(
+            text(
+                "SELECT states.state_id, states.entity_id, states.state, "
+                "events.event_data LIKE :new_entity "
+                "FROM states LEFT JOIN events ON states.event_id = events.event_id "
+                "WHERE states.state_id > :after "
+                "ORDER BY states.state_id LIMIT :limit"
+            ),
+            new_entity='%"old_state": null%',
+            after=after,
+            limit=LINK_OLD_STATES_BATCH_SIZE,
+        ).fetchall()
+        if not rows:
+            return
+
+        links = []
+        for state_id, entity_id, state, new_entity in rows:
+            old_state_id = last_state_ids.get(entity_id)
+            if old_state_id is not None and not new_entity:
+                links.append({"state_id": state_id, "old_state_id": old_state_id})
+            # Removed entities are recorded with an empty state
+            if state == "":
+                last_state_ids.pop(entity_id, None)
+            else:
+                last_state_ids[entity_id] = state_id
+
+        if links:
+            engine.execute(
+                text(
+                    "UPDATE states SET old_state_id = :old_state_id "
+                    "WHERE state_id = :state_id"
+                ),
+                links,
+            )
+        after = rows[-1][0]
+
+
 def _apply_update(engine, new_version, old_version):
     """Perform operations to bring schema up to date."""
     if new_version == 1:
@@ -249,6 +299,14 @@ def _apply_update(engine, new_version, old_version):
     elif new_version == 7:
         _create_index(engine, "states", "ix_states_entity_id")
     elif new_version == 8:
+        # The state_attributes table itself is created by create_all.
+        # Existing rows keep their inline attributes until they are purged.
+        _add_columns(engine, "states", ["attributes_id INTEGER"])
+        _create_index(engine, "states", "ix_states_attributes_id")
+    elif new_version == 9:
+        _add_columns(engine, "states", ["old_state_id INTEGER"])
+        _link_old_states(engine)
+    elif new_version == 10:
         # Pending migration, want to group a few.
         pass
         # _add_columns(engine, "events", [
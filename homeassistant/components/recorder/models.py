@@ -1,5 +1,6 @@
 """Models for SQLAlchemy."""
 from datetime import datetime
+import hashlib
 import json
 import logging
 
@@ -15,6 +16,7 @@ from sqlalchemy import (
     distinct,
 )
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 from sqlalchemy.orm.session import Session
 
 from homeassistant.core import Context, Event, EventOrigin, State, split_entity_id
@@ -25,7 +27,7 @@ import homeassistant.util.dt as dt_util
 # pylint: disable=invalid-name
 Base = declarative_base()
 
-SCHEMA_VERSION = 7
+SCHEMA_VERSION = 9
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -65,7 +67,7 @@ class Events(Base):  # type: ignore
                 self.event_type,
                 json.loads(self.event_data),
                 EventOrigin(self.origin),
-                _process_timestamp(self.time_fired),
+                process_timestamp(self.time_fired),
                 context=context,
             )
         except ValueError:
@@ -74,6 +76,20 @@ class Events(Base):  # type: ignore
             return None
 
 
+class StateAttributes(Base):  # type: ignore
+    """State attributes shared between state rows."""
+
+    __tablename__ = "state_attributes"
+    attributes_id = Column(Integer, primary_key=True)
+    hash = Column(String(40), index=True)
+    shared_attrs = Column(Text)
+
+    @staticmethod
+    def hash_shared_attrs(shared_attrs):
+        """Return the content hash of serialized attributes."""
+        return hashlib.sha1(shared_attrs.encode("utf-8")).hexdigest()
+
+
 class States(Base):  # type: ignore
     """State change history."""
 
@@ -82,6 +98,7 @@ class States(Base):  # type: ignore
     domain = Column(String(64))
     entity_id = Column(String(255), index=True)
     state = Column(String(255))
+    # Only used by rows written before attributes were shared
     attributes = Column(Text)
     event_id = Column(Integer, ForeignKey("events.event_id"), index=True)
     last_changed = Column(DateTime(timezone=True), default=datetime.utcnow)
@@ -90,6 +107,23 @@ class States(Base):  # type: ignore
     context_id = Column(String(36), index=True)
     context_user_id = Column(String(36), index=True)
     # context_parent_id = Column(String(36), index=True)
+    attributes_id = Column(
+        Integer, ForeignKey("state_attributes.attributes_id"), index=True
+    )
+    # The previous state of the entity, not set for new entities. Not a
+    # foreign key so old states can be purged on their own.
+    old_state_id = Column(Integer)
+    state_attributes = relationship(StateAttributes, lazy="joined")
+    # Let a batch insert states together with their events and old states
+    event = relationship(Events)
+    old_state = relationship(
+        "States",
+        primaryjoin="States.old_state_id == States.state_id",
+        foreign_keys=[old_state_id],
+        remote_side=[state_id],
+        # Keeps states inserted in the order they are added
+        post_update=True,
+    )
 
     __table_args__ = (
         # Used for fetching the state of entities at a specific time
@@ -133,9 +167,9 @@ class States(Base):  # type: ignore
             return State(
                 self.entity_id,
                 self.state,
-                json.loads(self.attributes),
-                _process_timestamp(self.last_changed),
-                _process_timestamp(self.last_updated),
+                json.loads(self.shared_attrs),
+                process_timestamp(self.last_changed),
+                process_timestamp(self.last_updated),
                 context=context,
                 # Temp, because database can still store invalid entity IDs
                 # Remove with 1.0 or in 2020.
@@ -146,6 +180,15 @@ class States(Base):  # type: ignore
             _LOGGER.exception("Error converting row to state: %s", self)
             return None
 
+    @property
+    def shared_attrs(self):
+        """Return the serialized attributes of this state."""
+        if self.attributes is not None:
+            return self.attributes
+        if self.state_attributes is not None:
+            return self.state_attributes.shared_attrs
+        return "{}"
+
 
 class RecorderRuns(Base):  # type: ignore
     """Representation of recorder run."""
@@ -194,7 +237,7 @@ class SchemaChanges(Base):  # type: ignore
     changed = Column(DateTime(timezone=True), default=datetime.utcnow)
 
 
-def _process_timestamp(ts):
+def process_timestamp(ts):
     """Process a timestamp into datetime object."""
     if ts is None:
         return None
@@ -1,42 +1,172 @@
 """Purge old data helper."""
-from datetime import timedelta
+from datetime import datetime, timedelta
 import logging
+from typing import Optional
 
+import attr
+from sqlalchemy import exists
 from sqlalchemy.exc import SQLAlchemyError
 
 import homeassistant.util.dt as dt_util
 
-from .models import Events, States
+from .models import Events, StateAttributes, States
 from .util import session_scope
 
 _LOGGER = logging.getLogger(__name__)
 
+# Maximum number of rows deleted from each table in one purge run
+MAX_ROWS_TO_PURGE = 998
+# Maximum number of free pages reclaimed in one incremental vacuum run
+MAX_PAGES_TO_VACUUM = 10000
+
+SQLITE_AUTO_VACUUM_INCREMENTAL = 2
+
+
+@attr.s(slots=True)
+class PurgeProgress:
+    """Progress of the running purge, or of the last one when it is done."""
+
+    running: bool = attr.ib(default=False)
+    purge_before: Optional[datetime] = attr.ib(default=None)
+    batches: int = attr.ib(default=0)
+    states: int = attr.ib(default=0)
+    events: int = attr.ib(default=0)
+    state_attributes: int = attr.ib(default=0)
+
 
 def purge_old_data(instance, purge_days, repack):
-    """Purge events and states older than purge_days ago."""
+    """Purge events and states older than purge_days ago.
+
+    At most MAX_ROWS_TO_PURGE rows are deleted from each table per call so
+    the recorder can process its queue in between. Returns True when the
+    purge is done and False when it should be called again. The progress
+    is kept in instance.purge_progress.
+    """
     purge_before = dt_util.utcnow() - timedelta(days=purge_days)
     _LOGGER.debug("Purging events before %s", purge_before)
 
+    progress = instance.purge_progress
+    if not progress.running:
+        _LOGGER.info("Purging recorder data before %s", purge_before)
+        progress = instance.purge_progress = PurgeProgress(
+            running=True, purge_before=purge_before
+        )
+    progress.batches += 1
+
+    done = _purge_old_data(instance, purge_before, repack, progress)
+    if done:
+        progress.running = False
+        _LOGGER.info(
+            "Purged %d states, %d events and %d shared state attributes "
+            "in %d batches",
+            progress.states,
+            progress.events,
+            progress.state_attributes,
+            progress.batches,
+        )
+    return done
+
+
+def _purge_old_data(instance, purge_before, repack, progress):
+    """Purge a batch of the rows older than purge_before."""
     try:
         with session_scope(session=instance.get_session()) as session:
-            deleted_rows = (
-                session.query(States)
-                .filter((States.last_updated < purge_before))
-                .delete(synchronize_session=False)
+            deleted_rows = _purge_batch(
+                session, States.state_id, States.last_updated < purge_before
             )
+            progress.states += deleted_rows
             _LOGGER.debug("Deleted %s states", deleted_rows)
+            if deleted_rows == MAX_ROWS_TO_PURGE:
+                _LOGGER.debug("Purge batch done, more states left to purge")
+                return False
 
-            deleted_rows = (
-                session.query(Events)
-                .filter((Events.time_fired < purge_before))
-                .delete(synchronize_session=False)
+            deleted_rows = _purge_batch(
+                session, Events.event_id, Events.time_fired < purge_before
             )
+            progress.events += deleted_rows
             _LOGGER.debug("Deleted %s events", deleted_rows)
+            if deleted_rows == MAX_ROWS_TO_PURGE:
+                _LOGGER.debug("Purge batch done, more events left to purge")
+                return False
 
-        # Execute sqlite vacuum command to free up space on disk
-        if repack and instance.engine.driver in ("pysqlite", "postgresql"):
-            _LOGGER.debug("Vacuuming SQL DB to free space")
-            instance.engine.execute("VACUUM")
+            deleted_rows = _purge_batch(
+                session,
+                StateAttributes.attributes_id,
+                ~exists().where(States.attributes_id == StateAttributes.attributes_id),
+            )
+            progress.state_attributes += deleted_rows
+            _LOGGER.debug("Deleted %s shared state attributes", deleted_rows)
+            if deleted_rows == MAX_ROWS_TO_PURGE:
+                _LOGGER.debug("Purge batch done, more state attributes left to purge")
+                return False
+
+        if repack:
+            return _repack(instance)
 
     except SQLAlchemyError as err:
         _LOGGER.warning("Error purging history: %s.", err)
+
+    return True
+
+
+def _purge_batch(session, primary_key, criteria):
+    """Delete the first MAX_ROWS_TO_PURGE rows matching criteria.
+
+    The batch is bounded by the primary key of its last row instead of
+    listing every key, which keeps the statement within the bound
+    variable limit of SQLite. Returns the number of deleted rows.
+    """
+    primary_keys = [
+        row[0]
+        for row in session.query(primary_key)
+        .filter(criteria)
+        .order_by(primary_key)
+        .limit(MAX_ROWS_TO_PURGE)
+    ]
+    if not primary_keys:
+        return 0
+
+    session.query(primary_key.class_).filter(
+        primary_key <= primary_keys[-1], criteria
+    ).delete(synchronize_session=False)
+    return len(primary_keys)
+
+
+def _repack(instance):
+    """Free up space on disk.
+
+    Returns False if more space can be reclaimed by calling it again.
+    """
+    if instance.engine.driver == "pysqlite":
+        auto_vacuum = instance.engine.execute("PRAGMA auto_vacuum").scalar()
+
+        if auto_vacuum == SQLITE_AUTO_VACUUM_INCREMENTAL:
+            free_pages = instance.engine.execute("PRAGMA freelist_count").scalar()
+            _LOGGER.debug(
+                "Incrementally vacuuming SQL DB to free space, %s pages free",
+                free_pages,
+            )
+            # sqlite3 only frees a page per step, so all rows must be fetched
+            connection = instance.engine.raw_connection()
+            try:
+                cursor = connection.cursor()
+                cursor.execute(f"PRAGMA incremental_vacuum({MAX_PAGES_TO_VACUUM})")
+                cursor.fetchall()
+                cursor.close()
+            finally:
+                connection.close()
+            return free_pages <= MAX_PAGES_TO_VACUUM
+
+        # New databases are created with incremental vacuum. Databases created
+        # before need one full vacuum on the same connection to switch, after
+        # that space can be reclaimed in small steps.
+        _LOGGER.debug("Vacuuming SQL DB to free space")
+        with instance.engine.connect() as connection:
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.execute("VACUUM")
+
+    elif instance.engine.driver == "postgresql":
+        _LOGGER.debug("Vacuuming SQL DB to free space")
+        instance.engine.execute("VACUUM")
+
+    return True
@@ -1,7 +1,6 @@
 """Support for statistics for sensor values."""
 from collections import deque
 import logging
-import statistics
 
 import voluptuous as vol
 
@@ -24,6 +23,7 @@ from homeassistant.helpers.event import (
     async_track_state_change,
 )
 from homeassistant.util import dt as dt_util
+from homeassistant.util.rolling import RollingWindow
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -91,7 +91,10 @@ class StatisticsSensor(Entity):
         self._max_age = max_age
         self._precision = precision
         self._unit_of_measurement = None
-        self.states = deque(maxlen=self._sampling_size)
+        if self.is_binary:
+            self.states = deque(maxlen=self._sampling_size)
+        else:
+            self.states = RollingWindow(self._sampling_size)
         self.ages = deque(maxlen=self._sampling_size)
 
         self.count = 0
@@ -237,23 +240,23 @@ class StatisticsSensor(Entity):
 
         if not self.is_binary:
             try:  # require only one data point
-                self.mean = round(statistics.mean(self.states), self._precision)
-                self.median = round(statistics.median(self.states), self._precision)
-            except statistics.StatisticsError as err:
+                self.mean = round(self.states.mean, self._precision)
+                self.median = round(self.states.median, self._precision)
+            except ValueError as err:
                 _LOGGER.debug("%s: %s", self.entity_id, err)
                 self.mean = self.median = STATE_UNKNOWN
 
             try:  # require at least two data points
-                self.stdev = round(statistics.stdev(self.states), self._precision)
-                self.variance = round(statistics.variance(self.states), self._precision)
-            except statistics.StatisticsError as err:
+                self.stdev = round(self.states.stdev, self._precision)
+                self.variance = round(self.states.variance, self._precision)
+            except ValueError as err:
                 _LOGGER.debug("%s: %s", self.entity_id, err)
                 self.stdev = self.variance = STATE_UNKNOWN
 
             if self.states:
-                self.total = round(sum(self.states), self._precision)
-                self.min = round(min(self.states), self._precision)
-                self.max = round(max(self.states), self._precision)
+                self.total = round(self.states.total, self._precision)
+                self.min = round(self.states.min, self._precision)
+                self.max = round(self.states.max, self._precision)
 
                 self.min_age = self.ages[0]
                 self.max_age = self.ages[-1]
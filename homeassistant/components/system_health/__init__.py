@@ -9,6 +9,8 @@ import voluptuous as vol
 
 from homeassistant.components import websocket_api
 from homeassistant.core import callback
+from homeassistant.helpers import template
+from homeassistant.helpers.event import TRACK_TEMPLATE_RESULT_TRACKERS
 from homeassistant.helpers.typing import ConfigType, HomeAssistantType
 from homeassistant.loader import bind_hass
 
@@ -34,9 +36,22 @@ def async_register_info(
 async def async_setup(hass: HomeAssistantType, config: ConfigType):
     """Set up the System Health component."""
     hass.components.websocket_api.async_register_command(handle_info)
+    async_register_info(hass, "template", _template_cache_info)
     return True
 
 
+async def _template_cache_info(hass):
+    """Get info about the compiled template cache and tracked renders."""
+    info = template.COMPILED_TEMPLATE_CACHE.info()
+    render_stats = [
+        tracker.stats for tracker in hass.data.get(TRACK_TEMPLATE_RESULT_TRACKERS, ())
+    ]
+    info["tracked_renders"] = sum(stats.renders for stats in render_stats)
+    info["coalesced_renders"] = sum(stats.coalesced for stats in render_stats)
+    info["render_time"] = round(sum(stats.total_time for stats in render_stats), 3)
+    return info
+
+
 async def _info_wrapper(hass, info_callback):
     """Wrap info callback."""
     try:
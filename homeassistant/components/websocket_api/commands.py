@@ -1,18 +1,29 @@
 """Commands part of Websocket API."""
+from datetime import timedelta
+
 import voluptuous as vol
 
 from homeassistant.auth.permissions.const import POLICY_READ
 from homeassistant.const import EVENT_STATE_CHANGED, EVENT_TIME_CHANGED, MATCH_ALL
 from homeassistant.core import DOMAIN as HASS_DOMAIN, callback
-from homeassistant.exceptions import HomeAssistantError, ServiceNotFound, Unauthorized
+from homeassistant.exceptions import (
+    HomeAssistantError,
+    ServiceNotFound,
+    TemplateError,
+    Unauthorized,
+)
 from homeassistant.helpers import config_validation as cv
-from homeassistant.helpers.event import async_track_state_change
+from homeassistant.helpers.event import async_track_template_result
 from homeassistant.helpers.service import async_get_all_descriptions
+from homeassistant.setup import async_get_setup_timings
 
 from . import const, decorators, messages
 
 # mypy: allow-untyped-calls, allow-untyped-defs
 
+# Seconds between renders of templates that depend on all states or domains
+DEFAULT_RENDER_RATE_LIMIT = 1
+
 
 @callback
 def async_register_commands(hass, async_reg):
@@ -23,6 +34,7 @@ def async_register_commands(hass, async_reg):
     async_reg(hass, handle_get_states)
     async_reg(hass, handle_get_services)
     async_reg(hass, handle_get_config)
+    async_reg(hass, handle_get_setup_timings)
     async_reg(hass, handle_ping)
     async_reg(hass, handle_render_template)
 
@@ -63,7 +75,7 @@ def handle_subscribe_events(hass, connection, msg):
             ):
                 return
 
-            connection.send_message(messages.event_message(msg["id"], event))
+            connection.send_message(messages.cached_event_message(msg["id"], event))
 
     else:
 
@@ -73,7 +85,7 @@ def handle_subscribe_events(hass, connection, msg):
             if event.event_type == EVENT_TIME_CHANGED:
                 return
 
-            connection.send_message(messages.event_message(msg["id"], event.as_dict()))
+            connection.send_message(messages.cached_event_message(msg["id"], event))
 
     connection.subscriptions[msg["id"]] = hass.bus.async_listen(
         event_type, forward_events
@@ -178,7 +190,7 @@ def handle_get_states(hass, connection, msg):
             if entity_perm(state.entity_id, "read")
         ]
 
-    connection.send_message(messages.result_message(msg["id"], states))
+    connection.send_message(messages.cached_states_result_message(msg["id"], states))
 
 
 @decorators.websocket_command({vol.Required("type"): "get_services"})
@@ -202,6 +214,20 @@ def handle_get_config(hass, connection, msg):
     connection.send_message(messages.result_message(msg["id"], hass.config.as_dict()))
 
 
+@callback
+@decorators.require_admin
+@decorators.websocket_command({vol.Required("type"): "get_setup_timings"})
+def handle_get_setup_timings(hass, connection, msg):
+    """Handle get setup timings command.
+
+    Returns the seconds spent importing, installing requirements and
+    setting up each integration.
+    """
+    connection.send_message(
+        messages.result_message(msg["id"], async_get_setup_timings(hass))
+    )
+
+
 @callback
 @decorators.websocket_command({vol.Required("type"): "ping"})
 def handle_ping(hass, connection, msg):
@@ -219,6 +245,9 @@ def handle_ping(hass, connection, msg):
         vol.Required("template"): cv.template,
         vol.Optional("entity_ids"): cv.entity_ids,
         vol.Optional("variables"): dict,
+        vol.Optional("rate_limit", default=DEFAULT_RENDER_RATE_LIMIT): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
     }
 )
 def handle_render_template(hass, connection, msg):
@@ -229,26 +258,22 @@ def handle_render_template(hass, connection, msg):
     template = msg["template"]
     template.hass = hass
 
-    variables = msg.get("variables")
-
-    entity_ids = msg.get("entity_ids")
-    if entity_ids is None:
-        entity_ids = template.extract_entities(variables)
-
     @callback
-    def state_listener(*_):
-        connection.send_message(
-            messages.event_message(
-                msg["id"], {"result": template.async_render(variables)}
-            )
-        )
+    def send_render_result(event, info):
+        try:
+            result = info.result
+        except TemplateError as ex:
+            connection.send_error(msg["id"], const.ERR_TEMPLATE_ERROR, str(ex))
+            return
 
-    if entity_ids and entity_ids != MATCH_ALL:
-        connection.subscriptions[msg["id"]] = async_track_state_change(
-            hass, entity_ids, state_listener
-        )
-    else:
-        connection.subscriptions[msg["id"]] = lambda: None
+        connection.send_message(messages.event_message(msg["id"], {"result": result}))
 
     connection.send_result(msg["id"])
-    state_listener()
+    connection.subscriptions[msg["id"]] = async_track_template_result(
+        hass,
+        template,
+        send_render_result,
+        msg.get("variables"),
+        msg.get("entity_ids"),
+        rate_limit=timedelta(seconds=msg["rate_limit"]),
+    )
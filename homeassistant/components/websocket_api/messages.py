@@ -3,6 +3,7 @@
 import voluptuous as vol
 
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.json import cached_json_dumps
 
 from . import const
 
@@ -36,3 +37,35 @@ def error_message(iden, code, message):
 def event_message(iden, event):
     """Return an event message."""
     return {"id": iden, "type": "event", "event": event}
+
+
+def cached_event_message(iden, event):
+    """Return an event message serialized to JSON.
+
+    The event is serialized once and cached on the event, so all subscribers
+    share the result and only the message id differs.
+    """
+    try:
+        event_json = cached_json_dumps(event)
+    except (ValueError, TypeError):
+        # Let the writer report the error
+        return event_message(iden, event.as_dict())
+
+    return f'{{"id": {iden}, "type": "event", "event": {event_json}}}'
+
+
+def cached_states_result_message(iden, states):
+    """Return a result message with a list of states serialized to JSON.
+
+    The JSON of each state is cached on the state and reused by later calls.
+    """
+    try:
+        states_json = ",".join(cached_json_dumps(state) for state in states)
+    except (ValueError, TypeError):
+        # Let the writer report the error
+        return result_message(iden, states)
+
+    return (
+        f'{{"id": {iden}, "type": "{const.TYPE_RESULT}", "success": true, '
+        f'"result": [{states_json}]}}'
+    )
@@ -27,6 +27,7 @@ from typing import (
     Mapping,
     Optional,
     Set,
+    Tuple,
     TypeVar,
 )
 import uuid
@@ -131,6 +132,50 @@ def is_callback(func: Callable[..., Any]) -> bool:
     return getattr(func, "_hass_callback", False) is True
 
 
+class HassJobType(enum.Enum):
+    """Represent a job type."""
+
+    Coroutinefunction = 1
+    Callback = 2
+    Executor = 3
+
+
+class HassJob:
+    """Represent a job to be run later.
+
+    The job type is determined once when the job is created, so code that
+    runs the same target over and over does not inspect it every time.
+    """
+
+    __slots__ = ("job_type", "target")
+
+    def __init__(self, target: Callable) -> None:
+        """Create a job object."""
+        if asyncio.iscoroutine(target):
+            raise ValueError("Coroutine not allowed to be passed to HassJob")
+
+        self.target = target
+        self.job_type = _get_callable_job_type(target)
+
+    def __repr__(self) -> str:
+        """Return the job."""
+        return f"<Job {self.job_type} {self.target}>"
+
+
+def _get_callable_job_type(target: Callable) -> HassJobType:
+    """Determine the job type from the callable."""
+    # Check for partials to properly determine if coroutine function
+    check_target = target
+    while isinstance(check_target, functools.partial):
+        check_target = check_target.func
+
+    if asyncio.iscoroutinefunction(check_target):
+        return HassJobType.Coroutinefunction
+    if is_callback(check_target):
+        return HassJobType.Callback
+    return HassJobType.Executor
+
+
 @callback
 def async_loop_exception_handler(_: Any, context: Dict) -> None:
     """Handle all exception inside the core loop."""
@@ -175,7 +220,8 @@ class HomeAssistant:
         self.executor = ThreadPoolExecutor(**executor_opts)
         self.loop.set_default_executor(self.executor)
         self.loop.set_exception_handler(async_loop_exception_handler)
-        self._pending_tasks: list = []
+        # Tasks remove themselves once done
+        self._pending_tasks: Set[asyncio.Future] = set()
         self._track_task = True
         self.bus = EventBus(self)
         self.services = ServiceRegistry(self)
@@ -293,30 +339,46 @@ class HomeAssistant:
         target: target to call.
         args: parameters for method to call.
         """
-        task = None
-
-        # Check for partials to properly determine if coroutine function
-        check_target = target
-        while isinstance(check_target, functools.partial):
-            check_target = check_target.func
-
-        if asyncio.iscoroutine(check_target):
-            task = self.loop.create_task(target)  # type: ignore
-        elif asyncio.iscoroutinefunction(check_target):
-            task = self.loop.create_task(target(*args))
-        elif is_callback(check_target):
-            self.loop.call_soon(target, *args)
+        if target is None:
+            raise ValueError("Don't call async_add_job with None")
+
+        if asyncio.iscoroutine(target):
+            return self.async_create_task(target)  # type: ignore
+
+        return self.async_add_hass_job(HassJob(target), *args)
+
+    @callback
+    def async_add_hass_job(
+        self, hassjob: HassJob, *args: Any
+    ) -> Optional[asyncio.Future]:
+        """Add a HassJob from within the event loop.
+
+        This method must be run in the event loop.
+
+        hassjob: HassJob to call.
+        args: parameters for method to call.
+        """
+        if hassjob.job_type == HassJobType.Coroutinefunction:
+            task = self.loop.create_task(hassjob.target(*args))
+        elif hassjob.job_type == HassJobType.Callback:
+            self.loop.call_soon(hassjob.target, *args)
+            return None
         else:
             task = self.loop.run_in_executor(  # type: ignore
-                None, target, *args
+                None, hassjob.target, *args
             )
 
-        # If a task is scheduled
-        if self._track_task and task is not None:
-            self._pending_tasks.append(task)
+        if self._track_task:
+            self._async_track_pending(task)
 
         return task
 
+    @callback
+    def _async_track_pending(self, task: asyncio.Future) -> None:
+        """Track a task until it is done."""
+        self._pending_tasks.add(task)
+        task.add_done_callback(self._pending_tasks.discard)
+
     @callback
     def async_create_task(self, target: Coroutine) -> asyncio.tasks.Task:
         """Create a task from within the eventloop.
@@ -328,7 +390,7 @@ class HomeAssistant:
         task: asyncio.tasks.Task = self.loop.create_task(target)
 
         if self._track_task:
-            self._pending_tasks.append(task)
+            self._async_track_pending(task)
 
         return task
 
@@ -341,7 +403,7 @@ class HomeAssistant:
 
         # If a task is scheduled
         if self._track_task:
-            self._pending_tasks.append(task)
+            self._async_track_pending(task)
 
         return task
 
@@ -364,14 +426,25 @@ class HomeAssistant:
         target: target to call.
         args: parameters for method to call.
         """
-        if (
-            not asyncio.iscoroutine(target)
-            and not asyncio.iscoroutinefunction(target)
-            and is_callback(target)
-        ):
-            target(*args)
+        if asyncio.iscoroutine(target):
+            self.async_create_task(target)  # type: ignore
+            return
+
+        self.async_run_hass_job(HassJob(target), *args)
+
+    @callback
+    def async_run_hass_job(self, hassjob: HassJob, *args: Any) -> None:
+        """Run a HassJob from within the event loop.
+
+        This method must be run in the event loop.
+
+        hassjob: HassJob to call.
+        args: parameters for method to call.
+        """
+        if hassjob.job_type == HassJobType.Callback:
+            hassjob.target(*args)
         else:
-            self.async_add_job(target, *args)
+            self.async_add_hass_job(hassjob, *args)
 
     def block_till_done(self) -> None:
         """Block till all pending work is done."""
@@ -386,10 +459,10 @@ class HomeAssistant:
 
         while self._pending_tasks:
             pending = [task for task in self._pending_tasks if not task.done()]
-            self._pending_tasks.clear()
             if pending:
                 await asyncio.wait(pending)
             else:
+                # Let the done callbacks prune the finished tasks
                 await asyncio.sleep(0)
 
     def stop(self) -> None:
@@ -466,7 +539,7 @@ class EventOrigin(enum.Enum):
 class Event:
     """Representation of an event within the bus."""
 
-    __slots__ = ["event_type", "data", "origin", "time_fired", "context"]
+    __slots__ = ["event_type", "data", "origin", "time_fired", "context", "json"]
 
     def __init__(
         self,
@@ -482,6 +555,8 @@ class Event:
         self.origin = origin
         self.time_fired = time_fired or dt_util.utcnow()
         self.context: Context = context or Context()
+        # JSON representation, set by the first consumer that serializes it
+        self.json: Optional[str] = None
 
     def as_dict(self) -> Dict:
         """Create a dict representation of this Event.
@@ -523,7 +598,9 @@ class EventBus:
 
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize a new event bus."""
-        self._listeners: Dict[str, List[Callable]] = {}
+        # Lists are replaced, never changed in place, so async_fire can
+        # iterate them while listeners are added or removed.
+        self._listeners: Dict[str, List[HassJob]] = {}
         self._hass = hass
 
     @callback
@@ -563,25 +640,41 @@ class EventBus:
     ) -> None:
         """Fire an event.
 
+        Callback listeners run right away, coroutine and executor listeners
+        are scheduled.
+
         This method must be run in the event loop.
         """
-        listeners = self._listeners.get(event_type, [])
+        listeners = self._listeners.get(event_type)
 
         # EVENT_HOMEASSISTANT_CLOSE should go only to his listeners
-        match_all_listeners = self._listeners.get(MATCH_ALL)
-        if match_all_listeners is not None and event_type != EVENT_HOMEASSISTANT_CLOSE:
-            listeners = match_all_listeners + listeners
+        match_all_listeners = None
+        if event_type != EVENT_HOMEASSISTANT_CLOSE:
+            match_all_listeners = self._listeners.get(MATCH_ALL)
 
         event = Event(event_type, event_data, origin, None, context)
 
         if event_type != EVENT_TIME_CHANGED:
             _LOGGER.debug("Bus:Handling %s", event)
 
-        if not listeners:
-            return
+        if match_all_listeners is not None:
+            self._async_run_listeners(match_all_listeners, event)
 
-        for func in listeners:
-            self._hass.async_add_job(func, event)
+        if listeners is not None:
+            self._async_run_listeners(listeners, event)
+
+    @callback
+    def _async_run_listeners(self, listeners: List[HassJob], event: Event) -> None:
+        """Run or schedule the listeners for an event."""
+        for job in listeners:
+            if job.job_type != HassJobType.Callback:
+                self._hass.async_add_hass_job(job, event)
+                continue
+
+            try:
+                job.target(event)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error running listener %s for %s", job.target, event)
 
     def listen(self, event_type: str, listener: Callable) -> CALLBACK_TYPE:
         """Listen for all events or events of a specific type.
@@ -608,10 +701,10 @@ class EventBus:
 
         This method must be run in the event loop.
         """
-        if event_type in self._listeners:
-            self._listeners[event_type].append(listener)
-        else:
-            self._listeners[event_type] = [listener]
+        self._listeners[event_type] = [
+            *self._listeners.get(event_type, ()),
+            HassJob(listener),
+        ]
 
         def remove_listener() -> None:
             """Remove the listener."""
@@ -648,6 +741,7 @@ class EventBus:
 
         This method must be run in the event loop.
         """
+        job = HassJob(listener)
 
         @callback
         def onetime_listener(event: Event) -> None:
@@ -661,7 +755,7 @@ class EventBus:
             # This will make sure the second time it does nothing.
             setattr(onetime_listener, "run", True)
             self._async_remove_listener(event_type, onetime_listener)
-            self._hass.async_run_job(listener, event)
+            self._hass.async_run_hass_job(job, event)
 
         return self.async_listen(event_type, onetime_listener)
 
@@ -671,16 +765,21 @@ class EventBus:
 
         This method must be run in the event loop.
         """
+        listeners = self._listeners.get(event_type, [])
         try:
-            self._listeners[event_type].remove(listener)
-
-            # delete event_type list if empty
-            if not self._listeners[event_type]:
-                self._listeners.pop(event_type)
-        except (KeyError, ValueError):
-            # KeyError is key event_type listener did not exist
-            # ValueError if listener did not exist within event_type
+            index = [job.target for job in listeners].index(listener)
+        except ValueError:
+            # Either the event_type or the listener within it did not exist
             _LOGGER.warning("Unable to remove unknown listener %s", listener)
+            return
+
+        remaining = listeners[:index] + listeners[index + 1 :]
+
+        # delete event_type list if empty
+        if remaining:
+            self._listeners[event_type] = remaining
+        else:
+            self._listeners.pop(event_type)
 
 
 class State:
@@ -701,6 +800,7 @@ class State:
         "last_changed",
         "last_updated",
         "context",
+        "json",
     ]
 
     def __init__(
@@ -736,6 +836,8 @@ class State:
         self.last_updated = last_updated or dt_util.utcnow()
         self.last_changed = last_changed or self.last_updated
         self.context = context or Context()
+        # JSON representation, set by the first consumer that serializes it
+        self.json: Optional[str] = None
 
     @property
     def domain(self) -> str:
@@ -829,12 +931,115 @@ class State:
         )
 
 
+_EMPTY_STATES: Mapping[str, State] = MappingProxyType({})
+
+
+class EntityIdIndex:
+    """Index of the entity ids in use, keyed on (domain, object_id).
+
+    States and entity registry entries claim their entity id. Generating an
+    entity id for an object id that is taken continues from the lowest suffix
+    that may be free, so generating many entity ids for one name is O(1)
+    amortized instead of probing every suffix again.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the index."""
+        # Number of claims, a state and a registry entry can share an entity id
+        self._claims: Dict[Tuple[str, str], int] = {}
+        # Lowest suffix that may be free, for object ids that were taken
+        self._suffixes: Dict[Tuple[str, str], int] = {}
+
+    @callback
+    def async_claim(self, domain: str, object_id: str) -> None:
+        """Mark an entity id as used.
+
+        This method must be run in the event loop.
+        """
+        key = (domain, object_id)
+        self._claims[key] = self._claims.get(key, 0) + 1
+
+    @callback
+    def async_release(self, domain: str, object_id: str) -> None:
+        """Drop a claim on an entity id, freeing its suffix after the last one.
+
+        This method must be run in the event loop.
+        """
+        key = (domain, object_id)
+        claims = self._claims.get(key)
+        if claims is None:
+            return
+        if claims > 1:
+            self._claims[key] = claims - 1
+            return
+
+        del self._claims[key]
+
+        base, _, suffix = object_id.rpartition("_")
+        if not base or not suffix.isdigit():
+            return
+
+        base_key = (domain, base)
+        lowest = self._suffixes.get(base_key)
+        if lowest is None:
+            return
+        if int(suffix) <= 2:
+            del self._suffixes[base_key]
+        elif int(suffix) < lowest:
+            self._suffixes[base_key] = int(suffix)
+
+    @callback
+    def async_generate(
+        self,
+        domain: str,
+        object_id: str,
+        is_taken: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        """Return an unused entity id for object_id in domain.
+
+        If the entity id is taken, appends _2, _3, .. to object_id. is_taken
+        can reject entity ids that are not claimed in the index.
+
+        This method must be run in the event loop.
+        """
+
+        claims = self._claims
+
+        if (domain, object_id) not in claims and not (
+            is_taken is not None and is_taken(f"{domain}.{object_id}")
+        ):
+            return f"{domain}.{object_id}"
+
+        key = (domain, object_id)
+        tries = self._suffixes.get(key, 2)
+        lowest_unclaimed = 0
+        while True:
+            test_object_id = f"{object_id}_{tries}"
+            if (domain, test_object_id) not in claims:
+                if not lowest_unclaimed:
+                    lowest_unclaimed = tries
+                if is_taken is None or not is_taken(f"{domain}.{test_object_id}"):
+                    break
+            tries += 1
+
+        # Entity ids only is_taken rejects are not released to the index,
+        # so the next call starts at the first one of them again.
+        self._suffixes[key] = lowest_unclaimed
+        return f"{domain}.{test_object_id}"
+
+
 class StateMachine:
     """Helper class that tracks the state of different entities."""
 
     def __init__(self, bus: EventBus, loop: asyncio.events.AbstractEventLoop) -> None:
         """Initialize state machine."""
         self._states: Dict[str, State] = {}
+        # States by entity ID per domain, and read-only views on them
+        self._domain_index: Dict[str, Dict[str, State]] = {}
+        self._states_view: Mapping[str, State] = MappingProxyType(self._states)
+        self._domain_views: Dict[str, Mapping[str, State]] = {}
+        # Entity ids in use, shared with the entity registry
+        self.entity_id_index = EntityIdIndex()
         self._bus = bus
         self._loop = loop
 
@@ -851,16 +1056,29 @@ class StateMachine:
 
         This method must be run in the event loop.
         """
-        if domain_filter is None:
-            return list(self._states.keys())
+        return list(self.async_states(domain_filter))
 
-        domain_filter = domain_filter.lower()
+    @callback
+    def async_entity_ids_count(self, domain_filter: Optional[str] = None) -> int:
+        """Count the entity ids that are being tracked.
 
-        return [
-            state.entity_id
-            for state in self._states.values()
-            if state.domain == domain_filter
-        ]
+        This method must be run in the event loop.
+        """
+        return len(self.async_states(domain_filter))
+
+    @callback
+    def async_states(self, domain_filter: Optional[str] = None) -> Mapping[str, State]:
+        """Return a read-only view of the states by entity id.
+
+        The view follows later changes, it must not be iterated across an
+        await or while states are set or removed.
+
+        This method must be run in the event loop.
+        """
+        if domain_filter is None:
+            return self._states_view
+
+        return self._domain_views.get(domain_filter.lower(), _EMPTY_STATES)
 
     def all(self) -> List[State]:
         """Create a list of all states."""
@@ -869,12 +1087,12 @@ class StateMachine:
         ).result()
 
     @callback
-    def async_all(self) -> List[State]:
-        """Create a list of all states.
+    def async_all(self, domain_filter: Optional[str] = None) -> List[State]:
+        """Create a list of all states, optionally of a single domain.
 
         This method must be run in the event loop.
         """
-        return list(self._states.values())
+        return list(self.async_states(domain_filter).values())
 
     def get(self, entity_id: str) -> Optional[State]:
         """Retrieve state of entity_id or None if not found.
@@ -914,6 +1132,9 @@ class StateMachine:
         if old_state is None:
             return False
 
+        del self._domain_index[old_state.domain][entity_id]
+        self.entity_id_index.async_release(old_state.domain, old_state.object_id)
+
         self._bus.async_fire(
             EVENT_STATE_CHANGED,
             {"entity_id": entity_id, "old_state": old_state, "new_state": None},
@@ -984,6 +1205,15 @@ class StateMachine:
 
         state = State(entity_id, new_state, attributes, last_changed, None, context)
         self._states[entity_id] = state
+
+        domain_states = self._domain_index.get(state.domain)
+        if domain_states is None:
+            # Domains are never removed from the index to keep their view
+            domain_states = self._domain_index[state.domain] = {}
+            self._domain_views[state.domain] = MappingProxyType(domain_states)
+        domain_states[entity_id] = state
+        if old_state is None:
+            self.entity_id_index.async_claim(state.domain, state.object_id)
         self._bus.async_fire(
             EVENT_STATE_CHANGED,
             {"entity_id": entity_id, "old_state": old_state, "new_state": state},
@@ -1,8 +1,8 @@
 """Provide a way to connect entities belonging to one device."""
 from asyncio import Event
-from collections import OrderedDict
+from collections import UserDict
 import logging
-from typing import Any, Dict, List, Optional, cast
+from typing import Any, Dict, Iterable, List, Optional, Tuple, cast
 import uuid
 
 import attr
@@ -67,10 +67,63 @@ def format_mac(mac: str) -> str:
     return mac
 
 
+class DeviceRegistryItems(UserDict):
+    """Container for device registry items, maps device id -> entry.
+
+    Maintains indexes from each identifier and each connection to the id of
+    the device that has it, so lookups do not have to scan all devices.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the container."""
+        super().__init__()
+        self._identifiers: Dict[Tuple[str, ...], str] = {}
+        self._connections: Dict[Tuple[str, str], str] = {}
+
+    def __setitem__(self, key: str, entry: DeviceEntry) -> None:
+        """Add an item, replacing the item that had the same key."""
+        old = self.data.get(key)
+        if old is not None:
+            _remove_from_index(
+                self._identifiers, old.identifiers - entry.identifiers, key
+            )
+            _remove_from_index(
+                self._connections, old.connections - entry.connections, key
+            )
+        self.data[key] = entry
+        for identifier in entry.identifiers:
+            self._identifiers[identifier] = key
+        for connection in entry.connections:
+            self._connections[connection] = key
+
+    def __delitem__(self, key: str) -> None:
+        """Remove an item."""
+        entry = self.data.pop(key)
+        _remove_from_index(self._identifiers, entry.identifiers, key)
+        _remove_from_index(self._connections, entry.connections, key)
+
+    def get_entry(self, identifiers: set, connections: set) -> Optional[DeviceEntry]:
+        """Get the entry with one of the identifiers or connections."""
+        for identifier in identifiers:
+            if identifier in self._identifiers:
+                return self.data[self._identifiers[identifier]]
+        for connection in connections:
+            if connection in self._connections:
+                return self.data[self._connections[connection]]
+        return None
+
+
+def _remove_from_index(index: Dict, keys: Iterable, device_id: str) -> None:
+    """Remove the keys from index that still point to device_id."""
+    for key in keys:
+        if index.get(key) == device_id:
+            del index[key]
+
+
 class DeviceRegistry:
     """Class to hold a registry of devices."""
 
-    devices: Dict[str, DeviceEntry]
+    devices: DeviceRegistryItems
 
     def __init__(self, hass: HomeAssistantType) -> None:
         """Initialize the device registry."""
@@ -87,12 +140,7 @@ class DeviceRegistry:
         self, identifiers: set, connections: set
     ) -> Optional[DeviceEntry]:
         """Check if device is registered."""
-        for device in self.devices.values():
-            if any(iden in device.identifiers for iden in identifiers) or any(
-                conn in device.connections for conn in connections
-            ):
-                return device
-        return None
+        return self.devices.get_entry(identifiers, connections)
 
     @callback
     def async_get_or_create(
@@ -273,7 +321,7 @@ class DeviceRegistry:
         """Load the device registry."""
         data = await self._store.async_load()
 
-        devices = OrderedDict()
+        devices = DeviceRegistryItems()
 
         if data is not None:
             for device in data["devices"]:
@@ -25,7 +25,13 @@ from homeassistant.const import (
     TEMP_CELSIUS,
     TEMP_FAHRENHEIT,
 )
-from homeassistant.core import CALLBACK_TYPE, Context, HomeAssistant, callback
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Context,
+    HomeAssistant,
+    callback,
+    split_entity_id,
+)
 from homeassistant.exceptions import NoEntitySpecifiedError
 from homeassistant.helpers.entity_platform import EntityPlatform
 from homeassistant.helpers.entity_registry import (
@@ -77,7 +83,11 @@ def async_generate_entity_id(
         if hass is None:
             raise ValueError("Missing required parameter currentids or hass")
 
-        current_ids = hass.states.async_entity_ids()
+        domain, object_id = split_entity_id(
+            entity_id_format.format(slugify(name or DEVICE_DEFAULT_NAME))
+        )
+        return hass.states.entity_id_index.async_generate(domain, object_id)
+
     name = (name or DEVICE_DEFAULT_NAME).lower()
 
     return ensure_unique_string(entity_id_format.format(slugify(name)), current_ids)
@@ -8,10 +8,20 @@ registered. Registering a new entity while a timer is in progress resets the
 timer.
 """
 import asyncio
-from collections import OrderedDict
-from itertools import chain
+from collections import UserDict
 import logging
-from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, cast
+from typing import (
+    TYPE_CHECKING,
+    AbstractSet,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    cast,
+)
 
 import attr
 
@@ -27,7 +37,7 @@ from homeassistant.const import (
 from homeassistant.core import Event, callback, split_entity_id, valid_entity_id
 from homeassistant.helpers.device_registry import EVENT_DEVICE_REGISTRY_UPDATED
 from homeassistant.loader import bind_hass
-from homeassistant.util import ensure_unique_string, slugify
+from homeassistant.util import slugify
 from homeassistant.util.yaml import load_yaml
 
 from .typing import HomeAssistantType
@@ -98,13 +108,104 @@ class RegistryEntry:
         return self.disabled_by is not None
 
 
+class EntityRegistryItems(UserDict):
+    """Container for entity registry items, maps entity_id -> entry.
+
+    Maintains indexes by (domain, platform, unique_id), by device_id and by
+    config_entry_id so lookups do not have to scan all entries.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the container."""
+        super().__init__()
+        self._unique_id_index: Dict[Tuple[str, str, str], str] = {}
+        # Entity IDs per device and config entry, in insertion order
+        self._device_id_index: Dict[str, Dict[str, None]] = {}
+        self._config_entry_id_index: Dict[str, Dict[str, None]] = {}
+
+    def __setitem__(self, key: str, entry: RegistryEntry) -> None:
+        """Add an item, replacing the item that had the same key."""
+        old = self.data.get(key)
+        if old is not None:
+            self._unindex(key, old, entry)
+        self.data[key] = entry
+        self._index(key, entry, old)
+
+    def __delitem__(self, key: str) -> None:
+        """Remove an item."""
+        entry = self.data.pop(key)
+        self._unindex(key, entry, None)
+
+    def _index(
+        self, key: str, entry: RegistryEntry, old: Optional[RegistryEntry]
+    ) -> None:
+        """Add an entry to the indexes that did not hold the old entry."""
+        self._unique_id_index[(entry.domain, entry.platform, entry.unique_id)] = key
+        if entry.device_id is not None and (
+            old is None or old.device_id != entry.device_id
+        ):
+            self._device_id_index.setdefault(entry.device_id, {})[key] = None
+        if entry.config_entry_id is not None and (
+            old is None or old.config_entry_id != entry.config_entry_id
+        ):
+            self._config_entry_id_index.setdefault(entry.config_entry_id, {})[
+                key
+            ] = None
+
+    def _unindex(
+        self, key: str, entry: RegistryEntry, new: Optional[RegistryEntry]
+    ) -> None:
+        """Remove an entry from the indexes that will not hold the new entry."""
+        unique_id_key = (entry.domain, entry.platform, entry.unique_id)
+        if self._unique_id_index.get(unique_id_key) == key:
+            del self._unique_id_index[unique_id_key]
+        if entry.device_id is not None and (
+            new is None or new.device_id != entry.device_id
+        ):
+            _remove_from_index(self._device_id_index, entry.device_id, key)
+        if entry.config_entry_id is not None and (
+            new is None or new.config_entry_id != entry.config_entry_id
+        ):
+            _remove_from_index(self._config_entry_id_index, entry.config_entry_id, key)
+
+    def get_entity_id(self, key: Tuple[str, str, str]) -> Optional[str]:
+        """Get entity_id from (domain, platform, unique_id)."""
+        return self._unique_id_index.get(key)
+
+    def get_entries_for_device_id(self, device_id: str) -> List[RegistryEntry]:
+        """Get entries for device."""
+        return [
+            self.data[entity_id]
+            for entity_id in self._device_id_index.get(device_id, ())
+        ]
+
+    def get_entries_for_config_entry_id(
+        self, config_entry_id: str
+    ) -> List[RegistryEntry]:
+        """Get entries for config entry."""
+        return [
+            self.data[entity_id]
+            for entity_id in self._config_entry_id_index.get(config_entry_id, ())
+        ]
+
+
+def _remove_from_index(
+    index: Dict[str, Dict[str, None]], key: str, entity_id: str
+) -> None:
+    """Remove an entity_id from the entity_ids indexed under key."""
+    entity_ids = index[key]
+    del entity_ids[entity_id]
+    if not entity_ids:
+        del index[key]
+
+
 class EntityRegistry:
     """Class to hold a registry of entities."""
 
     def __init__(self, hass: HomeAssistantType):
         """Initialize the registry."""
         self.hass = hass
-        self.entities: Dict[str, RegistryEntry]
+        self.entities: EntityRegistryItems
         self._store = hass.helpers.storage.Store(STORAGE_VERSION, STORAGE_KEY)
         self.hass.bus.async_listen(
             EVENT_DEVICE_REGISTRY_UPDATED, self.async_device_removed
@@ -125,14 +226,7 @@ class EntityRegistry:
         self, domain: str, platform: str, unique_id: str
     ) -> Optional[str]:
         """Check if an entity_id is currently registered."""
-        for entity in self.entities.values():
-            if (
-                entity.domain == domain
-                and entity.platform == platform
-                and entity.unique_id == unique_id
-            ):
-                return entity.entity_id
-        return None
+        return self.entities.get_entity_id((domain, platform, unique_id))
 
     @callback
     def async_generate_entity_id(
@@ -145,13 +239,16 @@ class EntityRegistry:
 
         Conflicts checked against registered and currently existing entities.
         """
-        return ensure_unique_string(
-            "{}.{}".format(domain, slugify(suggested_object_id)),
-            chain(
-                self.entities.keys(),
-                self.hass.states.async_entity_ids(domain),
-                known_object_ids if known_object_ids else [],
-            ),
+        known: AbstractSet[str] = frozenset()
+        if isinstance(known_object_ids, AbstractSet):
+            known = known_object_ids
+        elif known_object_ids:
+            known = set(known_object_ids)
+
+        return self.hass.states.entity_id_index.async_generate(
+            domain,
+            slugify(suggested_object_id),
+            lambda entity_id: entity_id in self.entities or entity_id in known,
         )
 
     @callback
@@ -229,6 +326,7 @@ class EntityRegistry:
             original_icon=original_icon,
         )
         self.entities[entity_id] = entity
+        self.hass.states.entity_id_index.async_claim(*split_entity_id(entity_id))
         _LOGGER.info("Registered new %s.%s entity: %s", domain, platform, entity_id)
         self.async_schedule_save()
 
@@ -242,6 +340,7 @@ class EntityRegistry:
     def async_remove(self, entity_id: str) -> None:
         """Remove an entity from registry."""
         self.entities.pop(entity_id)
+        self.hass.states.entity_id_index.async_release(*split_entity_id(entity_id))
         self.hass.bus.async_fire(
             EVENT_ENTITY_REGISTRY_UPDATED, {"action": "remove", "entity_id": entity_id}
         )
@@ -335,23 +434,19 @@ class EntityRegistry:
                 raise ValueError("New entity ID should be same domain")
 
             self.entities.pop(entity_id)
+            entity_id_index = self.hass.states.entity_id_index
+            entity_id_index.async_release(*split_entity_id(entity_id))
+            entity_id_index.async_claim(*split_entity_id(new_entity_id))
             entity_id = changes["entity_id"] = new_entity_id
 
         if new_unique_id is not _UNDEF:
-            conflict = next(
-                (
-                    entity
-                    for entity in self.entities.values()
-                    if entity.unique_id == new_unique_id
-                    and entity.domain == old.domain
-                    and entity.platform == old.platform
-                ),
-                None,
+            conflict_entity_id = self.async_get_entity_id(
+                old.domain, old.platform, new_unique_id
             )
-            if conflict:
+            if conflict_entity_id:
                 raise ValueError(
                     f"Unique id '{new_unique_id}' is already in use by "
-                    f"'{conflict.entity_id}'"
+                    f"'{conflict_entity_id}'"
                 )
             changes["unique_id"] = new_unique_id
 
@@ -381,7 +476,7 @@ class EntityRegistry:
             old_conf_load_func=load_yaml,
             old_conf_migrate_func=_async_migrate,
         )
-        entities: Dict[str, RegistryEntry] = OrderedDict()
+        entities = EntityRegistryItems()
 
         if data is not None:
             for entity in data["entities"]:
@@ -402,6 +497,10 @@ class EntityRegistry:
                     original_icon=entity.get("original_icon"),
                 )
 
+        entity_id_index = self.hass.states.entity_id_index
+        for entry in entities.values():
+            entity_id_index.async_claim(*split_entity_id(entry.entity_id))
+
         self.entities = entities
 
     @callback
@@ -439,12 +538,8 @@ class EntityRegistry:
     @callback
     def async_clear_config_entry(self, config_entry: str) -> None:
         """Clear config entry from registry entries."""
-        for entity_id in [
-            entity_id
-            for entity_id, entry in self.entities.items()
-            if config_entry == entry.config_entry_id
-        ]:
-            self.async_remove(entity_id)
+        for entry in self.entities.get_entries_for_config_entry_id(config_entry):
+            self.async_remove(entry.entity_id)
 
 
 @bind_hass
@@ -475,9 +570,7 @@ def async_entries_for_device(
     registry: EntityRegistry, device_id: str
 ) -> List[RegistryEntry]:
     """Return entries that match a device."""
-    return [
-        entry for entry in registry.entities.values() if entry.device_id == device_id
-    ]
+    return registry.entities.get_entries_for_device_id(device_id)
 
 
 @callback
@@ -485,11 +578,7 @@ def async_entries_for_config_entry(
     registry: EntityRegistry, config_entry_id: str
 ) -> List[RegistryEntry]:
     """Return entries that match a config entry."""
-    return [
-        entry
-        for entry in registry.entities.values()
-        if entry.config_entry_id == config_entry_id
-    ]
+    return registry.entities.get_entries_for_config_entry_id(config_entry_id)
 
 
 async def _async_migrate(entities: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
@@ -529,10 +618,9 @@ def async_setup_entity_restore(
     def _write_unavailable_states(_: Event) -> None:
         """Make sure state machine contains entry for each registered entity."""
         states = hass.states
-        existing = set(states.async_entity_ids())
 
         for entry in registry.entities.values():
-            if entry.entity_id in existing or entry.disabled:
+            if states.get(entry.entity_id) is not None or entry.disabled:
                 continue
 
             attrs: Dict[str, Any] = {ATTR_RESTORED: True}
@@ -570,10 +658,7 @@ async def async_migrate_entries(
     """Migrator of unique IDs."""
     ent_reg = await async_get_registry(hass)
 
-    for entry in ent_reg.entities.values():
-        if entry.config_entry_id != config_entry_id:
-            continue
-
+    for entry in ent_reg.entities.get_entries_for_config_entry_id(config_entry_id):
         updates = entry_callback(entry)
 
         if updates is not None:
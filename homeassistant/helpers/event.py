@@ -1,7 +1,10 @@
 """Helpers for listening to events."""
 from datetime import datetime, timedelta
 import functools as ft
-from typing import Any, Callable, Dict, Iterable, Optional, Union, cast
+import heapq
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
 
 import attr
 
@@ -14,13 +17,28 @@ from homeassistant.const import (
     SUN_EVENT_SUNRISE,
     SUN_EVENT_SUNSET,
 )
-from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    HassJob,
+    HomeAssistant,
+    State,
+    callback,
+)
+from homeassistant.exceptions import TemplateError
 from homeassistant.helpers.sun import get_astral_event_next
-from homeassistant.helpers.template import Template
+from homeassistant.helpers.template import RenderInfo, Template
 from homeassistant.loader import bind_hass
 from homeassistant.util import dt as dt_util
 from homeassistant.util.async_ import run_callback_threadsafe
 
+TRACK_STATE_CHANGE_CALLBACKS = "track_state_change_callbacks"
+TRACK_STATE_CHANGE_LISTENER = "track_state_change_listener"
+TRACK_POINT_IN_TIME_SCHEDULER = "track_point_in_time_scheduler"
+TRACK_TEMPLATE_RESULT_TRACKERS = "track_template_result_trackers"
+
+_LOGGER = logging.getLogger(__name__)
+
 # PyLint does not like the use of threaded_listener_factory
 # pylint: disable=invalid-name
 
@@ -72,21 +90,17 @@ def async_track_state_change(
 
     # Ensure it is a lowercase list with entity ids we want to match on
     if entity_ids == MATCH_ALL:
-        pass
+        entity_ids = (MATCH_ALL,)
     elif isinstance(entity_ids, str):
         entity_ids = (entity_ids.lower(),)
     else:
         entity_ids = tuple(entity_id.lower() for entity_id in entity_ids)
 
+    job = HassJob(action)
+
     @callback
     def state_change_listener(event: Event) -> None:
         """Handle specific state changes."""
-        if (
-            entity_ids != MATCH_ALL
-            and cast(str, event.data.get("entity_id")) not in entity_ids
-        ):
-            return
-
         old_state = event.data.get("old_state")
         if old_state is not None:
             old_state = old_state.state
@@ -96,19 +110,84 @@ def async_track_state_change(
             new_state = new_state.state
 
         if match_from_state(old_state) and match_to_state(new_state):
-            hass.async_run_job(
-                action,
+            hass.async_run_hass_job(
+                job,
                 event.data.get("entity_id"),
                 event.data.get("old_state"),
                 event.data.get("new_state"),
             )
 
-    return hass.bus.async_listen(EVENT_STATE_CHANGED, state_change_listener)
+    return async_track_state_change_event(hass, entity_ids, state_change_listener)
 
 
 track_state_change = threaded_listener_factory(async_track_state_change)
 
 
+@callback
+@bind_hass
+def async_track_state_change_event(
+    hass: HomeAssistant, entity_ids: Iterable[str], action: Callable[[Event], None]
+) -> CALLBACK_TYPE:
+    """Track state_changed events for specific entity ids.
+
+    All trackers share a single state_changed listener that dispatches each
+    event only to the actions registered for its entity_id, plus those
+    registered with MATCH_ALL.
+
+    Returns a function that can be called to remove the listener.
+
+    Must be run within the event loop.
+    """
+    entity_callbacks: Dict[str, List[HassJob]] = hass.data.setdefault(
+        TRACK_STATE_CHANGE_CALLBACKS, {}
+    )
+
+    if TRACK_STATE_CHANGE_LISTENER not in hass.data:
+
+        @callback
+        def _async_state_change_dispatcher(event: Event) -> None:
+            """Dispatch state changes by entity_id."""
+            entity_id = event.data.get("entity_id")
+
+            for key in (entity_id, MATCH_ALL):
+                if key not in entity_callbacks:
+                    continue
+
+                for job in entity_callbacks[key][:]:
+                    try:
+                        hass.async_run_hass_job(job, event)
+                    except Exception:  # pylint: disable=broad-except
+                        _LOGGER.exception(
+                            "Error while processing state changed for %s", entity_id
+                        )
+
+        hass.data[TRACK_STATE_CHANGE_LISTENER] = hass.bus.async_listen(
+            EVENT_STATE_CHANGED, _async_state_change_dispatcher
+        )
+
+    tracked_ids = set(entity_ids)
+    job = HassJob(action)
+
+    for entity_id in tracked_ids:
+        entity_callbacks.setdefault(entity_id, []).append(job)
+
+    @callback
+    def remove_listener() -> None:
+        """Remove state change listener."""
+        for entity_id in tracked_ids:
+            listeners = entity_callbacks.get(entity_id)
+            if listeners is None or job not in listeners:
+                continue
+            listeners.remove(job)
+            if not listeners:
+                del entity_callbacks[entity_id]
+
+        if not entity_callbacks and TRACK_STATE_CHANGE_LISTENER in hass.data:
+            hass.data.pop(TRACK_STATE_CHANGE_LISTENER)()
+
+    return remove_listener
+
+
 @callback
 @bind_hass
 def async_track_template(
@@ -116,34 +195,209 @@ def async_track_template(
     template: Template,
     action: Callable[[str, State, State], None],
     variables: Optional[Dict[str, Any]] = None,
+    rate_limit: Optional[timedelta] = None,
 ) -> CALLBACK_TYPE:
-    """Add a listener that track state changes with template condition."""
-    from . import condition
+    """Add a listener that track state changes with template condition.
 
+    Templates that depend on all states or whole domains are rendered at
+    most once per rate_limit, see async_track_template_result.
+    """
     # Local variable to keep track of if the action has already been triggered
     already_triggered = False
 
     @callback
-    def template_condition_listener(entity_id: str, from_s: State, to_s: State) -> None:
+    def template_condition_listener(event: Optional[Event], info: RenderInfo) -> None:
         """Check if condition is correct and run action."""
         nonlocal already_triggered
-        template_result = condition.async_template(hass, template, variables)
+        if event is None:
+            return
+
+        try:
+            template_result = info.result.lower() == "true"
+        except TemplateError as ex:
+            _LOGGER.error("Error during template condition: %s", ex)
+            template_result = False
 
         # Check to see if template returns true
         if template_result and not already_triggered:
             already_triggered = True
-            hass.async_run_job(action, entity_id, from_s, to_s)
+            hass.async_run_job(
+                action,
+                event.data.get("entity_id"),
+                event.data.get("old_state"),
+                event.data.get("new_state"),
+            )
         elif not template_result:
             already_triggered = False
 
-    return async_track_state_change(
-        hass, template.extract_entities(variables), template_condition_listener
+    return async_track_template_result(
+        hass, template, template_condition_listener, variables, rate_limit=rate_limit
     )
 
 
 track_template = threaded_listener_factory(async_track_template)
 
 
+@callback
+@bind_hass
+def async_track_template_result(
+    hass: HomeAssistant,
+    template: Template,
+    action: Callable[[Optional[Event], RenderInfo], None],
+    variables: Optional[Dict[str, Any]] = None,
+    entity_ids: Union[None, str, Iterable[str]] = None,
+    rate_limit: Optional[timedelta] = None,
+) -> CALLBACK_TYPE:
+    """Render a template now and again when the states it uses change.
+
+    action is called with the state_changed event, None for the first
+    render, and the RenderInfo of the render. Templates that do not reference
+    specific entities re-render on any state change, or only on changes in
+    the domains they iterate. Those renders are coalesced so that they run at
+    most once per rate_limit, with the last event of the window.
+
+    Returns a function that can be called to remove the listener.
+    """
+    if entity_ids is None:
+        entity_ids = template.extract_entities(variables)
+
+    tracker = TemplateResultTracker(hass, template, action, variables, rate_limit)
+    return tracker.async_setup(entity_ids)
+
+
+@attr.s(slots=True)
+class TemplateRenderStats:
+    """Cost and frequency of the renders of a tracked template."""
+
+    renders: int = attr.ib(default=0)
+    coalesced: int = attr.ib(default=0)
+    total_time: float = attr.ib(default=0.0)
+    max_time: float = attr.ib(default=0.0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the stats as a dictionary."""
+        return attr.asdict(self)
+
+
+@attr.s(eq=False)
+class TemplateResultTracker:
+    """Re-render a template when the states it references change.
+
+    The trackers that are set up are kept in
+    hass.data[TRACK_TEMPLATE_RESULT_TRACKERS] for their render stats.
+    """
+
+    hass = attr.ib(type=HomeAssistant)
+    template = attr.ib(type=Template)
+    action = attr.ib(type=Callable[[Optional[Event], RenderInfo], None])
+    variables = attr.ib(type=Optional[Dict[str, Any]])
+    rate_limit = attr.ib(type=Optional[timedelta])
+    stats = attr.ib(type=TemplateRenderStats, factory=TemplateRenderStats)
+    _info: Optional[RenderInfo] = attr.ib(default=None)
+    _match_all: bool = attr.ib(default=False)
+    _last_render: float = attr.ib(default=0.0)
+    _pending_event: Optional[Event] = attr.ib(default=None)
+    _pending_timer: Optional[Any] = attr.ib(default=None)
+
+    @callback
+    def async_setup(self, entity_ids: Union[str, Iterable[str]]) -> CALLBACK_TYPE:
+        """Render the template and start tracking its states."""
+        if entity_ids == MATCH_ALL:
+            self._match_all = True
+            entity_ids = (MATCH_ALL,)
+        elif isinstance(entity_ids, str):
+            entity_ids = (entity_ids.lower(),)
+        else:
+            entity_ids = tuple(entity_id.lower() for entity_id in entity_ids)
+
+        unsub = async_track_state_change_event(
+            self.hass, entity_ids, self._async_state_changed
+        )
+        trackers = self.hass.data.setdefault(TRACK_TEMPLATE_RESULT_TRACKERS, set())
+        trackers.add(self)
+
+        @callback
+        def remove_listener() -> None:
+            """Stop tracking the template."""
+            unsub()
+            trackers.discard(self)
+            if self._pending_timer is not None:
+                self._pending_timer.cancel()
+                self._pending_timer = None
+
+        try:
+            self._async_render(None)
+        except Exception:
+            # The caller never gets remove_listener to clean up
+            remove_listener()
+            raise
+
+        return remove_listener
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Render the template or wait for the end of the rate limit window."""
+        if not self._match_all:
+            self._async_render(event)
+            return
+
+        info = self._info
+        if (
+            info is not None
+            and info.iterates_domains
+            and not info.filter_lifecycle(event.data["entity_id"])
+        ):
+            return
+
+        if self._pending_timer is not None:
+            self._pending_event = event
+            self.stats.coalesced += 1
+            return
+
+        delay = 0.0
+        if self.rate_limit is not None:
+            delay = (
+                self._last_render
+                + self.rate_limit.total_seconds()
+                - self.hass.loop.time()
+            )
+
+        if delay <= 0:
+            self._async_render(event)
+            return
+
+        self._pending_event = event
+        self._pending_timer = self.hass.loop.call_later(
+            delay, self._async_render_pending
+        )
+
+    @callback
+    def _async_render_pending(self) -> None:
+        """Render for the last state change of the rate limit window."""
+        event = self._pending_event
+        self._pending_event = None
+        self._pending_timer = None
+        self._async_render(event)
+
+    @callback
+    def _async_render(self, event: Optional[Event]) -> None:
+        """Render the template and pass the result to the action."""
+        start = time.perf_counter()
+        self._info = self.template.async_render_to_info(self.variables)
+        elapsed = time.perf_counter() - start
+        self._last_render = self.hass.loop.time()
+
+        stats = self.stats
+        stats.renders += 1
+        stats.total_time += elapsed
+        stats.max_time = max(stats.max_time, elapsed)
+
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Rendering %s took %fs", self.template, elapsed)
+
+        self.action(event, self._info)
+
+
 @callback
 @bind_hass
 def async_track_same_state(
@@ -210,11 +464,12 @@ def async_track_point_in_time(
 ) -> CALLBACK_TYPE:
     """Add a listener that fires once after a specific point in time."""
     utc_point_in_time = dt_util.as_utc(point_in_time)
+    job = HassJob(action)
 
     @callback
     def utc_converter(utc_now: datetime) -> None:
         """Convert passed in UTC now to local now."""
-        hass.async_run_job(action, dt_util.as_local(utc_now))
+        hass.async_run_hass_job(job, dt_util.as_local(utc_now))
 
     return async_track_point_in_utc_time(hass, utc_converter, utc_point_in_time)
 
@@ -222,36 +477,123 @@ def async_track_point_in_time(
 track_point_in_time = threaded_listener_factory(async_track_point_in_time)
 
 
-@callback
-@bind_hass
-def async_track_point_in_utc_time(
-    hass: HomeAssistant, action: Callable[..., Any], point_in_time: datetime
-) -> CALLBACK_TYPE:
-    """Add a listener that fires once after a specific point in UTC time."""
-    # Ensure point_in_time is UTC
-    point_in_time = dt_util.as_utc(point_in_time)
+@attr.s
+class PointInTimeScheduler:
+    """Schedule actions at points in UTC time using a single min-heap.
+
+    The scheduler listens to time_changed events only while actions are
+    pending and, on each tick, only looks at the actions that are due.
+    """
+
+    hass = attr.ib(type=HomeAssistant)
+    _heap: List[List[Any]] = attr.ib(factory=list)
+    _seq: int = attr.ib(default=0)
+    _pending: int = attr.ib(default=0)
+    _unsub_time: Optional[CALLBACK_TYPE] = attr.ib(default=None)
+
+    @property
+    def pending(self) -> int:
+        """Return the number of pending actions."""
+        return self._pending
 
     @callback
-    def point_in_time_listener(event: Event) -> None:
-        """Listen for matching time_changed events."""
+    def async_schedule(
+        self, action: Callable[..., Any], point_in_time: datetime
+    ) -> CALLBACK_TYPE:
+        """Schedule action to run once at point_in_time.
+
+        Returns a function that can be called to cancel the action.
+        """
+        entry = [point_in_time, self._seq, HassJob(action)]
+        self._seq += 1
+        self._pending += 1
+        heapq.heappush(self._heap, entry)
+
+        if self._unsub_time is None:
+            self._unsub_time = self.hass.bus.async_listen(
+                EVENT_TIME_CHANGED, self._async_time_changed
+            )
+
+        @callback
+        def cancel() -> None:
+            """Cancel the scheduled action."""
+            if entry[2] is None:
+                return
+
+            # Cancelled entries are dropped lazily when they become due, or
+            # all at once when they make up most of the heap.
+            entry[2] = None
+            self._pending -= 1
+
+            if len(self._heap) > 2 * self._pending:
+                self._heap[:] = [item for item in self._heap if item[2] is not None]
+                heapq.heapify(self._heap)
+                self._async_unsub_if_idle()
+
+        return cancel
+
+    @callback
+    def _async_time_changed(self, event: Event) -> None:
+        """Run all actions that are due."""
         now = event.data[ATTR_NOW]
+        heap = self._heap
+        # Actions scheduled while handling this tick wait for the next one.
+        last_seq = self._seq
+        deferred = []
+
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            job = entry[2]
+
+            if job is None:
+                continue
 
-        if now < point_in_time or hasattr(point_in_time_listener, "run"):
+            if entry[1] >= last_seq:
+                deferred.append(entry)
+                continue
+
+            # Mark as done so that cancelling afterwards is a no-op.
+            entry[2] = None
+            self._pending -= 1
+
+            try:
+                self.hass.async_run_hass_job(job, now)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error running scheduled action %s", job.target)
+
+        for entry in deferred:
+            if entry[2] is not None:
+                heapq.heappush(heap, entry)
+
+        self._async_unsub_if_idle()
+
+    @callback
+    def _async_unsub_if_idle(self) -> None:
+        """Stop listening to time_changed when nothing is pending."""
+        if self._pending or self._unsub_time is None:
             return
 
-        # Set variable so that we will never run twice.
-        # Because the event bus might have to wait till a thread comes
-        # available to execute this listener it might occur that the
-        # listener gets lined up twice to be executed. This will make
-        # sure the second time it does nothing.
-        setattr(point_in_time_listener, "run", True)
-        async_unsub()
+        self._heap.clear()
+        self._unsub_time()
+        self._unsub_time = None
 
-        hass.async_run_job(action, now)
 
-    async_unsub = hass.bus.async_listen(EVENT_TIME_CHANGED, point_in_time_listener)
+@callback
+@bind_hass
+def async_track_point_in_utc_time(
+    hass: HomeAssistant, action: Callable[..., Any], point_in_time: datetime
+) -> CALLBACK_TYPE:
+    """Add a listener that fires once after a specific point in UTC time."""
+    scheduler: Optional[PointInTimeScheduler] = hass.data.get(
+        TRACK_POINT_IN_TIME_SCHEDULER
+    )
+
+    if scheduler is None:
+        scheduler = PointInTimeScheduler(hass)
+        hass.data[TRACK_POINT_IN_TIME_SCHEDULER] = scheduler
 
-    return async_unsub
+    # Ensure point_in_time is UTC
+    return scheduler.async_schedule(action, dt_util.as_utc(point_in_time))
 
 
 track_point_in_utc_time = threaded_listener_factory(async_track_point_in_utc_time)
@@ -278,6 +620,7 @@ def async_track_time_interval(
 ) -> CALLBACK_TYPE:
     """Add a listener that fires repetitively at every timedelta interval."""
     remove = None
+    job = HassJob(action)
 
     def next_interval() -> datetime:
         """Return the next interval."""
@@ -288,7 +631,7 @@ def async_track_time_interval(
         """Handle elapsed intervals."""
         nonlocal remove
         remove = async_track_point_in_utc_time(hass, interval_listener, next_interval())
-        hass.async_run_job(action, now)
+        hass.async_run_hass_job(job, now)
 
     remove = async_track_point_in_utc_time(hass, interval_listener, next_interval())
 
@@ -401,6 +744,8 @@ def async_track_utc_time_change(
     local: bool = False,
 ) -> CALLBACK_TYPE:
     """Add a listener that will fire if time matches a pattern."""
+    job = HassJob(action)
+
     # We do not have to wrap the function with time pattern matching logic
     # if no pattern given
     if all(val is None for val in (hour, minute, second)):
@@ -408,7 +753,7 @@ def async_track_utc_time_change(
         @callback
         def time_change_listener(event: Event) -> None:
             """Fire every time event that comes in."""
-            hass.async_run_job(action, event.data[ATTR_NOW])
+            hass.async_run_hass_job(job, event.data[ATTR_NOW])
 
         return hass.bus.async_listen(EVENT_TIME_CHANGED, time_change_listener)
 
@@ -445,7 +790,7 @@ def async_track_utc_time_change(
         last_now = now
 
         if next_time <= now:
-            hass.async_run_job(action, dt_util.as_local(now) if local else now)
+            hass.async_run_hass_job(job, dt_util.as_local(now) if local else now)
             calculate_next(now + timedelta(seconds=1))
 
     # We can't use async_track_point_in_utc_time here because it would
@@ -24,3 +24,14 @@ class JSONEncoder(json.JSONEncoder):
             return o.as_dict()
 
         return json.JSONEncoder.default(self, o)
+
+
+def cached_json_dumps(obj: Any) -> str:
+    """Return the JSON representation of a State or Event.
+
+    The object is serialized once and the result is cached on it, states and
+    events are not changed after they have been created.
+    """
+    if obj.json is None:
+        obj.json = json.dumps(obj, cls=JSONEncoder, allow_nan=False)
+    return obj.json  # type: ignore
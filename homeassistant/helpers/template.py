@@ -1,5 +1,6 @@
 """Template helper methods for rendering strings with Home Assistant data."""
 import base64
+from collections import OrderedDict
 from datetime import datetime
 from functools import wraps
 import json
@@ -7,6 +8,7 @@ import logging
 import math
 import random
 import re
+import threading
 from typing import Any, Dict, Iterable, List, Optional, Union
 
 import jinja2
@@ -48,6 +50,9 @@ _RE_GET_ENTITIES = re.compile(
 )
 _RE_JINJA_DELIMITERS = re.compile(r"\{%|\{\{")
 
+# Maximum number of compiled templates kept in the shared cache
+MAX_COMPILED_TEMPLATES = 1024
+
 
 @bind_hass
 def attach(hass, obj):
@@ -139,6 +144,11 @@ class RenderInfo:
             or entity_id in self._entities
         )
 
+    @property
+    def iterates_domains(self) -> bool:
+        """Return if the template iterates domains but not all states."""
+        return hasattr(self, "_domains") and not self._all_states
+
     @property
     def result(self) -> str:
         """Results of the template computation."""
@@ -159,6 +169,62 @@ class RenderInfo:
             self.filter_lifecycle = self._filter_lifecycle
 
 
+class CompiledTemplateCache:
+    """LRU cache of compiled template code shared by all templates.
+
+    Templates with the same source share their compiled code. Environments
+    with and without hass have different filters, so both are cached apart.
+    """
+
+    def __init__(self, maxsize: int = MAX_COMPILED_TEMPLATES) -> None:
+        """Initialise the cache."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compile(self, env, source: str):
+        """Return the compiled code of source, compiling it on a miss."""
+        key = (env.hass is not None, source)
+
+        with self._lock:
+            code = self._cache.get(key)
+            if code is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return code
+
+        code = env.compile(source)
+
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = code
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+        return code
+
+    def clear(self) -> None:
+        """Remove all compiled templates and reset the counters."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        """Return the cache statistics."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+        }
+
+
+COMPILED_TEMPLATE_CACHE = CompiledTemplateCache()
+
+
 class Template:
     """Class to hold a template and manage caching and rendering."""
 
@@ -187,7 +253,9 @@ class Template:
             return
 
         try:
-            self._compiled_code = self._env.compile(self.template)
+            self._compiled_code = COMPILED_TEMPLATE_CACHE.compile(
+                self._env, self.template
+            )
         except jinja2.exceptions.TemplateSyntaxError as err:
             raise TemplateError(err)
 
@@ -344,14 +412,15 @@ class AllStates:
         return iter(
             _wrap_state(self._hass, state)
             for state in sorted(
-                self._hass.states.async_all(), key=lambda state: state.entity_id
+                self._hass.states.async_states().values(),
+                key=lambda state: state.entity_id,
             )
         )
 
     def __len__(self):
         """Return number of states."""
         self._collect_all()
-        return len(self._hass.states.async_entity_ids())
+        return self._hass.states.async_entity_ids_count()
 
     def __call__(self, entity_id):
         """Return the states."""
@@ -388,12 +457,9 @@ class DomainStates:
         """Return the iteration over all the states."""
         self._collect_domain()
         return iter(
-            sorted(
-                (
-                    _wrap_state(self._hass, state)
-                    for state in self._hass.states.async_all()
-                    if state.domain == self._domain
-                ),
+            _wrap_state(self._hass, state)
+            for state in sorted(
+                self._hass.states.async_states(self._domain).values(),
                 key=lambda state: state.entity_id,
             )
         )
@@ -401,7 +467,7 @@ class DomainStates:
     def __len__(self) -> int:
         """Return number of states."""
         self._collect_domain()
-        return len(self._hass.states.async_entity_ids(self._domain))
+        return self._hass.states.async_entity_ids_count(self._domain)
 
     def __repr__(self) -> str:
         """Representation of Domain States."""
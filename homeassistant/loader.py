@@ -10,7 +10,9 @@ import importlib
 import json
 import logging
 import pathlib
+from stat import S_ISREG
 import sys
+import threading
 from types import ModuleType
 from typing import (
     TYPE_CHECKING,
@@ -39,6 +41,7 @@ _LOGGER = logging.getLogger(__name__)
 DATA_COMPONENTS = "components"
 DATA_INTEGRATIONS = "integrations"
 DATA_CUSTOM_COMPONENTS = "custom_components"
+DATA_MANIFEST_INDEX = "manifest_index"
 PACKAGE_CUSTOM_COMPONENTS = "custom_components"
 PACKAGE_BUILTIN = "homeassistant.components"
 CUSTOM_WARNING = (
@@ -49,6 +52,10 @@ CUSTOM_WARNING = (
 )
 _UNDEF = object()
 
+MANIFEST_INDEX_STORAGE_KEY = "core.manifest_index"
+MANIFEST_INDEX_STORAGE_VERSION = 1
+MANIFEST_INDEX_SAVE_DELAY = 10
+
 
 def manifest_from_legacy_module(domain: str, module: ModuleType) -> Dict:
     """Generate a manifest from a legacy module."""
@@ -74,14 +81,11 @@ async def _async_get_custom_components(
     except ImportError:
         return {}
 
+    index = await async_get_manifest_index(hass)
+
     def get_sub_directories(paths: List) -> List:
         """Return all sub directories in a set of paths."""
-        return [
-            entry
-            for path in paths
-            for entry in pathlib.Path(path).iterdir()
-            if entry.is_dir()
-        ]
+        return [name for path in paths for name in index.get_sub_directories(path)]
 
     dirs = await hass.async_add_executor_job(
         get_sub_directories, custom_components.__path__
@@ -90,11 +94,12 @@ async def _async_get_custom_components(
     integrations = await asyncio.gather(
         *(
             hass.async_add_executor_job(
-                Integration.resolve_from_root, hass, custom_components, comp.name
+                Integration.resolve_from_root, hass, custom_components, name
             )
-            for comp in dirs
+            for name in dirs
         )
     )
+    index.async_save_if_changed()
 
     return {
         integration.domain: integration
@@ -152,20 +157,29 @@ class Integration:
         cls, hass: "HomeAssistant", root_module: ModuleType, domain: str
     ) -> "Optional[Integration]":
         """Resolve an integration from a root module."""
+        index = hass.data.get(DATA_MANIFEST_INDEX)
+        if not isinstance(index, ManifestIndex):
+            index = None
+
         for base in root_module.__path__:  # type: ignore
             manifest_path = pathlib.Path(base) / domain / "manifest.json"
 
-            if not manifest_path.is_file():
-                continue
-
             try:
-                manifest = json.loads(manifest_path.read_text())
+                if index is not None:
+                    manifest = index.get_manifest(manifest_path)
+                elif manifest_path.is_file():
+                    manifest = json.loads(manifest_path.read_text())
+                else:
+                    manifest = None
             except ValueError as err:
                 _LOGGER.error(
                     "Error parsing manifest.json file at %s: %s", manifest_path, err
                 )
                 continue
 
+            if manifest is None:
+                continue
+
             return cls(
                 hass, f"{root_module.__name__}.{domain}", manifest_path.parent, manifest
             )
@@ -319,9 +333,11 @@ async def async_get_integration(hass: "HomeAssistant", domain: str) -> Integrati
 
     from homeassistant import components
 
+    index = await async_get_manifest_index(hass)
     integration = await hass.async_add_executor_job(
         Integration.resolve_from_root, hass, components, domain
     )
+    index.async_save_if_changed()
 
     if integration is not None:
         cache[domain] = integration
@@ -343,6 +359,141 @@ async def async_get_integration(hass: "HomeAssistant", domain: str) -> Integrati
     return integration
 
 
+class ManifestIndex:
+    """Manifests and directory listings of integrations, persisted.
+
+    The index is loaded with a single read of the storage file. A manifest
+    is only parsed again when the mtime or the size of its file changed, and
+    a directory is only listed again when its own mtime changed. Entries are
+    looked up from the executor, the index is saved from the event loop.
+    """
+
+    def __init__(self, hass: "HomeAssistant") -> None:
+        """Initialize an empty index."""
+        # pylint: disable=import-outside-toplevel
+        from homeassistant.helpers.storage import Store
+
+        self.hass = hass
+        self._store = Store(
+            hass, MANIFEST_INDEX_STORAGE_VERSION, MANIFEST_INDEX_STORAGE_KEY
+        )
+        # Entries as stored at the last run
+        self._stored_manifests: Dict[str, Dict] = {}
+        self._stored_directories: Dict[str, Dict] = {}
+        # Entries looked up since startup, only these are saved.
+        self._manifests: Dict[str, Dict] = {}
+        self._directories: Dict[str, Dict] = {}
+        self._changed = False
+        self._lock = threading.Lock()
+
+    async def async_load(self) -> None:
+        """Load the entries stored at the last run."""
+        try:
+            data = await self._store.async_load()
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Unable to load the manifest index, rebuilding it")
+            data = None
+        if isinstance(data, dict):
+            self._stored_manifests = data.get("manifests", {})
+            self._stored_directories = data.get("directories", {})
+
+    def get_manifest(self, manifest_path: pathlib.Path) -> Optional[Dict]:
+        """Return the manifest at manifest_path or None if there is none.
+
+        Raises ValueError if the manifest is not valid JSON.
+        """
+        key = str(manifest_path)
+
+        try:
+            stat = manifest_path.stat()
+        except OSError:
+            stat = None
+
+        if stat is None or not S_ISREG(stat.st_mode):
+            with self._lock:
+                self._changed |= key in self._stored_manifests
+                self._stored_manifests.pop(key, None)
+            return None
+
+        entry = self._manifests.get(key) or self._stored_manifests.get(key)
+
+        if (
+            entry is None
+            or entry["mtime"] != stat.st_mtime_ns
+            or entry.get("size") != stat.st_size
+        ):
+            entry = {
+                "mtime": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "manifest": json.loads(manifest_path.read_text()),
+            }
+            with self._lock:
+                self._changed = True
+
+        with self._lock:
+            self._manifests[key] = entry
+
+        return cast(Dict, entry["manifest"])
+
+    def get_sub_directories(self, path: str) -> List[str]:
+        """Return the names of the sub directories of path."""
+        mtime = pathlib.Path(path).stat().st_mtime_ns
+        entry = self._directories.get(path) or self._stored_directories.get(path)
+
+        if entry is None or entry["mtime"] != mtime:
+            entry = {
+                "mtime": mtime,
+                "names": sorted(
+                    child.name
+                    for child in pathlib.Path(path).iterdir()
+                    if child.is_dir()
+                ),
+            }
+            with self._lock:
+                self._changed = True
+
+        with self._lock:
+            self._directories[path] = entry
+
+        return cast(List[str], entry["names"])
+
+    def async_save_if_changed(self) -> None:
+        """Schedule saving the index if an entry changed."""
+        if not self._changed:
+            return
+        self._changed = False
+        self._store.async_delay_save(self._data_to_save, MANIFEST_INDEX_SAVE_DELAY)
+
+    def _data_to_save(self) -> Dict:
+        """Return the entries looked up since startup."""
+        with self._lock:
+            return {
+                "manifests": dict(self._manifests),
+                "directories": dict(self._directories),
+            }
+
+
+async def async_get_manifest_index(hass: "HomeAssistant") -> ManifestIndex:
+    """Return the manifest index, loading it on first use."""
+    index_or_evt = hass.data.get(DATA_MANIFEST_INDEX)
+
+    if index_or_evt is None:
+        evt = hass.data[DATA_MANIFEST_INDEX] = asyncio.Event()
+
+        index = ManifestIndex(hass)
+        await index.async_load()
+
+        hass.data[DATA_MANIFEST_INDEX] = index
+        evt.set()
+        return index
+
+    if isinstance(index_or_evt, asyncio.Event):
+        await index_or_evt.wait()
+        return cast(ManifestIndex, hass.data.get(DATA_MANIFEST_INDEX))
+
+    return cast(ManifestIndex, index_or_evt)
+
+
 class LoaderError(Exception):
     """Loader base error."""
 
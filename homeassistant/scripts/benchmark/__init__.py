@@ -2,7 +2,7 @@
 import argparse
 import asyncio
 from contextlib import suppress
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 from timeit import default_timer as timer
 from typing import Callable, Dict
@@ -67,11 +67,11 @@ async def async_million_events(hass):
 
     hass.bus.async_listen(event_name, listener)
 
+    start = timer()
+
     for _ in range(10 ** 6):
         hass.bus.async_fire(event_name)
 
-    start = timer()
-
     await event.wait()
 
     return timer() - start
@@ -95,11 +95,76 @@ async def async_million_time_changed_helper(hass):
     hass.helpers.event.async_track_time_change(listener, minute=0, second=0)
     event_data = {ATTR_NOW: datetime(2017, 10, 10, 15, 0, 0, tzinfo=dt_util.UTC)}
 
+    start = timer()
+
     for _ in range(10 ** 6):
         hass.bus.async_fire(EVENT_TIME_CHANGED, event_data)
 
+    await event.wait()
+
+    return timer() - start
+
+
+@benchmark
+async def async_time_changed_10k_pending_timers(hass):
+    """Run time changed events with 10k pending point in time trackers."""
+    count = 0
+    event = asyncio.Event()
+    now = dt_util.utcnow()
+
+    @core.callback
+    def listener(_):
+        """Handle event."""
+        nonlocal count
+        count += 1
+
+        if count == 10 ** 4:
+            event.set()
+
+    for _ in range(10 ** 4):
+        hass.helpers.event.async_track_point_in_utc_time(
+            listener, now + timedelta(days=1)
+        )
+
+    hass.helpers.event.async_track_utc_time_change(listener)
+
+    start = timer()
+
+    for second in range(10 ** 4):
+        hass.bus.async_fire(
+            EVENT_TIME_CHANGED, {ATTR_NOW: now + timedelta(seconds=second)}
+        )
+
+    await event.wait()
+
+    return timer() - start
+
+
+@benchmark
+async def async_coroutine_listener_100k_events(hass):
+    """Run 100k events through a coroutine listener.
+
+    Each event schedules a tracked task, this measures job dispatch.
+    """
+    count = 0
+    event_name = "benchmark_event"
+    event = asyncio.Event()
+
+    async def listener(_):
+        """Handle event."""
+        nonlocal count
+        count += 1
+
+        if count == 10 ** 5:
+            event.set()
+
+    hass.bus.async_listen(event_name, listener)
+
     start = timer()
 
+    for _ in range(10 ** 5):
+        hass.bus.async_fire(event_name)
+
     await event.wait()
 
     return timer() - start
@@ -128,11 +193,11 @@ async def async_million_state_changed_helper(hass):
         "new_state": core.State(entity_id, "on"),
     }
 
+    start = timer()
+
     for _ in range(10 ** 6):
         hass.bus.async_fire(EVENT_STATE_CHANGED, event_data)
 
-    start = timer()
-
     await event.wait()
 
     return timer() - start
@@ -155,34 +220,125 @@ def logbook_filtering_attributes(hass):
 @benchmark
 @asyncio.coroutine
 def _logbook_filtering(hass, last_changed, last_updated):
+    # pylint: disable=import-outside-toplevel
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
     from homeassistant.components import logbook
+    from homeassistant.components.recorder.models import Base, Events, States
+    from homeassistant.components.recorder.util import session_scope
 
     entity_id = "test.entity"
+    point = dt_util.utcnow()
+    last_changed = point + timedelta(seconds=last_changed)
+    last_updated = point + timedelta(seconds=last_updated)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+
+    with session_scope(session=session_factory()) as session:
+        session.bulk_insert_mappings(
+            Events,
+            [
+                {
+                    "event_id": idx,
+                    "event_type": EVENT_STATE_CHANGED,
+                    "event_data": "{}",
+                    "time_fired": point,
+                }
+                for idx in range(1, 10 ** 5 + 1)
+            ],
+        )
+        session.bulk_insert_mappings(
+            States,
+            [
+                {
+                    "state_id": idx,
+                    "event_id": idx,
+                    "old_state_id": idx - 1 if idx > 1 else None,
+                    "domain": "test",
+                    "entity_id": entity_id,
+                    "state": "on" if idx % 2 else "off",
+                    "attributes": "{}",
+                    "last_changed": last_changed,
+                    "last_updated": last_updated,
+                }
+                for idx in range(1, 10 ** 5 + 1)
+            ],
+        )
 
-    old_state = {"entity_id": entity_id, "state": "off"}
+    start = timer()
 
-    new_state = {
-        "entity_id": entity_id,
-        "state": "on",
-        "last_updated": last_updated,
-        "last_changed": last_changed,
-    }
+    with session_scope(session=session_factory()) as session:
+        # pylint: disable=protected-access
+        events = logbook._yield_events(
+            session, {}, point - timedelta(days=1), point + timedelta(days=1)
+        )
+        list(logbook.humanify(None, events))
 
-    event = core.Event(
-        EVENT_STATE_CHANGED,
-        {"entity_id": entity_id, "old_state": old_state, "new_state": new_state},
-    )
+    return timer() - start
 
-    def yield_events(event):
-        # pylint: disable=protected-access
-        entities_filter = logbook._generate_filter_from_config({})
-        for _ in range(10 ** 5):
-            if logbook._keep_event(event, entities_filter):
-                yield event
+
+@benchmark
+async def websocket_get_states_10k(hass):
+    """Build the websocket get_states result for 10k states 100 times."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.components.websocket_api import messages
+
+    for idx in range(10 ** 4):
+        hass.states.async_set(
+            f"sensor.benchmark_{idx}",
+            idx,
+            {"friendly_name": f"Benchmark {idx}", "unit_of_measurement": "W"},
+        )
+
+    start = timer()
+
+    for iden in range(100):
+        messages.cached_states_result_message(iden, hass.states.async_all())
+
+    return timer() - start
+
+
+@benchmark
+async def entity_registry_10k_entities(hass):
+    """Register 10k entities on 1k devices and look them up again."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.helpers import entity_registry
+
+    registry = entity_registry.EntityRegistry(hass)
+    registry.entities = entity_registry.EntityRegistryItems()
+    # Nothing to persist to
+    registry.async_schedule_save = lambda: None
+
+    start = timer()
+
+    for idx in range(10 ** 4):
+        registry.async_get_or_create(
+            "sensor", "benchmark", str(idx), device_id=f"device_{idx % 1000}"
+        )
+
+    for idx in range(10 ** 4):
+        registry.async_get_or_create(
+            "sensor", "benchmark", str(idx), device_id=f"device_{idx % 1000}"
+        )
+        entity_registry.async_entries_for_device(registry, f"device_{idx % 1000}")
+
+    return timer() - start
+
+
+@benchmark
+async def generate_entity_id_10k_same_name(hass):
+    """Generate and set 10k entity IDs for entities with the same name."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.helpers.entity import async_generate_entity_id
 
     start = timer()
 
-    list(logbook.humanify(None, yield_events(event)))
+    for _ in range(10 ** 4):
+        entity_id = async_generate_entity_id("sensor.{}", "Temperature", hass=hass)
+        hass.states.async_set(entity_id, 0)
 
     return timer() - start
 
@@ -16,6 +16,12 @@ ATTR_COMPONENT = "component"
 
 DATA_SETUP = "setup_tasks"
 DATA_DEPS_REQS = "deps_reqs_processed"
+DATA_SETUP_TIME = "setup_time"
+
+# Phases of setting up an integration that are timed
+SETUP_PHASE_IMPORT = "import"
+SETUP_PHASE_REQUIREMENTS = "requirements"
+SETUP_PHASE_SETUP = "setup"
 
 SLOW_SETUP_WARNING = 10
 
@@ -97,11 +103,13 @@ async def _async_setup_component(
         _LOGGER.error("Setup failed for %s: %s", domain, msg)
         async_notify_setup_error(hass, domain, link)
 
+    start = timer()
     try:
         integration = await loader.async_get_integration(hass, domain)
     except loader.IntegrationNotFound:
         log_error("Integration not found.")
         return False
+    _async_record_setup_time(hass, domain, SETUP_PHASE_IMPORT, timer() - start)
 
     # Validate all dependencies exist and there are no circular dependencies
     try:
@@ -132,6 +140,7 @@ async def _async_setup_component(
 
     # Some integrations fail on import because they call functions incorrectly.
     # So we do it before validating config to catch these errors.
+    start = timer()
     try:
         component = integration.get_component()
     except ImportError as err:
@@ -140,6 +149,7 @@ async def _async_setup_component(
     except Exception:  # pylint: disable=broad-except
         _LOGGER.exception("Setup failed for %s: unknown error", domain)
         return False
+    _async_record_setup_time(hass, domain, SETUP_PHASE_IMPORT, timer() - start)
 
     processed_config = await conf_util.async_process_component_config(
         hass, config, integration
@@ -182,6 +192,7 @@ async def _async_setup_component(
         return False
     finally:
         end = timer()
+        _async_record_setup_time(hass, domain, SETUP_PHASE_SETUP, end - start)
         if warn_task:
             warn_task.cancel()
     _LOGGER.info("Setup of domain %s took %.1f seconds.", domain, end - start)
@@ -286,13 +297,32 @@ async def async_process_deps_reqs(
         raise HomeAssistantError("Could not set up all dependencies.")
 
     if not hass.config.skip_pip and integration.requirements:
+        start = timer()
         await requirements.async_get_integration_with_requirements(
             hass, integration.domain
         )
+        _async_record_setup_time(
+            hass, integration.domain, SETUP_PHASE_REQUIREMENTS, timer() - start
+        )
 
     processed.add(integration.domain)
 
 
+@core.callback
+def _async_record_setup_time(
+    hass: core.HomeAssistant, domain: str, phase: str, seconds: float
+) -> None:
+    """Add the wall time spent in a setup phase of an integration."""
+    timings = hass.data.setdefault(DATA_SETUP_TIME, {}).setdefault(domain, {})
+    timings[phase] = timings.get(phase, 0) + seconds
+
+
+@core.callback
+def async_get_setup_timings(hass: core.HomeAssistant) -> Dict[str, Dict[str, float]]:
+    """Return the wall time in seconds of each setup phase per integration."""
+    return hass.data.get(DATA_SETUP_TIME, {})  # type: ignore
+
+
 @core.callback
 def async_when_setup(
     hass: core.HomeAssistant,
@@ -0,0 +1,245 @@
+"""Statistics over a sliding window of numbers, updated incrementally."""
+from collections import deque
+import heapq
+import math
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+# Rebuild the median heaps once they hold this many times more entries than
+# the window, to drop the entries removed lazily.
+HEAP_COMPACT_FACTOR = 2
+
+# Recompute the running sums once a window's worth of values, and at least
+# this many, have been removed, to stop rounding errors from piling up.
+RESYNC_MIN_REMOVED = 64
+
+# Recompute the running sums when removing a value leaves less than this
+# fraction of its squared deviation, the difference has lost its precision.
+RESYNC_CANCELLATION = 1e-6
+
+
+class RollingWindow:
+    """A first in, first out window of numbers with running statistics.
+
+    Adding and removing a value updates the sum and the Welford mean and
+    variance in O(1). The sums are recomputed exactly once every window's
+    worth of removals, or when removing an outlier cancels most of the
+    variance, to keep rounding errors in check. Min and max come from
+    monotonic deques in amortized O(1) and the median from two heaps in
+    O(log n).
+    """
+
+    def __init__(self, maxlen: Optional[int] = None) -> None:
+        """Initialize the window, the oldest value is dropped past maxlen."""
+        self.maxlen = maxlen
+        self._values: Deque[float] = deque()
+        # Sequence number of the oldest and the next value
+        self._start = 0
+        self._end = 0
+        self._total = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._removed = 0
+        # Candidates for min and max as (sequence, value)
+        self._min: Deque[Tuple[int, float]] = deque()
+        self._max: Deque[Tuple[int, float]] = deque()
+        # Lower half as a max heap of (-value, sequence), upper half as a min
+        # heap of (value, sequence). Values that left the window stay in the
+        # heaps until they reach the top.
+        self._low: List[Tuple[float, int]] = []
+        self._high: List[Tuple[float, int]] = []
+        self._in_low: Dict[int, bool] = {}
+        self._low_size = 0
+        self._high_size = 0
+
+    def __len__(self) -> int:
+        """Return the number of values in the window."""
+        return len(self._values)
+
+    def __iter__(self) -> Iterator[float]:
+        """Iterate the values from oldest to newest."""
+        return iter(self._values)
+
+    def __getitem__(self, index: int) -> float:
+        """Return a value, 0 is the oldest and -1 the newest."""
+        return self._values[index]
+
+    def append(self, value: float) -> Optional[float]:
+        """Add a value, return the value dropped to stay within maxlen."""
+        dropped = None
+        if self.maxlen is not None and len(self._values) >= self.maxlen:
+            dropped = self.popleft()
+
+        seq = self._end
+        self._end += 1
+        self._values.append(value)
+
+        self._total += value
+        delta = value - self._mean
+        self._mean += delta / len(self._values)
+        self._m2 += delta * (value - self._mean)
+
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((seq, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((seq, value))
+
+        self._prune()
+        if not self._low or value <= -self._low[0][0]:
+            heapq.heappush(self._low, (-value, seq))
+            self._in_low[seq] = True
+            self._low_size += 1
+        else:
+            heapq.heappush(self._high, (value, seq))
+            self._in_low[seq] = False
+            self._high_size += 1
+        self._rebalance()
+
+        return dropped
+
+    def popleft(self) -> float:
+        """Remove and return the oldest value."""
+        value = self._values.popleft()
+        seq = self._start
+        self._start += 1
+
+        count = len(self._values)
+        self._removed += 1
+        if count and self._removed < max(count, RESYNC_MIN_REMOVED):
+            mean = (self._mean * (count + 1) - value) / count
+            removed_m2 = (value - self._mean) * (value - mean)
+            m2 = self._m2 - removed_m2
+            if m2 < 0 or m2 < removed_m2 * RESYNC_CANCELLATION:
+                self._resync()
+            else:
+                self._total -= value
+                self._mean = mean
+                self._m2 = m2
+        else:
+            self._resync()
+
+        if self._min[0][0] == seq:
+            self._min.popleft()
+        if self._max[0][0] == seq:
+            self._max.popleft()
+
+        if self._in_low.pop(seq):
+            self._low_size -= 1
+        else:
+            self._high_size -= 1
+        self._rebalance()
+
+        if len(self._low) + len(self._high) > HEAP_COMPACT_FACTOR * max(count, 8):
+            self._compact()
+
+        return value
+
+    def clear(self) -> None:
+        """Remove all values."""
+        self._values.clear()
+        self._start = self._end
+        self._resync()
+        self._min.clear()
+        self._max.clear()
+        self._low = []
+        self._high = []
+        self._in_low = {}
+        self._low_size = self._high_size = 0
+
+    @property
+    def total(self) -> float:
+        """Return the sum of the values."""
+        return self._total
+
+    @property
+    def mean(self) -> float:
+        """Return the mean, requires at least one value."""
+        self._require(1)
+        return self._mean
+
+    @property
+    def variance(self) -> float:
+        """Return the sample variance, requires at least two values."""
+        self._require(2)
+        if self._min[0][1] == self._max[0][1]:
+            return 0.0
+        return self._m2 / (len(self._values) - 1)
+
+    @property
+    def stdev(self) -> float:
+        """Return the sample standard deviation, requires at least two values."""
+        return math.sqrt(self.variance)
+
+    @property
+    def min(self) -> float:
+        """Return the smallest value, requires at least one value."""
+        self._require(1)
+        return self._min[0][1]
+
+    @property
+    def max(self) -> float:
+        """Return the largest value, requires at least one value."""
+        self._require(1)
+        return self._max[0][1]
+
+    @property
+    def median(self) -> float:
+        """Return the median, requires at least one value."""
+        self._require(1)
+        self._prune()
+        if self._low_size > self._high_size:
+            return -self._low[0][0]
+        return (-self._low[0][0] + self._high[0][0]) / 2
+
+    def _resync(self) -> None:
+        """Recompute the running sums from the values in the window."""
+        values = self._values
+        self._removed = 0
+        if not values:
+            self._total = self._mean = self._m2 = 0.0
+            return
+        self._total = math.fsum(values)
+        self._mean = self._total / len(values)
+        self._m2 = math.fsum((value - self._mean) ** 2 for value in values)
+
+    def _require(self, count: int) -> None:
+        """Raise if the window holds less than count values."""
+        if len(self._values) < count:
+            raise ValueError(f"At least {count} value(s) required")
+
+    def _prune(self) -> None:
+        """Drop removed values from the top of the heaps."""
+        start = self._start
+        low, high = self._low, self._high
+        while low and low[0][1] < start:
+            heapq.heappop(low)
+        while high and high[0][1] < start:
+            heapq.heappop(high)
+
+    def _rebalance(self) -> None:
+        """Keep the lower half equal to or one larger than the upper half."""
+        while True:
+            self._prune()
+            if self._low_size > self._high_size + 1:
+                neg_value, seq = heapq.heappop(self._low)
+                heapq.heappush(self._high, (-neg_value, seq))
+                self._in_low[seq] = False
+                self._low_size -= 1
+                self._high_size += 1
+            elif self._low_size < self._high_size:
+                value, seq = heapq.heappop(self._high)
+                heapq.heappush(self._low, (-value, seq))
+                self._in_low[seq] = True
+                self._low_size += 1
+                self._high_size -= 1
+            else:
+                return
+
+    def _compact(self) -> None:
+        """Rebuild the heaps from the values in the window."""
+        start = self._start
+        self._low = [item for item in self._low if item[1] >= start]
+        self._high = [item for item in self._high if item[1] >= start]
+        heapq.heapify(self._low)
+        heapq.heapify(self._high)
@@ -115,6 +115,11 @@ def get_test_home_assistant():
     asyncio.set_event_loop(loop)
     hass = loop.run_until_complete(async_test_home_assistant(loop))
 
+    # Storage is not mocked for these instances, keep the manifest index from
+    # being written to the test config dir.
+    index = hass.data[loader.DATA_MANIFEST_INDEX] = loader.ManifestIndex(hass)
+    index.async_save_if_changed = lambda: None
+
     stop_event = threading.Event()
 
     def run_loop():
@@ -359,7 +364,9 @@ def mock_component(hass, component):
 def mock_registry(hass, mock_entries=None):
     """Mock the Entity Registry."""
     registry = entity_registry.EntityRegistry(hass)
-    registry.entities = mock_entries or OrderedDict()
+    registry.entities = entity_registry.EntityRegistryItems()
+    for key, entry in (mock_entries or {}).items():
+        registry.entities[key] = entry
 
     hass.data[entity_registry.DATA_REGISTRY] = registry
     return registry
@@ -377,7 +384,9 @@ def mock_area_registry(hass, mock_entries=None):
 def mock_device_registry(hass, mock_entries=None):
     """Mock the Device Registry."""
     registry = device_registry.DeviceRegistry(hass)
-    registry.devices = mock_entries or OrderedDict()
+    registry.devices = device_registry.DeviceRegistryItems()
+    for key, entry in (mock_entries or {}).items():
+        registry.devices[key] = entry
 
     hass.data[device_registry.DATA_REGISTRY] = registry
     return registry
@@ -802,6 +811,7 @@ def init_recorder_component(hass, add_config=None):
     """Initialize the recorder."""
     config = dict(add_config) if add_config else {}
     config[recorder.CONF_DB_URL] = "sqlite://"  # In memory DB
+    config.setdefault(recorder.CONF_COMMIT_INTERVAL, 0)
 
     with patch("homeassistant.components.recorder.migration.migrate_schema"):
         assert setup_component(hass, recorder.DOMAIN, {recorder.DOMAIN: config})
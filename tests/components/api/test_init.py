@@ -12,7 +12,7 @@ from homeassistant.bootstrap import DATA_LOGGING
 import homeassistant.core as ha
 from homeassistant.setup import async_setup_component
 
-from tests.common import async_mock_service
+from tests.common import async_mock_service, get_system_health_info
 
 
 @pytest.fixture
@@ -335,7 +335,9 @@ async def test_stream_with_restricted(hass, mock_api_client):
         f"{const.URL_API_STREAM}?restrict=test_event1,test_event3"
     )
     assert resp.status == 200
-    assert listen_count + 1 == _listen_count(hass)
+    # One listener per event type, including homeassistant_stop
+    assert listen_count + 3 == _listen_count(hass)
+    assert hass.bus.async_listeners().get(const.MATCH_ALL, 0) == 0
 
     hass.bus.async_fire("test_event1")
     data = await _stream_next_event(resp.content)
@@ -347,6 +349,58 @@ async def test_stream_with_restricted(hass, mock_api_client):
     assert data["event_type"] == "test_event3"
 
 
+async def test_stream_drops_oldest_events(hass, mock_api_client):
+    """Test a full stream queue drops the oldest events."""
+    with patch("homeassistant.components.api.STREAM_QUEUE_SIZE", 2):
+        resp = await mock_api_client.get(f"{const.URL_API_STREAM}?restrict=test_event")
+    assert resp.status == 200
+
+    for idx in range(5):
+        hass.bus.async_fire("test_event", {"idx": idx})
+
+    data = await _stream_next_event(resp.content)
+    assert data["data"]["idx"] == 3
+    data = await _stream_next_event(resp.content)
+    assert data["data"]["idx"] == 4
+
+    info = await get_system_health_info(hass, "api")
+    assert info == {
+        "event_streams": 1,
+        "stream_dropped_events": 3,
+        "stream_overflow_disconnects": 0,
+    }
+
+
+async def test_stream_overflow_disconnect(hass, mock_api_client):
+    """Test a full stream queue disconnects with the disconnect policy."""
+    listen_count = _listen_count(hass)
+
+    with patch("homeassistant.components.api.STREAM_QUEUE_SIZE", 2):
+        resp = await mock_api_client.get(
+            f"{const.URL_API_STREAM}?restrict=test_event&overflow=disconnect"
+        )
+    assert resp.status == 200
+
+    for idx in range(3):
+        hass.bus.async_fire("test_event", {"idx": idx})
+
+    assert b"test_event" not in await resp.content.read()
+    assert listen_count == _listen_count(hass)
+
+    info = await get_system_health_info(hass, "api")
+    assert info == {
+        "event_streams": 0,
+        "stream_dropped_events": 2,
+        "stream_overflow_disconnects": 1,
+    }
+
+
+async def test_stream_invalid_overflow(hass, mock_api_client):
+    """Test the stream rejects an unknown overflow policy."""
+    resp = await mock_api_client.get(f"{const.URL_API_STREAM}?overflow=block")
+    assert resp.status == 400
+
+
 async def _stream_next_event(stream):
     """Read the stream for next event while ignoring ping."""
     while True:
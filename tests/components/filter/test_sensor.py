@@ -4,6 +4,7 @@ import unittest
 from unittest.mock import patch
 
 from homeassistant.components.filter.sensor import (
+    FilterState,
     LowPassFilter,
     OutlierFilter,
     RangeFilter,
@@ -181,6 +182,49 @@ class TestFilterSensor(unittest.TestCase):
                 state = self.hass.states.get("sensor.test")
                 assert "18.0" == state.state
 
+    def test_history_unit_of_last_processed_state(self):
+        """Test the unit is taken from the last history state that was kept."""
+        self.init_recorder()
+        config = {
+            "history": {},
+            "sensor": {
+                "platform": "filter",
+                "name": "test",
+                "entity_id": "sensor.test_monitored",
+                "filters": [{"filter": "lowpass", "window_size": 10}],
+            },
+        }
+        t_0 = dt_util.utcnow() - timedelta(minutes=1)
+        t_1 = dt_util.utcnow() - timedelta(minutes=2)
+
+        fake_states = {
+            "sensor.test_monitored": [
+                ha.State(
+                    "sensor.test_monitored",
+                    "error",
+                    {"unit_of_measurement": "%"},
+                    last_updated=t_0,
+                ),
+                ha.State(
+                    "sensor.test_monitored",
+                    18.0,
+                    {"unit_of_measurement": "°C"},
+                    last_updated=t_1,
+                ),
+            ]
+        }
+        with patch(
+            "homeassistant.components.history.get_last_state_changes",
+            return_value=fake_states,
+        ):
+            with assert_setup_component(1, "sensor"):
+                assert setup_component(self.hass, "sensor", config)
+
+            self.hass.block_till_done()
+            state = self.hass.states.get("sensor.test")
+            assert "18.0" == state.state
+            assert "°C" == state.attributes["unit_of_measurement"]
+
     def test_outlier(self):
         """Test if outlier filter works."""
         filt = OutlierFilter(window_size=3, precision=2, entity=None, radius=4.0)
@@ -295,6 +339,18 @@ class TestFilterSensor(unittest.TestCase):
                 filtered.append(new_state)
         assert [20, 18, 22] == [f.state for f in filtered]
 
+    def test_process_all(self):
+        """Test a batch drops skipped states and states that are not numbers."""
+        filt = OutlierFilter(window_size=3, precision=2, entity=None, radius=4.0)
+        fstates = [
+            FilterState(ha.State("sensor.test", value)) for value in (20, "on", 21)
+        ]
+        assert [20, 21] == [f.state for f in filt.process_all(fstates)]
+
+        filt = ThrottleFilter(window_size=2, precision=None, entity=None)
+        fstates = [FilterState(state) for state in self.values]
+        assert [20, 18, 22] == [f.state for f in filt.process_all(fstates)]
+
     def test_time_sma(self):
         """Test if time_sma filter works."""
         filt = TimeSMAFilter(
@@ -303,3 +359,31 @@ class TestFilterSensor(unittest.TestCase):
         for state in self.values:
             filtered = filt.filter_state(state)
         assert 21.5 == filtered.state
+
+    def test_time_sma_long_run(self):
+        """Test the running time_sma sum over many leaked states."""
+        window = timedelta(minutes=5)
+        filt = TimeSMAFilter(window_size=window, precision=6, entity=None, type="last")
+        start = dt_util.utcnow()
+        samples = [
+            (start + timedelta(minutes=minute), float((minute * 7) % 11))
+            for minute in range(60)
+        ]
+        for idx, (timestamp, value) in enumerate(samples):
+            state = ha.State("sensor.test", value, last_updated=timestamp)
+            filtered = filt.filter_state(state)
+
+            # Sum over the whole window as a reference
+            queue = [
+                sample
+                for sample in samples[: idx + 1]
+                if sample[0] + window > timestamp
+            ]
+            leaked = samples[: idx + 1 - len(queue)]
+            prev = leaked[-1] if leaked else queue[0]
+            begin = timestamp - window
+            expected = 0
+            for sample in queue:
+                expected += (sample[0] - begin).total_seconds() * prev[1]
+                begin, prev = sample[0], sample
+            assert round(expected / window.total_seconds(), 6) == filtered.state
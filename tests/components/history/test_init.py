@@ -1,11 +1,15 @@
 """The tests the History component."""
 # pylint: disable=protected-access,invalid-name
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+import json
 import unittest
 from unittest.mock import patch, sentinel
 
 from homeassistant.components import history, recorder
+from homeassistant.const import ATTR_HIDDEN
 import homeassistant.core as ha
+from homeassistant.helpers.json import JSONEncoder
 from homeassistant.setup import async_setup_component, setup_component
 import homeassistant.util.dt as dt_util
 
@@ -148,6 +152,14 @@ class TestComponentHistory(unittest.TestCase):
 
         assert states == hist[entity_id]
 
+        hist = history.state_changes_during_period(
+            self.hass, start, end, entity_id, minimal_response=True
+        )
+
+        assert [(state.state, state.last_changed) for state in states] == [
+            (state.state, state.last_changed) for state in hist[entity_id]
+        ]
+
     def test_get_last_state_changes(self):
         """Test number of state changes."""
         self.init_recorder()
@@ -526,6 +538,180 @@ class TestComponentHistory(unittest.TestCase):
         )
         assert list(hist.keys()) == entity_ids
 
+    def test_get_significant_states_minimal_response(self):
+        """Test minimal response states match full states."""
+        zero, four, states = self.record_states()
+        hist = history.get_significant_states(
+            self.hass, zero, four, filters=history.Filters(), minimal_response=True
+        )
+
+        assert set(hist) == set(states)
+        for entity_id, state_list in states.items():
+            assert [
+                (state.state, state.last_changed, dict(state.attributes))
+                for state in state_list
+            ] == [
+                (state.state, state.last_changed, dict(state.attributes))
+                for state in hist[entity_id]
+            ]
+            assert all(
+                isinstance(state, history.LazyState) for state in hist[entity_id]
+            )
+
+    def test_get_significant_states_minimal_response_hidden(self):
+        """Test minimal responses skip hidden states and keep the context."""
+        self.init_recorder()
+        start = dt_util.utcnow()
+        context = ha.Context(user_id="abcd")
+        self.hass.states.set("light.shown", "on", context=context)
+        self.hass.states.set("light.hidden", "on", {ATTR_HIDDEN: True})
+        self.wait_recording_done()
+        # Rows written before attributes were shared
+        with recorder.session_scope(hass=self.hass) as session:
+            for entity_id, attributes in (
+                ("light.legacy", {"brightness": 10}),
+                ("light.legacy_hidden", {ATTR_HIDDEN: True}),
+            ):
+                session.add(
+                    recorder.models.States(
+                        entity_id=entity_id,
+                        domain="light",
+                        state="on",
+                        attributes=json.dumps(attributes),
+                        last_changed=start + timedelta(microseconds=1),
+                        last_updated=start + timedelta(microseconds=1),
+                    )
+                )
+        end = dt_util.utcnow()
+
+        with patch.object(history, "ATTRIBUTES_BATCH_SIZE", 1):
+            hist = history.get_significant_states(
+                self.hass,
+                start,
+                end,
+                include_start_time_state=False,
+                minimal_response=True,
+            )
+
+        assert set(hist) == {"light.legacy", "light.shown"}
+        assert hist["light.legacy"][0].attributes == {"brightness": 10}
+        state = hist["light.shown"][0]
+        assert state.context.id == context.id
+        assert state.context.user_id == "abcd"
+
+    def test_stream_significant_states(self):
+        """Test streaming returns the significant states grouped by entity."""
+        zero, four, states = self.record_states()
+        one_and_half = zero + timedelta(seconds=1.5)
+
+        with patch("homeassistant.components.history.STREAM_CHUNK_SIZE", 64), patch(
+            "homeassistant.components.history.STREAM_BATCH_SIZE", 2
+        ):
+            chunks = list(
+                history.stream_significant_states(
+                    self.hass, one_and_half, four, filters=history.Filters()
+                )
+            )
+
+        assert len(chunks) > 1
+        result = json.loads(b"".join(chunks))
+        hist = history.get_significant_states(
+            self.hass, one_and_half, four, filters=history.Filters()
+        )
+        expected = sorted(
+            (
+                json.loads(json.dumps(state_list, cls=JSONEncoder))
+                for state_list in hist.values()
+            ),
+            key=lambda state_list: state_list[0]["entity_id"],
+        )
+        assert result == expected
+
+    def test_stream_significant_states_ordered(self):
+        """Test streaming keeps the first entity ids, then the request order."""
+        zero, four, states = self.record_states()
+        entity_ids = ["media_player.test2", "media_player.test", "thermostat.test"]
+
+        chunks = history.stream_significant_states(
+            self.hass,
+            zero,
+            four,
+            entity_ids,
+            filters=history.Filters(),
+            first_entity_ids=["thermostat.test", "light.not_requested"],
+        )
+
+        result = json.loads(b"".join(chunks))
+        assert [state_list[0]["entity_id"] for state_list in result] == [
+            "thermostat.test",
+            "media_player.test2",
+            "media_player.test",
+        ]
+        assert len(result[0]) == len(states["thermostat.test"])
+
+        with patch.object(history, "STREAM_BATCH_SIZE", 1):
+            chunks = history.stream_significant_states(
+                self.hass, zero, four, entity_ids[::-1], filters=history.Filters()
+            )
+            result = json.loads(b"".join(chunks))
+
+        assert [state_list[0]["entity_id"] for state_list in result] == [
+            "thermostat.test",
+            "media_player.test",
+            "media_player.test2",
+        ]
+        assert [len(state_list) for state_list in result] == [
+            len(states[ent_id]) for ent_id in entity_ids[::-1]
+        ]
+
+    def test_stream_significant_states_threads(self):
+        """Test streaming can be resumed from other threads."""
+        zero, four, _ = self.record_states()
+        expected = b"".join(
+            history.stream_significant_states(
+                self.hass, zero, four, filters=history.Filters()
+            )
+        )
+
+        with patch.object(history, "STREAM_CHUNK_SIZE", 1), patch.object(
+            history, "STREAM_BATCH_SIZE", 1
+        ):
+            chunks = history.stream_significant_states(
+                self.hass, zero, four, filters=history.Filters()
+            )
+            result = []
+            while True:
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    chunk = executor.submit(next, chunks, None).result()
+                if chunk is None:
+                    break
+                result.append(chunk)
+
+        assert len(result) > 1
+        assert b"".join(result) == expected
+
+    def test_stream_significant_states_minimal_response(self):
+        """Test streaming a minimal response only has full first states."""
+        zero, four, states = self.record_states()
+
+        chunks = history.stream_significant_states(
+            self.hass,
+            zero,
+            four,
+            ["media_player.test"],
+            filters=history.Filters(),
+            minimal_response=True,
+        )
+
+        result = json.loads(b"".join(chunks))
+        first, *others = result[0]
+        assert first["entity_id"] == "media_player.test"
+        assert first["attributes"] == {"media_title": str(sentinel.mt1)}
+        assert others == [
+            {"state": state.state, "last_changed": state.last_changed.isoformat()}
+            for state in states["media_player.test"][1:]
+        ]
+
     def check_significant_states(self, zero, four, states, config):
         """Check if significant states are retrieved."""
         filters = history.Filters()
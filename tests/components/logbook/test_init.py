@@ -165,12 +165,9 @@ class TestComponentLogbook(unittest.TestCase):
         eventB = self.create_state_changed_event(pointB, entity_id2, 20)
         eventA.data["old_state"] = None
 
-        entities_filter = logbook._generate_filter_from_config({})
-        events = [
-            e
-            for e in (ha.Event(EVENT_HOMEASSISTANT_STOP), eventA, eventB)
-            if logbook._keep_event(e, entities_filter)
-        ]
+        events = self.filter_events(
+            {}, (ha.Event(EVENT_HOMEASSISTANT_STOP), eventA, eventB)
+        )
         entries = list(logbook.humanify(self.hass, events))
 
         assert 2 == len(entries)
@@ -192,12 +189,9 @@ class TestComponentLogbook(unittest.TestCase):
         eventB = self.create_state_changed_event(pointB, entity_id2, 20)
         eventA.data["new_state"] = None
 
-        entities_filter = logbook._generate_filter_from_config({})
-        events = [
-            e
-            for e in (ha.Event(EVENT_HOMEASSISTANT_STOP), eventA, eventB)
-            if logbook._keep_event(e, entities_filter)
-        ]
+        events = self.filter_events(
+            {}, (ha.Event(EVENT_HOMEASSISTANT_STOP), eventA, eventB)
+        )
         entries = list(logbook.humanify(self.hass, events))
 
         assert 2 == len(entries)
@@ -220,12 +214,9 @@ class TestComponentLogbook(unittest.TestCase):
         )
         eventB = self.create_state_changed_event(pointB, entity_id2, 20)
 
-        entities_filter = logbook._generate_filter_from_config({})
-        events = [
-            e
-            for e in (ha.Event(EVENT_HOMEASSISTANT_STOP), eventA, eventB)
-            if logbook._keep_event(e, entities_filter)
-        ]
+        events = self.filter_events(
+            {}, (ha.Event(EVENT_HOMEASSISTANT_STOP), eventA, eventB)
+        )
         entries = list(logbook.humanify(self.hass, events))
 
         assert 2 == len(entries)
@@ -254,12 +245,9 @@ class TestComponentLogbook(unittest.TestCase):
                 },
             }
         )
-        entities_filter = logbook._generate_filter_from_config(config[logbook.DOMAIN])
-        events = [
-            e
-            for e in (ha.Event(EVENT_HOMEASSISTANT_STOP), eventA, eventB)
-            if logbook._keep_event(e, entities_filter)
-        ]
+        events = self.filter_events(
+            config[logbook.DOMAIN], (ha.Event(EVENT_HOMEASSISTANT_STOP), eventA, eventB)
+        )
         entries = list(logbook.humanify(self.hass, events))
 
         assert 2 == len(entries)
@@ -290,18 +278,16 @@ class TestComponentLogbook(unittest.TestCase):
                 },
             }
         )
-        entities_filter = logbook._generate_filter_from_config(config[logbook.DOMAIN])
-        events = [
-            e
-            for e in (
+        events = self.filter_events(
+            config[logbook.DOMAIN],
+            (
                 ha.Event(EVENT_HOMEASSISTANT_START),
                 ha.Event(EVENT_ALEXA_SMART_HOME),
                 ha.Event(EVENT_HOMEKIT_CHANGED),
                 eventA,
                 eventB,
-            )
-            if logbook._keep_event(e, entities_filter)
-        ]
+            ),
+        )
         entries = list(logbook.humanify(self.hass, events))
 
         assert 2 == len(entries)
@@ -337,19 +323,16 @@ class TestComponentLogbook(unittest.TestCase):
                 },
             }
         )
-        entities_filter = logbook._generate_filter_from_config(config[logbook.DOMAIN])
-        events = [
-            e
-            for e in (ha.Event(EVENT_HOMEASSISTANT_STOP), eventA, eventB)
-            if logbook._keep_event(e, entities_filter)
-        ]
+        events = self.filter_events(
+            config[logbook.DOMAIN], (ha.Event(EVENT_HOMEASSISTANT_STOP), eventA, eventB)
+        )
         entries = list(logbook.humanify(self.hass, events))
 
         assert 2 == len(entries)
+        self.assert_entry(entries[0], name=name, domain=domain, entity_id=entity_id2)
         self.assert_entry(
-            entries[0], name="Home Assistant", message="stopped", domain=ha.DOMAIN
+            entries[1], name="Home Assistant", message="stopped", domain=ha.DOMAIN
         )
-        self.assert_entry(entries[1], name=name, domain=domain, entity_id=entity_id2)
 
     def test_exclude_script_events(self):
         """Test if script start can be excluded by entity_id."""
@@ -376,19 +359,16 @@ class TestComponentLogbook(unittest.TestCase):
                 },
             }
         )
-        entities_filter = logbook._generate_filter_from_config(config[logbook.DOMAIN])
-        events = [
-            e
-            for e in (ha.Event(EVENT_HOMEASSISTANT_STOP), eventA, eventB)
-            if logbook._keep_event(e, entities_filter)
-        ]
+        events = self.filter_events(
+            config[logbook.DOMAIN], (ha.Event(EVENT_HOMEASSISTANT_STOP), eventA, eventB)
+        )
         entries = list(logbook.humanify(self.hass, events))
 
         assert 2 == len(entries)
+        self.assert_entry(entries[0], name=name, domain=domain, entity_id=entity_id2)
         self.assert_entry(
-            entries[0], name="Home Assistant", message="stopped", domain=ha.DOMAIN
+            entries[1], name="Home Assistant", message="stopped", domain=ha.DOMAIN
         )
-        self.assert_entry(entries[1], name=name, domain=domain, entity_id=entity_id2)
 
     def test_include_events_entity(self):
         """Test if events are filtered if entity is included in config."""
@@ -408,12 +388,9 @@ class TestComponentLogbook(unittest.TestCase):
                 },
             }
         )
-        entities_filter = logbook._generate_filter_from_config(config[logbook.DOMAIN])
-        events = [
-            e
-            for e in (ha.Event(EVENT_HOMEASSISTANT_STOP), eventA, eventB)
-            if logbook._keep_event(e, entities_filter)
-        ]
+        events = self.filter_events(
+            config[logbook.DOMAIN], (ha.Event(EVENT_HOMEASSISTANT_STOP), eventA, eventB)
+        )
         entries = list(logbook.humanify(self.hass, events))
 
         assert 2 == len(entries)
@@ -457,26 +434,24 @@ class TestComponentLogbook(unittest.TestCase):
                 },
             }
         )
-        entities_filter = logbook._generate_filter_from_config(config[logbook.DOMAIN])
-        events = [
-            e
-            for e in (
+        events = self.filter_events(
+            config[logbook.DOMAIN],
+            (
                 ha.Event(EVENT_HOMEASSISTANT_START),
                 event_alexa,
                 event_homekit,
                 eventA,
                 eventB,
-            )
-            if logbook._keep_event(e, entities_filter)
-        ]
+            ),
+        )
         entries = list(logbook.humanify(self.hass, events))
 
         assert 4 == len(entries)
+        self.assert_entry(entries[0], name="Amazon Alexa", domain="alexa")
+        self.assert_entry(entries[1], name="HomeKit", domain=DOMAIN_HOMEKIT)
         self.assert_entry(
-            entries[0], name="Home Assistant", message="started", domain=ha.DOMAIN
+            entries[2], name="Home Assistant", message="started", domain=ha.DOMAIN
         )
-        self.assert_entry(entries[1], name="Amazon Alexa", domain="alexa")
-        self.assert_entry(entries[2], name="HomeKit", domain=DOMAIN_HOMEKIT)
         self.assert_entry(
             entries[3], pointB, "blu", domain="sensor", entity_id=entity_id2
         )
@@ -510,30 +485,28 @@ class TestComponentLogbook(unittest.TestCase):
                 },
             }
         )
-        entities_filter = logbook._generate_filter_from_config(config[logbook.DOMAIN])
-        events = [
-            e
-            for e in (
+        events = self.filter_events(
+            config[logbook.DOMAIN],
+            (
                 ha.Event(EVENT_HOMEASSISTANT_START),
                 eventA1,
                 eventA2,
                 eventA3,
                 eventB1,
                 eventB2,
-            )
-            if logbook._keep_event(e, entities_filter)
-        ]
+            ),
+        )
         entries = list(logbook.humanify(self.hass, events))
 
         assert 5 == len(entries)
         self.assert_entry(
-            entries[0], name="Home Assistant", message="started", domain=ha.DOMAIN
+            entries[0], pointA, "bla", domain="switch", entity_id=entity_id
         )
         self.assert_entry(
-            entries[1], pointA, "bla", domain="switch", entity_id=entity_id
+            entries[1], pointA, "blu", domain="sensor", entity_id=entity_id2
         )
         self.assert_entry(
-            entries[2], pointA, "blu", domain="sensor", entity_id=entity_id2
+            entries[2], name="Home Assistant", message="started", domain=ha.DOMAIN
         )
         self.assert_entry(
             entries[3], pointB, "bla", domain="switch", entity_id=entity_id
@@ -551,10 +524,7 @@ class TestComponentLogbook(unittest.TestCase):
         eventA = self.create_state_changed_event(pointA, entity_id, 10)
         eventB = self.create_state_changed_event(pointA, entity_id2, 20, {"auto": True})
 
-        entities_filter = logbook._generate_filter_from_config({})
-        events = [
-            e for e in (eventA, eventB) if logbook._keep_event(e, entities_filter)
-        ]
+        events = self.filter_events({}, (eventA, eventB))
         entries = list(logbook.humanify(self.hass, events))
 
         assert 1 == len(entries)
@@ -574,10 +544,7 @@ class TestComponentLogbook(unittest.TestCase):
             pointA, entity_id2, 20, last_changed=pointA, last_updated=pointB
         )
 
-        entities_filter = logbook._generate_filter_from_config({})
-        events = [
-            e for e in (eventA, eventB) if logbook._keep_event(e, entities_filter)
-        ]
+        events = self.filter_events({}, (eventA, eventB))
         entries = list(logbook.humanify(self.hass, events))
 
         assert 1 == len(entries)
@@ -1215,6 +1182,57 @@ class TestComponentLogbook(unittest.TestCase):
         if entity_id:
             assert entity_id == entry["entity_id"]
 
+    def filter_events(self, config, events):
+        """Record events and return those the logbook reads from the database.
+
+        Every entity with a state change gets an older state first, so the
+        state changes are not those of new entities.
+        """
+        instance = self.hass.data[recorder.DATA_INSTANCE]
+        start = dt_util.utcnow() - timedelta(hours=1)
+        end = dt_util.utcnow() + timedelta(hours=1)
+        recorded = []
+        seeded = set()
+
+        for event in events:
+            if event.event_type != EVENT_STATE_CHANGED:
+                recorded.append(event)
+                continue
+            entity_id = event.data["entity_id"]
+            old_state = ha.State.from_dict(event.data["old_state"])
+            new_state = ha.State.from_dict(event.data["new_state"])
+            if old_state is not None and entity_id not in seeded:
+                seeded.add(entity_id)
+                instance.queue.put(
+                    ha.Event(
+                        EVENT_STATE_CHANGED,
+                        {
+                            "entity_id": entity_id,
+                            "old_state": None,
+                            "new_state": old_state,
+                        },
+                        time_fired=start - timedelta(days=1),
+                    )
+                )
+            recorded.append(
+                ha.Event(
+                    EVENT_STATE_CHANGED,
+                    {
+                        "entity_id": entity_id,
+                        "old_state": old_state,
+                        "new_state": new_state,
+                    },
+                    time_fired=event.time_fired,
+                )
+            )
+
+        for event in recorded:
+            instance.queue.put(event)
+        instance.block_till_done()
+
+        with recorder.session_scope(hass=self.hass) as session:
+            return list(logbook._yield_events(session, config, start, end))
+
     def create_state_changed_event(
         self,
         event_time_fired,
@@ -1517,3 +1535,71 @@ async def test_humanify_same_state(hass):
     )
 
     assert len(events) == 1
+
+
+async def test_get_events_filtered_in_database(hass):
+    """Test state changes are filtered in the database."""
+    await hass.async_add_job(init_recorder_component, hass)
+    await async_setup_component(hass, "logbook", {})
+    start = dt_util.utcnow() - timedelta(seconds=1)
+
+    for entity_id in ("switch.kitchen", "switch.hall", "light.kitchen", "light.hall"):
+        # New entities are not reported
+        hass.states.async_set(entity_id, STATE_OFF)
+        hass.states.async_set(entity_id, STATE_ON)
+        # Neither are attribute changes
+        hass.states.async_set(entity_id, STATE_ON, {"brightness": 100})
+    hass.states.async_set("light.hidden", STATE_OFF)
+    hass.states.async_set("light.hidden", STATE_ON, {ATTR_HIDDEN: True})
+    # Nor removed entities
+    hass.states.async_remove("light.hall")
+    hass.bus.async_fire(
+        EVENT_AUTOMATION_TRIGGERED,
+        {ATTR_NAME: "Trigger", ATTR_ENTITY_ID: "automation.trigger"},
+    )
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    end = dt_util.utcnow() + timedelta(seconds=1)
+
+    all_entity_ids = [
+        "switch.kitchen",
+        "switch.hall",
+        "light.kitchen",
+        "light.hall",
+        "automation.trigger",
+    ]
+    for filter_config in (
+        {},
+        {logbook.CONF_INCLUDE: {logbook.CONF_DOMAINS: ["light", "automation"]}},
+        {logbook.CONF_EXCLUDE: {logbook.CONF_ENTITIES: ["switch.hall"]}},
+        {
+            logbook.CONF_INCLUDE: {logbook.CONF_DOMAINS: ["switch"]},
+            logbook.CONF_EXCLUDE: {logbook.CONF_ENTITIES: ["switch.hall"]},
+        },
+        {
+            logbook.CONF_INCLUDE: {logbook.CONF_ENTITIES: ["switch.hall"]},
+            logbook.CONF_EXCLUDE: {logbook.CONF_DOMAINS: ["switch", "automation"]},
+        },
+        {
+            logbook.CONF_INCLUDE: {logbook.CONF_ENTITIES: ["light.kitchen"]},
+            logbook.CONF_EXCLUDE: {logbook.CONF_ENTITIES: ["switch.hall"]},
+        },
+    ):
+        config = logbook.CONFIG_SCHEMA({logbook.DOMAIN: filter_config})[logbook.DOMAIN]
+        entities_filter = logbook._generate_filter_from_config(config)
+
+        entries = await hass.async_add_job(
+            logbook._get_events, hass, config, start, end
+        )
+
+        assert [entry["entity_id"] for entry in entries] == [
+            entity_id for entity_id in all_entity_ids if entities_filter(entity_id)
+        ]
+
+    entries = await hass.async_add_job(
+        logbook._get_events, hass, {}, start, end, "Light.Kitchen"
+    )
+    assert [entry["entity_id"] for entry in entries] == [
+        "light.kitchen",
+        "automation.trigger",
+    ]
@@ -1,4 +1,5 @@
 """The tests for the MQTT component."""
+import asyncio
 from datetime import timedelta
 import ssl
 import unittest
@@ -354,6 +355,27 @@ class TestMQTTCallbacks(unittest.TestCase):
         self.hass.block_till_done()
         assert len(self.calls) == 1
 
+    def test_subscribe_topic_overlapping_filters(self):
+        """Test matching subscriptions are updated on subscribe and unsubscribe."""
+        unsub_exact = mqtt.subscribe(self.hass, "test-topic/bier/on", self.record_calls)
+        mqtt.subscribe(self.hass, "test-topic/+/on", self.record_calls)
+
+        fire_mqtt_message(self.hass, "test-topic/bier/on", "test-payload")
+        self.hass.block_till_done()
+        assert len(self.calls) == 2
+
+        unsub_exact()
+
+        fire_mqtt_message(self.hass, "test-topic/bier/on", "test-payload")
+        self.hass.block_till_done()
+        assert len(self.calls) == 3
+
+        mqtt.subscribe(self.hass, "test-topic/#", self.record_calls)
+
+        fire_mqtt_message(self.hass, "test-topic/bier/on", "test-payload")
+        self.hass.block_till_done()
+        assert len(self.calls) == 5
+
     def test_subscribe_topic_not_match(self):
         """Test if subscribed topic is not a match."""
         mqtt.subscribe(self.hass, "test-topic", self.record_calls)
@@ -798,6 +820,59 @@ async def test_message_callback_exception_gets_logged(hass, caplog):
     )
 
 
+async def test_messages_handled_in_batches(hass):
+    """Test received messages are handed to the event loop in batches."""
+    await async_mock_mqtt_component(hass)
+    calls = []
+
+    @callback
+    def record_calls(msg):
+        """Record calls."""
+        calls.append(msg)
+
+    await mqtt.async_subscribe(hass, "test-topic", record_calls)
+    mqtt_data = hass.data["mqtt"]
+
+    with mock.patch.object(
+        hass.loop, "call_soon_threadsafe", wraps=hass.loop.call_soon_threadsafe
+    ) as mock_call_soon, mock.patch(
+        "homeassistant.components.mqtt.MAX_MESSAGE_BATCH", 2
+    ):
+        for idx in range(5):
+            mqtt_data._mqtt_on_message(
+                None, None, mqtt.Message("test-topic", str(idx).encode(), 0, False)
+            )
+        assert mock_call_soon.call_count == 1
+
+        for expected in (2, 4, 5):
+            await asyncio.sleep(0)
+            assert len(calls) == expected
+
+    assert [msg.payload for msg in calls] == ["0", "1", "2", "3", "4"]
+
+
+async def test_payload_decoded_once_per_encoding(hass):
+    """Test subscriptions with the same encoding share the decoded message."""
+    await async_mock_mqtt_component(hass)
+    calls = []
+
+    @callback
+    def record_calls(msg):
+        """Record calls."""
+        calls.append(msg)
+
+    await mqtt.async_subscribe(hass, "test-topic", record_calls)
+    await mqtt.async_subscribe(hass, "test-topic/#", record_calls)
+    await mqtt.async_subscribe(hass, "test-topic", record_calls, encoding=None)
+    async_fire_mqtt_message(hass, "test-topic", "test-payload")
+    await hass.async_block_till_done()
+
+    assert len(calls) == 3
+    decoded = [msg for msg in calls if msg.payload == "test-payload"]
+    assert len(decoded) == 2
+    assert decoded[0] is decoded[1]
+
+
 async def test_mqtt_ws_subscription(hass, hass_ws_client):
     """Test MQTT websocket subscription."""
     await async_mock_mqtt_component(hass)
@@ -1,13 +1,15 @@
 """The tests for the Recorder component."""
 # pylint: disable=protected-access
+import queue
+import time
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
 from homeassistant.components.recorder import Recorder
 from homeassistant.components.recorder.const import DATA_INSTANCE
-from homeassistant.components.recorder.models import Events, States
+from homeassistant.components.recorder.models import Events, StateAttributes, States
 from homeassistant.components.recorder.util import session_scope
 from homeassistant.const import MATCH_ALL
 from homeassistant.core import callback
@@ -189,6 +191,115 @@ def test_saving_state_include_domain_exclude_entity(hass_recorder):
     assert hass.states.get("test.ok").state == "state2"
 
 
+def test_saving_state_shared_attributes(hass_recorder):
+    """Test identical attributes are stored once."""
+    hass = hass_recorder()
+    attributes = {"source_list": ["tv", "radio"], "friendly_name": "Player"}
+
+    for idx in range(3):
+        hass.states.set("test.recorder", "state{}".format(idx), attributes)
+        hass.block_till_done()
+    hass.states.set("test.recorder", "state3", {"friendly_name": "Player"})
+    hass.block_till_done()
+    hass.data[DATA_INSTANCE].block_till_done()
+
+    with session_scope(hass=hass) as session:
+        assert session.query(StateAttributes).count() == 2
+        db_states = list(session.query(States).order_by(States.state_id))
+        assert len(db_states) == 4
+        assert all(db_state.attributes is None for db_state in db_states)
+        assert len({db_state.attributes_id for db_state in db_states}) == 2
+        assert db_states[0].to_native().attributes == attributes
+        assert db_states[3].to_native().attributes == {"friendly_name": "Player"}
+
+
+def test_saving_state_commit_interval(hass_recorder):
+    """Test pending events are committed before a purge."""
+    hass = hass_recorder()
+    instance = hass.data[DATA_INSTANCE]
+    instance.commit_interval = 3600
+
+    for idx in range(3):
+        hass.states.set("test.recorder", "state{}".format(idx))
+        hass.block_till_done()
+
+    with session_scope(hass=hass) as session:
+        assert session.query(States).count() == 0
+
+    instance.do_adhoc_purge()
+    instance.block_till_done()
+
+    with session_scope(hass=hass) as session:
+        assert session.query(States).count() == 3
+
+
+def test_saving_state_batch_shares_attributes(hass_recorder):
+    """Test states in one batch that share attributes get one row."""
+    hass = hass_recorder()
+    instance = hass.data[DATA_INSTANCE]
+    instance.commit_interval = 3600
+
+    for idx in range(3):
+        hass.states.set("test.recorder", "state{}".format(idx), {"unit": "W"})
+        hass.block_till_done()
+
+    instance.do_adhoc_purge()
+    instance.block_till_done()
+
+    with session_scope(hass=hass) as session:
+        assert session.query(StateAttributes).count() == 1
+        db_states = list(session.query(States))
+        assert len(db_states) == 3
+        assert all(db_state.event_id is not None for db_state in db_states)
+        assert len({db_state.attributes_id for db_state in db_states}) == 1
+
+
+def test_saving_state_links_old_state(hass_recorder):
+    """Test states are linked to the previous state of their entity."""
+    hass = hass_recorder()
+    instance = hass.data[DATA_INSTANCE]
+
+    hass.states.set("test.recorder", "state0")
+    hass.states.set("test.recorder", "state1")
+    hass.block_till_done()
+    instance.block_till_done()
+
+    # Linked within one batch as well
+    instance.commit_interval = 3600
+    hass.states.set("test.recorder", "state2")
+    hass.states.set("test.recorder", "state3")
+    hass.states.remove("test.recorder")
+    hass.states.set("test.recorder", "state4")
+    hass.block_till_done()
+    instance.do_adhoc_purge()
+    instance.block_till_done()
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States).order_by(States.state_id))
+        state_ids = [db_state.state_id for db_state in db_states]
+        assert [db_state.old_state_id for db_state in db_states] == [
+            None,
+            state_ids[0],
+            state_ids[1],
+            state_ids[2],
+            state_ids[3],
+            None,
+        ]
+
+
+def test_commit_deadline_under_load():
+    """Test the commit is not put off while the queue keeps filling."""
+    instance = MagicMock(
+        _pending_events=[MagicMock()],
+        _commit_deadline=time.monotonic() - 1,
+        queue=queue.Queue(),
+    )
+    instance.queue.put(MagicMock())
+
+    with pytest.raises(queue.Empty):
+        Recorder._get_next_task(instance)
+
+
 def test_recorder_setup_failure():
     """Test some exceptions."""
     hass = get_test_home_assistant()
@@ -201,6 +312,7 @@ def test_recorder_setup_failure():
             hass,
             keep_days=7,
             purge_interval=2,
+            commit_interval=1,
             uri="sqlite://",
             db_max_retries=10,
             db_retry_wait=3,
@@ -229,3 +341,4 @@ async def test_defaults_set(hass):
     assert recorder_config is not None
     assert recorder_config["purge_keep_days"] == 10
     assert recorder_config["purge_interval"] == 1
+    assert recorder_config["commit_interval"] == 1
@@ -1,5 +1,6 @@
 """The tests for the Recorder component."""
 # pylint: disable=protected-access
+import json
 from unittest.mock import call, patch
 
 import pytest
@@ -76,3 +77,41 @@ def test_forgiving_add_index():
     engine = create_engine("sqlite://", poolclass=StaticPool)
     models.Base.metadata.create_all(engine)
     migration._create_index(engine, "states", "ix_states_context_id")
+
+
+def test_link_old_states():
+    """Test existing states are linked to the previous state of their entity."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    models.Base.metadata.create_all(engine)
+    for event_id, (entity_id, state, old_state) in enumerate(
+        (
+            ("light.kitchen", "off", None),
+            ("light.kitchen", "on", {}),
+            ("light.hall", "on", None),
+            ("light.kitchen", "", {}),
+            ("light.kitchen", "on", None),
+            ("light.hall", "off", {}),
+        ),
+        1,
+    ):
+        engine.execute(
+            models.Events.__table__.insert(),
+            event_id=event_id,
+            event_type="state_changed",
+            event_data=json.dumps({"entity_id": entity_id, "old_state": old_state}),
+        )
+        engine.execute(
+            models.States.__table__.insert(),
+            state_id=event_id,
+            entity_id=entity_id,
+            state=state,
+            event_id=event_id,
+        )
+
+    with patch.object(migration, "LINK_OLD_STATES_BATCH_SIZE", 2):
+        migration._link_old_states(engine)
+
+    assert [
+        row[0]
+        for row in engine.execute("SELECT old_state_id FROM states ORDER BY state_id")
+    ] == [None, 1, None, 2, None, 3]
@@ -5,7 +5,13 @@ import unittest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import scoped_session, sessionmaker
 
-from homeassistant.components.recorder.models import Base, Events, RecorderRuns, States
+from homeassistant.components.recorder.models import (
+    Base,
+    Events,
+    RecorderRuns,
+    StateAttributes,
+    States,
+)
 from homeassistant.const import EVENT_STATE_CHANGED
 import homeassistant.core as ha
 from homeassistant.util import dt
@@ -60,6 +66,20 @@ class TestStates(unittest.TestCase):
         )
         assert state == States.from_event(event).to_native()
 
+    def test_shared_attributes_to_native(self):
+        """Test converting a db state with shared attributes."""
+        state = ha.State("sensor.temperature", "18", {"unit_of_measurement": "°C"})
+        event = ha.Event(
+            EVENT_STATE_CHANGED,
+            {"entity_id": "sensor.temperature", "old_state": None, "new_state": state},
+            context=state.context,
+        )
+        db_state = States.from_event(event)
+        db_state.state_attributes = StateAttributes(shared_attrs=db_state.attributes)
+        db_state.attributes = None
+
+        assert state == db_state.to_native()
+
     def test_from_event_to_delete_state(self):
         """Test converting deleting state event to db state."""
         event = ha.Event(
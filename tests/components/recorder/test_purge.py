@@ -1,4 +1,5 @@
 """Test data purging."""
+import asyncio
 from datetime import datetime, timedelta
 import json
 import unittest
@@ -6,11 +7,15 @@ from unittest.mock import patch
 
 from homeassistant.components import recorder
 from homeassistant.components.recorder.const import DATA_INSTANCE
-from homeassistant.components.recorder.models import Events, States
+from homeassistant.components.recorder.models import Events, StateAttributes, States
 from homeassistant.components.recorder.purge import purge_old_data
 from homeassistant.components.recorder.util import session_scope
 
-from tests.common import get_test_home_assistant, init_recorder_component
+from tests.common import (
+    get_system_health_info,
+    get_test_home_assistant,
+    init_recorder_component,
+)
 
 
 class TestRecorderPurge(unittest.TestCase):
@@ -107,6 +112,30 @@ class TestRecorderPurge(unittest.TestCase):
             # we should only have 2 states left after purging
             assert states.count() == 2
 
+    def test_purge_old_state_attributes(self):
+        """Test deleting shared attributes no longer used by any state."""
+        self._add_test_states()
+
+        with recorder.session_scope(hass=self.hass) as session:
+            for idx, state in enumerate(
+                session.query(States).order_by(States.state_id)
+            ):
+                db_attributes = StateAttributes(
+                    hash=str(idx), shared_attrs=state.attributes
+                )
+                session.add(db_attributes)
+                session.flush()
+                state.attributes_id = db_attributes.attributes_id
+                state.attributes = None
+
+        with session_scope(hass=self.hass) as session:
+            attributes = session.query(StateAttributes)
+            assert attributes.count() == 6
+
+            purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
+
+            assert attributes.count() == 2
+
     def test_purge_old_events(self):
         """Test deleting old events."""
         self._add_test_events()
@@ -173,7 +202,98 @@ class TestRecorderPurge(unittest.TestCase):
                 self.hass.services.call("recorder", "purge", service_data=service_data)
                 self.hass.block_till_done()
                 self.hass.data[DATA_INSTANCE].block_till_done()
-                assert (
-                    mock_logger.debug.mock_calls[3][1][0]
-                    == "Vacuuming SQL DB to free space"
+                assert mock_logger.debug.mock_calls[4][1][0].startswith(
+                    "Incrementally vacuuming SQL DB"
                 )
+
+    def test_purge_in_batches(self):
+        """Test purging deletes a bounded number of rows per run."""
+        self._add_test_states()
+        self._add_test_events()
+
+        with session_scope(hass=self.hass) as session, patch(
+            "homeassistant.components.recorder.purge.MAX_ROWS_TO_PURGE", 2
+        ):
+            states = session.query(States)
+            events = session.query(Events).filter(Events.event_type.like("EVENT_TEST%"))
+            instance = self.hass.data[DATA_INSTANCE]
+
+            assert not purge_old_data(instance, 4, repack=False)
+            assert states.count() == 4
+            assert events.count() == 6
+            assert instance.purge_progress.running
+            assert instance.purge_progress.batches == 1
+            assert instance.purge_progress.states == 2
+
+            assert not purge_old_data(instance, 4, repack=False)
+            assert states.count() == 2
+            assert events.count() == 6
+
+            # states are done, events are purged next
+            assert not purge_old_data(instance, 4, repack=False)
+            assert events.count() == 4
+
+            assert not purge_old_data(instance, 4, repack=False)
+            assert events.count() == 2
+
+            assert purge_old_data(instance, 4, repack=False)
+            assert states.count() == 2
+            assert events.count() == 2
+
+        info = asyncio.run_coroutine_threadsafe(
+            get_system_health_info(self.hass, "recorder"), self.hass.loop
+        ).result()
+        assert not info["purge_running"]
+        assert info["purge_batches"] == 5
+        assert info["purged_states"] == 4
+        assert info["purged_events"] == 4
+
+    def test_purge_method_in_batches(self):
+        """Test the purge service keeps purging until done."""
+        self._add_test_states()
+        self._add_test_events()
+
+        with patch("homeassistant.components.recorder.purge.MAX_ROWS_TO_PURGE", 1):
+            self.hass.services.call("recorder", "purge", service_data={"keep_days": 4})
+            self.hass.block_till_done()
+            self.hass.data[DATA_INSTANCE].block_till_done()
+
+        with session_scope(hass=self.hass) as session:
+            assert session.query(States).count() == 2
+            assert (
+                session.query(Events)
+                .filter(Events.event_type.like("EVENT_TEST%"))
+                .count()
+                == 2
+            )
+
+    def test_purge_repack_incremental(self):
+        """Test repacking a new SQLite database vacuums incrementally."""
+        instance = self.hass.data[DATA_INSTANCE]
+        assert instance.engine.execute("PRAGMA auto_vacuum").scalar() == 2
+
+        with patch("homeassistant.components.recorder.purge._LOGGER") as mock_logger:
+            assert purge_old_data(instance, 4, repack=True)
+            assert mock_logger.debug.mock_calls[-1][1][0].startswith(
+                "Incrementally vacuuming SQL DB"
+            )
+
+    def test_purge_state_attributes_in_batches(self):
+        """Test orphaned shared attributes are purged in batches."""
+        instance = self.hass.data[DATA_INSTANCE]
+        self.hass.block_till_done()
+        instance.block_till_done()
+
+        with session_scope(hass=self.hass) as session:
+            for idx in range(3):
+                session.add(StateAttributes(hash=str(idx), shared_attrs=json.dumps({})))
+
+        with session_scope(hass=self.hass) as session, patch(
+            "homeassistant.components.recorder.purge.MAX_ROWS_TO_PURGE", 2
+        ):
+            attributes = session.query(StateAttributes)
+            assert not purge_old_data(instance, 4, repack=False)
+            assert attributes.count() == 1
+
+            assert purge_old_data(instance, 4, repack=False)
+            assert attributes.count() == 0
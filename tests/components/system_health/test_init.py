@@ -27,9 +27,17 @@ async def test_info_endpoint_return_info(hass, hass_ws_client, mock_system_info)
     assert resp["success"]
     data = resp["result"]
 
-    assert len(data) == 1
-    data = data["homeassistant"]
-    assert data == {"hello": True}
+    assert len(data) == 2
+    assert data["homeassistant"] == {"hello": True}
+    assert set(data["template"]) == {
+        "hits",
+        "misses",
+        "size",
+        "maxsize",
+        "tracked_renders",
+        "coalesced_renders",
+        "render_time",
+    }
 
 
 async def test_info_endpoint_register_callback(hass, hass_ws_client, mock_system_info):
@@ -47,7 +55,7 @@ async def test_info_endpoint_register_callback(hass, hass_ws_client, mock_system
     assert resp["success"]
     data = resp["result"]
 
-    assert len(data) == 2
+    assert len(data) == 3
     data = data["lovelace"]
     assert data == {"storage": "YAML"}
 
@@ -69,7 +77,7 @@ async def test_info_endpoint_register_callback_timeout(
     assert resp["success"]
     data = resp["result"]
 
-    assert len(data) == 2
+    assert len(data) == 3
     data = data["lovelace"]
     assert data == {"error": "Fetching info timed out"}
 
@@ -91,6 +99,6 @@ async def test_info_endpoint_register_callback_exc(
     assert resp["success"]
     data = resp["result"]
 
-    assert len(data) == 2
+    assert len(data) == 3
     data = data["lovelace"]
     assert data == {"error": "TEST ERROR"}
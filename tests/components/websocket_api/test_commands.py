@@ -1,4 +1,7 @@
 """Tests for WebSocket API commands."""
+import json
+from unittest.mock import patch
+
 from async_timeout import timeout
 
 from homeassistant.components.websocket_api import const
@@ -8,9 +11,11 @@ from homeassistant.components.websocket_api.auth import (
     TYPE_AUTH_REQUIRED,
 )
 from homeassistant.components.websocket_api.const import URL
+from homeassistant.const import EVENT_STATE_CHANGED
 from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.setup import async_setup_component
+from homeassistant.helpers.event import TRACK_TEMPLATE_RESULT_TRACKERS
+from homeassistant.setup import DATA_SETUP_TIME, async_setup_component
 
 from tests.common import async_mock_service
 
@@ -185,6 +190,32 @@ async def test_subscribe_unsubscribe_events(hass, websocket_client):
     assert sum(hass.bus.async_listeners().values()) == init_count
 
 
+async def test_subscribe_events_serialized_once(hass, websocket_client):
+    """Test an event is serialized once for all subscriptions."""
+    for iden in (5, 6):
+        await websocket_client.send_json(
+            {"id": iden, "type": "subscribe_events", "event_type": "test_event"}
+        )
+        msg = await websocket_client.receive_json()
+        assert msg["success"]
+
+    with patch("homeassistant.helpers.json.json.dumps", wraps=json.dumps) as mock_dump:
+        hass.bus.async_fire("test_event", {"hello": "world"})
+
+        with timeout(3):
+            msgs = [
+                await websocket_client.receive_json(),
+                await websocket_client.receive_json(),
+            ]
+
+    assert mock_dump.call_count == 1
+    assert {msg["id"] for msg in msgs} == {5, 6}
+    for msg in msgs:
+        assert msg["type"] == "event"
+        assert msg["event"]["event_type"] == "test_event"
+        assert msg["event"]["data"] == {"hello": "world"}
+
+
 async def test_get_states(hass, websocket_client):
     """Test get_states command."""
     hass.states.async_set("greeting.hello", "world")
@@ -206,6 +237,15 @@ async def test_get_states(hass, websocket_client):
 
     assert msg["result"] == states
 
+    # The serialized states are cached and reused
+    with patch("homeassistant.helpers.json.json.dumps") as mock_dumps:
+        await websocket_client.send_json({"id": 6, "type": "get_states"})
+        msg = await websocket_client.receive_json()
+
+    assert not mock_dumps.called
+    assert msg["id"] == 6
+    assert msg["result"] == states
+
 
 async def test_get_services(hass, websocket_client):
     """Test get_services command."""
@@ -237,6 +277,32 @@ async def test_get_config(hass, websocket_client):
     assert msg["result"] == hass.config.as_dict()
 
 
+async def test_get_setup_timings(hass, websocket_client):
+    """Test get_setup_timings command."""
+    hass.data[DATA_SETUP_TIME] = {"light": {"import": 0.5, "setup": 1.25}}
+
+    await websocket_client.send_json({"id": 5, "type": "get_setup_timings"})
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 5
+    assert msg["type"] == const.TYPE_RESULT
+    assert msg["success"]
+    assert msg["result"] == {"light": {"import": 0.5, "setup": 1.25}}
+
+
+async def test_get_setup_timings_requires_admin(
+    hass, websocket_client, hass_admin_user
+):
+    """Test get_setup_timings requires an admin."""
+    hass_admin_user.groups = []
+
+    await websocket_client.send_json({"id": 5, "type": "get_setup_timings"})
+
+    msg = await websocket_client.receive_json()
+    assert not msg["success"]
+    assert msg["error"]["code"] == const.ERR_UNAUTHORIZED
+
+
 async def test_ping(websocket_client):
     """Test get_panels command."""
     await websocket_client.send_json({"id": 5, "type": "ping"})
@@ -455,6 +521,33 @@ async def test_render_template_with_manual_entity_ids(
     assert event == {"result": "State is: on"}
 
 
+async def test_render_template_all_states(hass, websocket_client, hass_admin_user):
+    """Test that templates iterating all states rerender on any change."""
+    count = len(hass.states.async_all())
+    await websocket_client.send_json(
+        {
+            "id": 5,
+            "type": "render_template",
+            "template": "{{ states | count }}",
+            "rate_limit": 0,
+        }
+    )
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 5
+    assert msg["type"] == const.TYPE_RESULT
+    assert msg["success"]
+
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {"result": str(count)}
+
+    hass.states.async_set("light.test", "on")
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 5
+    assert msg["type"] == "event"
+    assert msg["event"] == {"result": str(count + 1)}
+
+
 async def test_render_template_returns_with_match_all(
     hass, websocket_client, hass_admin_user
 ):
@@ -467,3 +560,65 @@ async def test_render_template_returns_with_match_all(
     assert msg["id"] == 5
     assert msg["type"] == const.TYPE_RESULT
     assert msg["success"]
+
+
+async def test_render_template_with_error(hass, websocket_client, hass_admin_user):
+    """Test a template that fails to render sends an error."""
+    hass.states.async_set("light.test", "on")
+
+    await websocket_client.send_json(
+        {
+            "id": 5,
+            "type": "render_template",
+            "template": "{{ states('light.test') }} {{ foo.bar }}",
+        }
+    )
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 5
+    assert msg["type"] == const.TYPE_RESULT
+    assert msg["success"]
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 5
+    assert msg["type"] == const.TYPE_RESULT
+    assert not msg["success"]
+    assert msg["error"]["code"] == const.ERR_TEMPLATE_ERROR
+
+    hass.states.async_set("light.test", "off")
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 5
+    assert msg["error"]["code"] == const.ERR_TEMPLATE_ERROR
+
+
+async def test_render_template_with_exception(hass, websocket_client, hass_admin_user):
+    """Test a template raising on the first render is not left tracking."""
+    hass.states.async_set("light.test", "on")
+
+    await websocket_client.send_json(
+        {
+            "id": 5,
+            "type": "render_template",
+            "template": "{{ states('light.test') }} {{ 1 / 0 }}",
+        }
+    )
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 5
+    assert msg["type"] == const.TYPE_RESULT
+    assert msg["success"]
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 5
+    assert msg["type"] == const.TYPE_RESULT
+    assert not msg["success"]
+    assert msg["error"]["code"] == const.ERR_UNKNOWN_ERROR
+
+    assert not hass.data[TRACK_TEMPLATE_RESULT_TRACKERS]
+    assert not hass.bus.async_listeners().get(EVENT_STATE_CHANGED)
+
+    # The connection is still usable
+    await websocket_client.send_json({"id": 6, "type": "ping"})
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 6
+    assert msg["type"] == "pong"
@@ -410,6 +410,30 @@ async def test_update(registry):
     assert updated_entry.via_device_id == "98765B"
 
 
+async def test_get_device_follows_updates(registry):
+    """Verify device lookups follow merged, replaced and removed identifiers."""
+    mac = (device_registry.CONNECTION_NETWORK_MAC, "12:34:56:ab:cd:ef")
+    entry = registry.async_get_or_create(
+        config_entry_id="1234", connections={mac}, identifiers={("hue", "456")}
+    )
+    # Merges the identifier into the device found by connection
+    entry = registry.async_get_or_create(
+        config_entry_id="1234", connections={mac}, identifiers={("bla", "123")}
+    )
+    assert registry.async_get_device({("hue", "456")}, set()) is entry
+    assert registry.async_get_device({("bla", "123")}, set()) is entry
+    assert registry.async_get_device(set(), {mac}) is entry
+
+    entry = registry.async_update_device(entry.id, new_identifiers={("hue", "654")})
+    assert registry.async_get_device({("hue", "456")}, set()) is None
+    assert registry.async_get_device({("bla", "123")}, set()) is None
+    assert registry.async_get_device({("hue", "654")}, set()) is entry
+
+    registry.async_remove_device(entry.id)
+    assert registry.async_get_device({("hue", "654")}, set()) is None
+    assert registry.async_get_device(set(), {mac}) is None
+
+
 async def test_update_remove_config_entries(hass, registry, update_events):
     """Make sure we do not get duplicate entries."""
     entry = registry.async_get_or_create(
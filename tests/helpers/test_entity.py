@@ -40,6 +40,17 @@ def test_generate_entity_id_given_keys():
     )
 
 
+async def test_async_generate_entity_id_given_hass(hass):
+    """Test generating an entity id skips the entity ids that have a state."""
+    fmt = "test.{}"
+    hass.states.async_set("test.bowl", "on")
+    hass.states.async_set("test.bowl_2", "on")
+    assert entity.async_generate_entity_id(fmt, "Bowl", hass=hass) == "test.bowl_3"
+
+    hass.states.async_remove("test.bowl_2")
+    assert entity.async_generate_entity_id(fmt, "Bowl", hass=hass) == "test.bowl_2"
+
+
 def test_async_update_support(hass):
     """Test async update getting called."""
     sync_update = []
@@ -205,6 +205,26 @@ def test_generate_entity_considers_existing_entities(hass, registry):
     assert registry.async_generate_entity_id("light", "kitchen") == "light.kitchen_2"
 
 
+def test_generate_entity_reuses_suffix_of_removed_entity(registry):
+    """Test that removing an entity frees its entity id for the same name."""
+    for unique_id in ("1", "2", "3"):
+        registry.async_get_or_create(
+            "light", "hue", unique_id, suggested_object_id="beer"
+        )
+    assert "light.beer_3" in registry.entities
+
+    registry.async_remove("light.beer_2")
+    entry = registry.async_get_or_create(
+        "light", "hue", "4", suggested_object_id="beer"
+    )
+    assert entry.entity_id == "light.beer_2"
+
+    entry = registry.async_get_or_create(
+        "light", "hue", "5", suggested_object_id="beer"
+    )
+    assert entry.entity_id == "light.beer_4"
+
+
 def test_is_registered(registry):
     """Test that is_registered works."""
     entry = registry.async_get_or_create("light", "hue", "1234")
@@ -322,6 +342,47 @@ async def test_removing_config_entry_id(hass, registry, update_events):
     assert update_events[1]["entity_id"] == entry.entity_id
 
 
+async def test_indexes_follow_updates(registry):
+    """Test the lookup indexes stay in sync with the entries."""
+    mock_config_1 = MockConfigEntry(domain="light", entry_id="mock-id-1")
+    mock_config_2 = MockConfigEntry(domain="light", entry_id="mock-id-2")
+    entry = registry.async_get_or_create(
+        "light", "hue", "5678", config_entry=mock_config_1, device_id="device-1"
+    )
+    entry2 = registry.async_get_or_create(
+        "light", "hue", "1234", config_entry=mock_config_1, device_id="device-1"
+    )
+
+    assert entity_registry.async_entries_for_device(registry, "device-1") == [
+        entry,
+        entry2,
+    ]
+
+    entry = registry.async_get_or_create(
+        "light", "hue", "5678", config_entry=mock_config_2, device_id="device-2"
+    )
+    assert entity_registry.async_entries_for_device(registry, "device-1") == [entry2]
+    assert entity_registry.async_entries_for_device(registry, "device-2") == [entry]
+    assert entity_registry.async_entries_for_config_entry(registry, "mock-id-2") == [
+        entry
+    ]
+
+    entry = registry.async_update_entity(
+        entry.entity_id, new_entity_id="light.renamed", new_unique_id="9012"
+    )
+    assert registry.async_get_entity_id("light", "hue", "5678") is None
+    assert registry.async_get_entity_id("light", "hue", "9012") == "light.renamed"
+    assert entity_registry.async_entries_for_device(registry, "device-2") == [entry]
+
+    registry.async_remove("light.renamed")
+    assert registry.async_get_entity_id("light", "hue", "9012") is None
+    assert entity_registry.async_entries_for_device(registry, "device-2") == []
+    assert entity_registry.async_entries_for_config_entry(registry, "mock-id-2") == []
+    assert entity_registry.async_entries_for_config_entry(registry, "mock-id-1") == [
+        entry2
+    ]
+
+
 async def test_migration(hass):
     """Test migration from old data to new."""
     mock_config = MockConfigEntry(domain="test-platform", entry_id="test-config-id")
@@ -12,14 +12,19 @@ from homeassistant.const import MATCH_ALL
 import homeassistant.core as ha
 from homeassistant.core import callback
 from homeassistant.helpers.event import (
+    TRACK_POINT_IN_TIME_SCHEDULER,
+    TRACK_STATE_CHANGE_CALLBACKS,
+    TRACK_TEMPLATE_RESULT_TRACKERS,
     async_call_later,
     async_track_point_in_time,
     async_track_point_in_utc_time,
     async_track_same_state,
     async_track_state_change,
+    async_track_state_change_event,
     async_track_sunrise,
     async_track_sunset,
     async_track_template,
+    async_track_template_result,
     async_track_time_change,
     async_track_time_interval,
     async_track_utc_time_change,
@@ -86,6 +91,60 @@ async def test_track_point_in_time(hass):
     assert len(runs) == 2
 
 
+async def test_track_point_in_time_scheduler(hass):
+    """Test point in time trackers share one time_changed listener."""
+    now = dt_util.utcnow()
+    runs = []
+
+    unsubs = [
+        async_track_point_in_utc_time(
+            hass,
+            callback(lambda x, delay=delay: runs.append(delay)),
+            now + timedelta(seconds=delay),
+        )
+        for delay in (30, 10, 20, 40)
+    ]
+    scheduler = hass.data[TRACK_POINT_IN_TIME_SCHEDULER]
+
+    assert hass.bus.async_listeners()[ha.EVENT_TIME_CHANGED] == 1
+    assert scheduler.pending == 4
+
+    unsubs[2]()
+    assert scheduler.pending == 3
+
+    _send_time_changed(hass, now + timedelta(seconds=25))
+    await hass.async_block_till_done()
+    assert runs == [10]
+    assert scheduler.pending == 2
+
+    # Cancelling an action that already ran does nothing
+    unsubs[1]()
+    assert scheduler.pending == 2
+
+    _send_time_changed(hass, now + timedelta(seconds=45))
+    await hass.async_block_till_done()
+    assert runs == [10, 30, 40]
+    assert scheduler.pending == 0
+    assert ha.EVENT_TIME_CHANGED not in hass.bus.async_listeners()
+
+
+async def test_track_point_in_time_scheduler_exception(hass):
+    """Test a failing action does not block the other actions."""
+    now = dt_util.utcnow()
+    runs = []
+
+    @callback
+    def failing_action(now):
+        raise ValueError("boom")
+
+    async_track_point_in_utc_time(hass, failing_action, now)
+    async_track_point_in_utc_time(hass, callback(lambda x: runs.append(x)), now)
+
+    _send_time_changed(hass, now)
+    await hass.async_block_till_done()
+    assert runs == [now]
+
+
 async def test_track_state_change(hass):
     """Test track_state_change."""
     # 2 lists to track how often our callbacks get called
@@ -165,6 +224,75 @@ async def test_track_state_change(hass):
     assert len(wildercard_runs) == 6
 
 
+async def test_track_state_change_event_dispatch(hass):
+    """Test state changes are only dispatched to interested listeners."""
+    light_runs = []
+    switch_runs = []
+    all_runs = []
+
+    unsub_light = async_track_state_change_event(
+        hass, ["light.bowl"], callback(lambda event: light_runs.append(event))
+    )
+    unsub_switch = async_track_state_change_event(
+        hass,
+        ["switch.fan", "switch.fan"],
+        callback(lambda event: switch_runs.append(event)),
+    )
+    unsub_all = async_track_state_change_event(
+        hass, [MATCH_ALL], callback(lambda event: all_runs.append(event))
+    )
+
+    assert hass.bus.async_listeners()[ha.EVENT_STATE_CHANGED] == 1
+    assert sorted(hass.data[TRACK_STATE_CHANGE_CALLBACKS]) == [
+        MATCH_ALL,
+        "light.bowl",
+        "switch.fan",
+    ]
+
+    hass.states.async_set("light.bowl", "on")
+    await hass.async_block_till_done()
+    assert len(light_runs) == 1
+    assert len(switch_runs) == 0
+    assert len(all_runs) == 1
+    assert light_runs[0].data["entity_id"] == "light.bowl"
+
+    hass.states.async_set("switch.fan", "on")
+    await hass.async_block_till_done()
+    assert len(light_runs) == 1
+    assert len(switch_runs) == 1
+    assert len(all_runs) == 2
+
+    unsub_light()
+    hass.states.async_set("light.bowl", "off")
+    await hass.async_block_till_done()
+    assert len(light_runs) == 1
+    assert len(all_runs) == 3
+    assert "light.bowl" not in hass.data[TRACK_STATE_CHANGE_CALLBACKS]
+
+    unsub_switch()
+    unsub_all()
+    assert hass.data[TRACK_STATE_CHANGE_CALLBACKS] == {}
+    assert ha.EVENT_STATE_CHANGED not in hass.bus.async_listeners()
+
+
+async def test_track_state_change_event_exception(hass):
+    """Test a failing listener does not block the other listeners."""
+    runs = []
+
+    @callback
+    def failing_listener(event):
+        raise ValueError("boom")
+
+    async_track_state_change_event(hass, ["light.bowl"], failing_listener)
+    async_track_state_change_event(
+        hass, ["light.bowl"], callback(lambda event: runs.append(event))
+    )
+
+    hass.states.async_set("light.bowl", "on")
+    await hass.async_block_till_done()
+    assert len(runs) == 1
+
+
 async def test_track_template(hass):
     """Test tracking template."""
     specific_runs = []
@@ -233,6 +361,44 @@ async def test_track_template(hass):
     assert len(wildercard_runs) == 2
 
 
+async def test_track_template_result_rate_limit(hass):
+    """Test renders of domain templates are filtered by domain and coalesced."""
+    results = []
+    template = Template("{{ states.sensor | count }}", hass)
+
+    @ha.callback
+    def render_listener(event, info):
+        results.append(info.result)
+
+    unsub = async_track_template_result(
+        hass, template, render_listener, rate_limit=timedelta(seconds=0.1)
+    )
+    assert results == ["0"]
+
+    hass.states.async_set("light.other", "on")
+    await hass.async_block_till_done()
+    assert results == ["0"]
+
+    hass.states.async_set("sensor.one", "1")
+    hass.states.async_set("sensor.two", "2")
+    await hass.async_block_till_done()
+    assert results == ["0"]
+
+    await asyncio.sleep(0.2)
+    assert results == ["0", "2"]
+
+    (tracker,) = hass.data[TRACK_TEMPLATE_RESULT_TRACKERS]
+    assert tracker.stats.renders == 2
+    assert tracker.stats.coalesced == 1
+
+    unsub()
+    assert not hass.data[TRACK_TEMPLATE_RESULT_TRACKERS]
+    hass.states.async_set("sensor.three", "3")
+    await hass.async_block_till_done()
+    await asyncio.sleep(0.2)
+    assert results == ["0", "2"]
+
+
 async def test_track_same_state_simple_trigger(hass):
     """Test track_same_change with trigger simple."""
     thread_runs = []
@@ -1,8 +1,11 @@
 """Test Home Assistant remote methods and classes."""
+import json
+from unittest.mock import patch
+
 import pytest
 
 from homeassistant import core
-from homeassistant.helpers.json import JSONEncoder
+from homeassistant.helpers.json import JSONEncoder, cached_json_dumps
 from homeassistant.util import dt as dt_util
 
 
@@ -19,3 +22,15 @@ def test_json_encoder(hass):
 
     now = dt_util.utcnow()
     assert ha_json_enc.default(now) == now.isoformat()
+
+
+def test_cached_json_dumps():
+    """Test the JSON of a state is cached on the state."""
+    state = core.State("test.test", "hello", {"answer": 42})
+
+    with patch("homeassistant.helpers.json.json.dumps", wraps=json.dumps) as mock_dumps:
+        result = cached_json_dumps(state)
+        assert cached_json_dumps(state) is result
+
+    assert mock_dumps.call_count == 1
+    assert json.loads(result) == json.loads(json.dumps(state, cls=JSONEncoder))
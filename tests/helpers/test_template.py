@@ -1803,3 +1803,31 @@ def test_render_complex_handling_non_template_values(hass):
     assert template.render_complex(
         {True: 1, False: template.Template("{{ hello }}", hass)}, {"hello": 2}
     ) == {True: 1, False: "2"}
+
+
+def test_compiled_template_cache(hass):
+    """Test templates with the same source share their compiled code."""
+    cache = template.CompiledTemplateCache(maxsize=2)
+
+    with patch.object(template, "COMPILED_TEMPLATE_CACHE", cache):
+        tpl1 = template.Template("{{ 1 + 1 }}", hass)
+        tpl2 = template.Template("{{ 1 + 1 }}", hass)
+        assert tpl1.async_render() == "2"
+        assert tpl2.async_render() == "2"
+        assert tpl1._compiled_code is tpl2._compiled_code
+        assert cache.info() == {"hits": 1, "misses": 1, "size": 1, "maxsize": 2}
+
+        template.Template("{{ 2 }}", hass).ensure_valid()
+        template.Template("{{ 3 }}", hass).ensure_valid()
+        assert cache.info()["size"] == 2
+
+        # The least recently used template was evicted
+        template.Template("{{ 1 + 1 }}", hass).ensure_valid()
+        assert cache.info()["misses"] == 4
+
+        with pytest.raises(TemplateError):
+            template.Template("{{ 1 + }}", hass).ensure_valid()
+        assert cache.info()["size"] == 2
+
+        cache.clear()
+        assert cache.info() == {"hits": 0, "misses": 0, "size": 0, "maxsize": 2}
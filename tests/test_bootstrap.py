@@ -193,6 +193,72 @@ async def test_setup_after_deps_not_present(hass, caplog):
     assert order == ["root", "second_dep"]
 
 
+async def test_setup_independent_branches_concurrently(hass, caplog):
+    """Test integrations that do not wait for each other set up concurrently."""
+    caplog.set_level(logging.INFO)
+    order = []
+    release = asyncio.Event()
+
+    async def async_setup_slow(hass, config):
+        order.append("slow")
+        await release.wait()
+        return True
+
+    async def async_setup_fast(hass, config):
+        order.append("fast")
+        release.set()
+        return True
+
+    async def async_setup_after_slow(hass, config):
+        order.append("after_slow")
+        return True
+
+    mock_integration(hass, MockModule(domain="slow", async_setup=async_setup_slow))
+    mock_integration(hass, MockModule(domain="fast", async_setup=async_setup_fast))
+    mock_integration(
+        hass,
+        MockModule(
+            domain="after_slow",
+            async_setup=async_setup_after_slow,
+            partial_manifest={"after_dependencies": ["slow"]},
+        ),
+    )
+
+    # The fast integration releases the slow one, so this only finishes when
+    # both branches run at the same time.
+    await asyncio.wait_for(
+        bootstrap._async_set_up_integrations(
+            hass, {"slow": {}, "fast": {}, "after_slow": {}}
+        ),
+        5,
+    )
+
+    assert order.index("after_slow") > order.index("slow")
+    assert {"slow", "fast", "after_slow"} <= hass.config.components
+    assert "Integrations set up in" in caplog.text
+    assert "slow (import " in caplog.text
+
+
+async def test_setup_after_deps_circular(hass, caplog):
+    """Test integrations that come after each other are still set up."""
+    caplog.set_level(logging.DEBUG)
+
+    mock_integration(
+        hass,
+        MockModule(domain="first", partial_manifest={"after_dependencies": ["second"]}),
+    )
+    mock_integration(
+        hass,
+        MockModule(domain="second", partial_manifest={"after_dependencies": ["first"]}),
+    )
+
+    await bootstrap._async_set_up_integrations(hass, {"first": {}, "second": {}})
+
+    assert "first" in hass.config.components
+    assert "second" in hass.config.components
+    assert "Final set up" in caplog.text
+
+
 @pytest.fixture
 def mock_is_virtual_env():
     """Mock enable logging."""
@@ -387,6 +453,7 @@ async def test_setup_hass_invalid_core_config(
 
 
 async def test_setup_safe_mode_if_no_frontend(
+    hass_storage,
     mock_enable_logging,
     mock_is_virtual_env,
     mock_mount_local_lib_path,
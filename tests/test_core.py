@@ -6,6 +6,7 @@ import functools
 import logging
 import os
 from tempfile import TemporaryDirectory
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -44,9 +45,21 @@ def test_split_entity_id():
     assert ha.split_entity_id("domain.object_id") == ["domain", "object_id"]
 
 
+def mock_hass(**kwargs):
+    """Return a mock hass that runs HassJobs like HomeAssistant does."""
+    hass = MagicMock(**kwargs)
+    hass.async_add_hass_job = functools.partial(
+        ha.HomeAssistant.async_add_hass_job, hass
+    )
+    hass.async_run_hass_job = functools.partial(
+        ha.HomeAssistant.async_run_hass_job, hass
+    )
+    return hass
+
+
 def test_async_add_job_schedule_callback():
     """Test that we schedule coroutines and add jobs to the job pool."""
-    hass = MagicMock()
+    hass = mock_hass()
     job = MagicMock()
 
     ha.HomeAssistant.async_add_job(hass, ha.callback(job))
@@ -57,7 +70,7 @@ def test_async_add_job_schedule_callback():
 
 def test_async_add_job_schedule_partial_callback():
     """Test that we schedule partial coros and add jobs to the job pool."""
-    hass = MagicMock()
+    hass = mock_hass()
     job = MagicMock()
     partial = functools.partial(ha.callback(job))
 
@@ -69,7 +82,7 @@ def test_async_add_job_schedule_partial_callback():
 
 def test_async_add_job_schedule_coroutinefunction(loop):
     """Test that we schedule coroutines and add jobs to the job pool."""
-    hass = MagicMock(loop=MagicMock(wraps=loop))
+    hass = mock_hass(loop=MagicMock(wraps=loop))
 
     async def job():
         pass
@@ -82,7 +95,7 @@ def test_async_add_job_schedule_coroutinefunction(loop):
 
 def test_async_add_job_schedule_partial_coroutinefunction(loop):
     """Test that we schedule partial coros and add jobs to the job pool."""
-    hass = MagicMock(loop=MagicMock(wraps=loop))
+    hass = mock_hass(loop=MagicMock(wraps=loop))
 
     async def job():
         pass
@@ -97,7 +110,7 @@ def test_async_add_job_schedule_partial_coroutinefunction(loop):
 
 def test_async_add_job_add_threaded_job_to_pool():
     """Test that we schedule coroutines and add jobs to the job pool."""
-    hass = MagicMock()
+    hass = mock_hass()
 
     def job():
         pass
@@ -108,6 +121,122 @@ def test_async_add_job_add_threaded_job_to_pool():
     assert len(hass.loop.run_in_executor.mock_calls) == 1
 
 
+def test_async_add_hass_job_schedule_callback():
+    """Test that we schedule coroutines and add jobs to the job pool."""
+    hass = MagicMock()
+    job = MagicMock()
+
+    ha.HomeAssistant.async_add_hass_job(hass, ha.HassJob(ha.callback(job)))
+    assert len(hass.loop.call_soon.mock_calls) == 1
+    assert len(hass.loop.create_task.mock_calls) == 0
+    assert len(hass.add_job.mock_calls) == 0
+
+
+def test_async_add_hass_job_schedule_partial_callback():
+    """Test that we schedule partial coros and add jobs to the job pool."""
+    hass = MagicMock()
+    job = MagicMock()
+    partial = functools.partial(ha.callback(job))
+
+    ha.HomeAssistant.async_add_hass_job(hass, ha.HassJob(partial))
+    assert len(hass.loop.call_soon.mock_calls) == 1
+    assert len(hass.loop.create_task.mock_calls) == 0
+    assert len(hass.add_job.mock_calls) == 0
+
+
+def test_async_add_hass_job_schedule_coroutinefunction(loop):
+    """Test that we schedule coroutines and add jobs to the job pool."""
+    hass = MagicMock(loop=MagicMock(wraps=loop))
+
+    async def job():
+        pass
+
+    ha.HomeAssistant.async_add_hass_job(hass, ha.HassJob(job))
+    assert len(hass.loop.call_soon.mock_calls) == 0
+    assert len(hass.loop.create_task.mock_calls) == 1
+    assert len(hass.add_job.mock_calls) == 0
+
+
+def test_async_add_hass_job_schedule_partial_coroutinefunction(loop):
+    """Test that we schedule partial coros and add jobs to the job pool."""
+    hass = MagicMock(loop=MagicMock(wraps=loop))
+
+    async def job():
+        pass
+
+    partial = functools.partial(job)
+
+    ha.HomeAssistant.async_add_hass_job(hass, ha.HassJob(partial))
+    assert len(hass.loop.call_soon.mock_calls) == 0
+    assert len(hass.loop.create_task.mock_calls) == 1
+    assert len(hass.add_job.mock_calls) == 0
+
+
+def test_async_add_hass_job_add_threaded_job_to_pool():
+    """Test that we schedule coroutines and add jobs to the job pool."""
+    hass = MagicMock()
+
+    def job():
+        pass
+
+    ha.HomeAssistant.async_add_hass_job(hass, ha.HassJob(job))
+    assert len(hass.loop.call_soon.mock_calls) == 0
+    assert len(hass.loop.create_task.mock_calls) == 0
+    assert len(hass.loop.run_in_executor.mock_calls) == 1
+
+
+def test_async_add_job_resolves_job_type():
+    """Test async_add_job wraps the target in a HassJob."""
+    hass = MagicMock()
+
+    async def coro_job():
+        pass
+
+    def executor_job():
+        pass
+
+    ha.HomeAssistant.async_add_job(hass, executor_job, 1)
+    (job, arg), _ = hass.async_add_hass_job.call_args
+    assert job.target is executor_job
+    assert job.job_type == ha.HassJobType.Executor
+    assert arg == 1
+
+    coro = coro_job()
+    ha.HomeAssistant.async_add_job(hass, coro)
+    hass.async_create_task.assert_called_once_with(coro)
+    coro.close()
+
+    with pytest.raises(ValueError):
+        ha.HomeAssistant.async_add_job(hass, None)
+
+
+def test_hass_job_type():
+    """Test the job type is resolved once from the target."""
+
+    async def coro_job():
+        pass
+
+    @ha.callback
+    def callback_job():
+        pass
+
+    def executor_job():
+        pass
+
+    assert ha.HassJob(coro_job).job_type == ha.HassJobType.Coroutinefunction
+    assert (
+        ha.HassJob(functools.partial(coro_job)).job_type
+        == ha.HassJobType.Coroutinefunction
+    )
+    assert ha.HassJob(callback_job).job_type == ha.HassJobType.Callback
+    assert ha.HassJob(executor_job).job_type == ha.HassJobType.Executor
+
+    coro = coro_job()
+    with pytest.raises(ValueError):
+        ha.HassJob(coro)
+    coro.close()
+
+
 def test_async_create_task_schedule_coroutine(loop):
     """Test that we schedule coroutines and add jobs to the job pool."""
     hass = MagicMock(loop=MagicMock(wraps=loop))
@@ -123,7 +252,7 @@ def test_async_create_task_schedule_coroutine(loop):
 
 def test_async_run_job_calls_callback():
     """Test that the callback annotation is respected."""
-    hass = MagicMock()
+    hass = mock_hass()
     calls = []
 
     def job():
@@ -136,7 +265,7 @@ def test_async_run_job_calls_callback():
 
 def test_async_run_job_delegates_non_async():
     """Test that the callback annotation is respected."""
-    hass = MagicMock()
+    hass = mock_hass()
     calls = []
 
     def job():
@@ -144,7 +273,33 @@ def test_async_run_job_delegates_non_async():
 
     ha.HomeAssistant.async_run_job(hass, job)
     assert len(calls) == 0
-    assert len(hass.async_add_job.mock_calls) == 1
+    assert len(hass.loop.run_in_executor.mock_calls) == 1
+
+
+def test_async_run_hass_job_calls_callback():
+    """Test that the callback annotation is respected."""
+    hass = MagicMock()
+    calls = []
+
+    def job():
+        calls.append(1)
+
+    ha.HomeAssistant.async_run_hass_job(hass, ha.HassJob(ha.callback(job)))
+    assert len(calls) == 1
+    assert len(hass.async_add_hass_job.mock_calls) == 0
+
+
+def test_async_run_hass_job_delegates_non_async():
+    """Test that the callback annotation is respected."""
+    hass = MagicMock()
+    calls = []
+
+    def job():
+        calls.append(1)
+
+    ha.HomeAssistant.async_run_hass_job(hass, ha.HassJob(job))
+    assert len(calls) == 0
+    assert len(hass.async_add_hass_job.mock_calls) == 1
 
 
 def test_stage_shutdown():
@@ -190,20 +345,21 @@ class TestHomeAssistant(unittest.TestCase):
         for _ in range(3):
             self.hass.add_job(test_coro())
 
-        asyncio.run_coroutine_threadsafe(
-            asyncio.wait(self.hass._pending_tasks), loop=self.hass.loop
-        ).result()
+        self.hass.block_till_done()
 
-        assert len(self.hass._pending_tasks) == 3
+        # Done tasks remove themselves
+        assert len(self.hass._pending_tasks) == 0
         assert len(call_count) == 3
 
     def test_async_add_job_pending_tasks_coro(self):
         """Add a coro to pending tasks."""
         call_count = []
+        release = threading.Event()
 
         @asyncio.coroutine
         def test_coro():
             """Test Coro."""
+            yield from self.hass.loop.run_in_executor(None, release.wait)
             call_count.append("call")
 
         for _ in range(2):
@@ -220,15 +376,19 @@ class TestHomeAssistant(unittest.TestCase):
         ).result()
 
         assert len(self.hass._pending_tasks) == 2
+        release.set()
         self.hass.block_till_done()
         assert len(call_count) == 2
+        assert len(self.hass._pending_tasks) == 0
 
     def test_async_add_job_pending_tasks_executor(self):
         """Run an executor in pending tasks."""
         call_count = []
+        release = threading.Event()
 
         def test_executor():
             """Test executor."""
+            release.wait()
             call_count.append("call")
 
         @asyncio.coroutine
@@ -245,8 +405,10 @@ class TestHomeAssistant(unittest.TestCase):
         ).result()
 
         assert len(self.hass._pending_tasks) == 2
+        release.set()
         self.hass.block_till_done()
         assert len(call_count) == 2
+        assert len(self.hass._pending_tasks) == 0
 
     def test_async_add_job_pending_tasks_callback(self):
         """Run a callback in pending tasks."""
@@ -470,6 +632,37 @@ class TestEventBus(unittest.TestCase):
         assert len(coroutine_calls) == 1
 
 
+async def test_eventbus_runs_callback_listeners_inline(hass):
+    """Test callback listeners run when the event is fired."""
+    calls = []
+
+    @ha.callback
+    def failing_listener(event):
+        """Raise an error."""
+        raise ValueError
+
+    @ha.callback
+    def listener(event):
+        """Record the event and stop listening."""
+        calls.append(event)
+        unsub()
+
+    hass.bus.async_listen("test_inline", failing_listener)
+    unsub = hass.bus.async_listen("test_inline", listener)
+    hass.bus.async_listen(
+        "test_inline",
+        functools.partial(ha.callback(lambda x, event: calls.append(x)), 1),
+    )
+
+    hass.bus.async_fire("test_inline")
+    assert len(calls) == 2
+    assert calls[1] == 1
+    assert hass.bus.async_listeners()["test_inline"] == 2
+
+    hass.bus.async_fire("test_inline")
+    assert calls[2:] == [1]
+
+
 def test_state_init():
     """Test state.init."""
     with pytest.raises(InvalidEntityFormatError):
@@ -660,6 +853,52 @@ class TestStateMachine(unittest.TestCase):
         assert 1 == len(events)
 
 
+async def test_statemachine_domain_index(hass):
+    """Test domain filtered lookups follow states being set and removed."""
+    states = hass.states
+    states.async_set("light.Bowl", "on")
+    states.async_set("light.ceiling", "off")
+    states.async_set("switch.ac", "off")
+    view = states.async_states("light")
+
+    assert states.async_entity_ids("LIGHT") == ["light.bowl", "light.ceiling"]
+    assert states.async_entity_ids_count("light") == 2
+    assert states.async_entity_ids_count() == 3
+    assert [state.entity_id for state in states.async_all("switch")] == ["switch.ac"]
+    assert states.async_all("sensor") == []
+
+    states.async_set("light.bowl", "off")
+    states.async_remove("light.ceiling")
+
+    assert list(view) == ["light.bowl"]
+    assert view["light.bowl"].state == "off"
+    assert states.async_states()["switch.ac"].state == "off"
+    with pytest.raises(TypeError):
+        view["light.ceiling"] = None
+
+
+def test_entity_id_index():
+    """Test an entity id stays taken until its last claim is released."""
+    index = ha.EntityIdIndex()
+    assert index.async_generate("light", "bowl") == "light.bowl"
+
+    index.async_claim("light", "bowl")
+    index.async_claim("light", "bowl_2")
+    index.async_claim("light", "bowl_2")
+    assert index.async_generate("light", "bowl") == "light.bowl_3"
+    assert (
+        index.async_generate("light", "bowl", lambda entity_id: entity_id.endswith("3"))
+        == "light.bowl_4"
+    )
+
+    index.async_release("light", "bowl_2")
+    assert index.async_generate("light", "bowl") == "light.bowl_3"
+
+    index.async_release("light", "bowl_2")
+    assert index.async_generate("light", "bowl") == "light.bowl_2"
+    assert index.async_generate("switch", "bowl") == "switch.bowl"
+
+
 def test_service_call_repr():
     """Test ServiceCall repr."""
     call = ha.ServiceCall("homeassistant", "start")
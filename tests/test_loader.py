@@ -1,4 +1,6 @@
 """Test to verify that we can load components."""
+import os
+
 from asynctest.mock import ANY, patch
 import pytest
 
@@ -242,3 +244,71 @@ async def test_get_custom_components_safe_mode(hass):
     """Test that we get empty custom components in safe mode."""
     hass.config.safe_mode = True
     assert await loader.async_get_custom_components(hass) == {}
+
+
+async def test_manifest_index_rereads_changed_manifest(hass, tmp_path):
+    """Test the manifest index only reads a manifest again when it changed."""
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text('{"domain": "old"}')
+    os.utime(manifest_path, ns=(1, 1))
+
+    index = await loader.async_get_manifest_index(hass)
+    assert index.get_manifest(manifest_path) == {"domain": "old"}
+
+    manifest_path.write_text('{"domain": "new"}')
+    os.utime(manifest_path, ns=(1, 1))
+    assert index.get_manifest(manifest_path) == {"domain": "old"}
+
+    os.utime(manifest_path, ns=(2, 2))
+    assert index.get_manifest(manifest_path) == {"domain": "new"}
+
+    # Rewritten within the resolution of the mtime
+    manifest_path.write_text('{"domain": "newer"}')
+    os.utime(manifest_path, ns=(2, 2))
+    assert index.get_manifest(manifest_path) == {"domain": "newer"}
+
+    manifest_path.unlink()
+    assert index.get_manifest(manifest_path) is None
+
+
+async def test_manifest_index_loaded_from_storage(hass, hass_storage, tmp_path):
+    """Test the manifest index uses the stored entries that are still valid."""
+    (tmp_path / "test").mkdir()
+    manifest_path = tmp_path / "test" / "manifest.json"
+    manifest_path.write_text('{"domain": "test"}')
+    os.utime(manifest_path, ns=(1, 1))
+    os.utime(tmp_path, ns=(1, 1))
+
+    hass_storage[loader.MANIFEST_INDEX_STORAGE_KEY] = {
+        "version": loader.MANIFEST_INDEX_STORAGE_VERSION,
+        "key": loader.MANIFEST_INDEX_STORAGE_KEY,
+        "data": {
+            "manifests": {
+                str(manifest_path): {
+                    "mtime": 1,
+                    "size": 18,
+                    "manifest": {"domain": "stored"},
+                }
+            },
+            "directories": {
+                str(tmp_path): {"mtime": 1, "names": ["stored"]},
+                "/removed": {"mtime": 1, "names": []},
+            },
+        },
+    }
+
+    index = await loader.async_get_manifest_index(hass)
+    assert index.get_sub_directories(str(tmp_path)) == ["stored"]
+    assert index.get_manifest(manifest_path) == {"domain": "stored"}
+
+    # Only the entries used in this run are saved again
+    assert index._data_to_save() == {
+        "manifests": {
+            str(manifest_path): {
+                "mtime": 1,
+                "size": 18,
+                "manifest": {"domain": "stored"},
+            }
+        },
+        "directories": {str(tmp_path): {"mtime": 1, "names": ["stored"]}},
+    }
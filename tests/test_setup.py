@@ -535,3 +535,14 @@ async def test_setup_import_blows_up(hass):
         "homeassistant.loader.Integration.get_component", side_effect=ValueError
     ):
         assert not await setup.async_setup_component(hass, "sun", {})
+
+
+async def test_setup_records_timings(hass):
+    """Test the time spent setting up an integration is recorded."""
+    mock_integration(hass, MockModule("comp"))
+
+    assert await setup.async_setup_component(hass, "comp", {})
+
+    timings = setup.async_get_setup_timings(hass)["comp"]
+    assert set(timings) == {setup.SETUP_PHASE_IMPORT, setup.SETUP_PHASE_SETUP}
+    assert all(seconds >= 0 for seconds in timings.values())
@@ -0,0 +1,101 @@
+"""Test Home Assistant rolling window statistics."""
+import random
+import statistics
+
+import pytest
+
+from homeassistant.util.rolling import RollingWindow
+
+
+def test_empty_window():
+    """Test the statistics of an empty window."""
+    window = RollingWindow(3)
+
+    assert len(window) == 0
+    assert window.total == 0
+    for attr in ("mean", "median", "min", "max", "variance", "stdev"):
+        with pytest.raises(ValueError):
+            getattr(window, attr)
+
+
+def test_single_value():
+    """Test the statistics of a single value."""
+    window = RollingWindow(3)
+    window.append(4.5)
+
+    assert window.mean == 4.5
+    assert window.median == 4.5
+    assert window.min == window.max == 4.5
+    with pytest.raises(ValueError):
+        window.variance  # pylint: disable=pointless-statement
+
+
+def test_maxlen_drops_oldest():
+    """Test values past maxlen drop the oldest value."""
+    window = RollingWindow(3)
+
+    assert [window.append(value) for value in (5, 1, 3, 8)] == [None, None, None, 5]
+    assert list(window) == [1, 3, 8]
+    assert window[0] == 1
+    assert window[-1] == 8
+    assert window.total == 12
+    assert window.min == 1
+    assert window.max == 8
+    assert window.median == 3
+
+    assert window.popleft() == 1
+    assert window.median == 5.5
+
+    window.clear()
+    assert len(window) == 0
+    window.append(2)
+    assert window.median == window.min == window.max == 2
+
+
+def test_matches_statistics_module():
+    """Test the running statistics match the statistics module."""
+    rand = random.Random(42)
+
+    for maxlen in (1, 2, 5, 100):
+        window = RollingWindow(maxlen)
+        values = []
+
+        for _ in range(1000):
+            if values and rand.random() < 0.2:
+                assert window.popleft() == values.pop(0)
+            else:
+                value = rand.choice([rand.randint(0, 5), rand.uniform(-50, 50)])
+                window.append(value)
+                values = (values + [value])[-maxlen:]
+
+            if not values:
+                continue
+
+            assert window.mean == pytest.approx(statistics.mean(values))
+            assert window.median == statistics.median(values)
+            assert window.min == min(values)
+            assert window.max == max(values)
+            assert window.total == pytest.approx(sum(values))
+
+            if len(values) > 1:
+                assert window.variance == pytest.approx(
+                    statistics.variance(values), rel=1e-6, abs=1e-9
+                )
+                assert window.stdev == pytest.approx(
+                    statistics.stdev(values), rel=1e-6, abs=1e-6
+                )
+
+
+def test_outlier_leaving_window():
+    """Test the variance recovers once an extreme outlier leaves the window."""
+    rand = random.Random(42)
+    window = RollingWindow(100)
+
+    for _ in range(100):
+        window.append(rand.gauss(20, 0.3))
+    window.append(1e9)
+    for _ in range(100):
+        window.append(rand.gauss(20, 0.3))
+
+    assert window.mean == pytest.approx(statistics.mean(window))
+    assert window.stdev == pytest.approx(statistics.stdev(window), rel=1e-9)